@@ -0,0 +1,43 @@
+"""add app record counters
+
+Revision ID: c3e8a1f4b6d2
+Revises: b7a1c3d9e2f4
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8a1f4b6d2"
+down_revision: Union[str, Sequence[str], None] = "b7a1c3d9e2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "app_record_counters",
+        sa.Column("app_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("last_number", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["app_id"], ["apps.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("app_id"),
+    )
+    # Seed counters from existing data so numbering continues where max(record_number) left off.
+    op.execute(
+        """
+        INSERT INTO app_record_counters (app_id, last_number)
+        SELECT apps.id, COALESCE(MAX(records.record_number), 0)
+        FROM apps
+        LEFT JOIN records ON records.app_id = apps.id
+        GROUP BY apps.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("app_record_counters")
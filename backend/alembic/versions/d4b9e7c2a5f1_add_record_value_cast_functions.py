@@ -0,0 +1,59 @@
+"""add record value cast functions
+
+Revision ID: d4b9e7c2a5f1
+Revises: c3e8a1f4b6d2
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b9e7c2a5f1"
+down_revision: Union[str, Sequence[str], None] = "c3e8a1f4b6d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Typed views of JSONB field values used by per-field expression indexes and typed filters.
+    # Both return NULL instead of raising on malformed input, so one bad value never blocks writes.
+    # Numbers are capped at 1000 characters with at most a 4-digit exponent: anything the pattern
+    # accepts stays far inside numeric's range (131072 digits before the point, 16383 after).
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION kintone_to_numeric(value text) RETURNS numeric
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT CASE
+                WHEN length(value) <= 1000
+                     AND value ~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]{1,4})?\s*$' THEN value::numeric
+            END
+        $$
+        """
+    )
+    # TimeZone/DateStyle are pinned so the result does not depend on session settings, and the
+    # inputs relative to the current time ('now', 'today', ...) are rejected, which is what makes
+    # the function safe to declare IMMUTABLE.
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION kintone_to_timestamptz(value text) RETURNS timestamptz
+        LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE
+        SET "TimeZone" = 'UTC' SET "DateStyle" = 'ISO, YMD' AS $$
+        BEGIN
+            IF value ~* '\m(now|today|tomorrow|yesterday)\M' THEN
+                RETURN NULL;
+            END IF;
+            RETURN value::timestamptz;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS kintone_to_timestamptz(text)")
+    op.execute("DROP FUNCTION IF EXISTS kintone_to_numeric(text)")
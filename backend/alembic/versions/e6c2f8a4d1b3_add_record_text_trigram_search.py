@@ -0,0 +1,45 @@
+"""add record text trigram search
+
+Revision ID: e6c2f8a4d1b3
+Revises: d4b9e7c2a5f1
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6c2f8a4d1b3"
+down_revision: Union[str, Sequence[str], None] = "d4b9e7c2a5f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Text of every string/number value in a record (keys excluded), one per line.
+    # Whole-record substring search matches against this instead of data::text.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION kintone_record_text(data jsonb) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(string_agg(value #>> '{}', E'\\n'), '')
+            FROM jsonb_path_query(coalesce(data, '{}'::jsonb), 'strict $.**') AS value
+            WHERE jsonb_typeof(value) IN ('string', 'number')
+        $$
+        """
+    )
+    # Built concurrently: records can be large and must stay writable meanwhile.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_records_text_trgm "
+            "ON records USING gin (kintone_record_text(data) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_records_text_trgm")
+    op.execute("DROP FUNCTION IF EXISTS kintone_record_text(jsonb)")
@@ -0,0 +1,119 @@
+"""add record search vector
+
+Revision ID: f1a7c3e9b5d2
+Revises: e6c2f8a4d1b3
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a7c3e9b5d2"
+down_revision: Union[str, Sequence[str], None] = "e6c2f8a4d1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# One token per Latin/digit word or per run of Japanese/CJK characters.
+# Must match SEARCH_TOKEN_PATTERN in app/services/record_search_service.py.
+TOKEN_PATTERN = "([0-9a-z\u00c0-\u024f]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+)"
+WORD_PATTERN = "^[0-9a-z\u00c0-\u024f]+$"
+
+
+def upgrade() -> None:
+    op.add_column("records", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    # Latin words are kept whole; CJK runs are split into overlapping bigrams
+    # ("見積書" -> 見積, 積書), since Japanese text has no spaces between words.
+    # NFKC folds full-width letters/digits and half-width katakana first.
+    # Each run is followed by a NULL so that runs never end up at adjacent positions.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION kintone_search_tokens(value text) RETURNS text[]
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(array_agg(t.token ORDER BY r.run_position, t.i), ARRAY[]::text[])
+            FROM regexp_matches(lower(normalize(coalesce(value, ''), NFKC)), '{TOKEN_PATTERN}', 'g')
+                 WITH ORDINALITY AS r(m, run_position)
+            CROSS JOIN LATERAL (
+                SELECT i, CASE
+                    WHEN i > n THEN NULL
+                    WHEN whole THEN r.m[1]
+                    ELSE substr(r.m[1], i, 2)
+                END AS token
+                FROM (SELECT r.m[1] ~ '{WORD_PATTERN}' OR char_length(r.m[1]) = 1 AS whole) w
+                CROSS JOIN LATERAL (SELECT CASE WHEN whole THEN 1 ELSE char_length(r.m[1]) - 1 END AS n) c
+                CROSS JOIN LATERAL generate_series(1, n + 1) AS i
+            ) t
+        $$
+        """
+    )
+    # Positions follow token order, so a bigram phrase only matches within one run.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION kintone_search_vector(data jsonb, codes text[]) RETURNS tsvector
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(
+                string_agg(quote_literal(t.token) || ':' || least(t.position, 16383), ' ')::tsvector,
+                ''::tsvector
+            )
+            FROM unnest(kintone_search_tokens(
+                (SELECT string_agg(data ->> code, E'\\n') FROM unnest(coalesce(codes, ARRAY[]::text[])) AS code)
+            )) WITH ORDINALITY AS t(token, position)
+            WHERE t.token IS NOT NULL
+        $$
+        """
+    )
+    # Words become prefix matches and CJK runs become bigram phrases, all AND-ed.
+    # Single CJK characters are skipped: they never form a bigram on the record side.
+    # Returns NULL when the term has no usable token.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION kintone_search_query(term text) RETURNS tsquery
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT string_agg(part, ' & ' ORDER BY run_position)::tsquery
+            FROM (
+                SELECT r.run_position, CASE
+                    WHEN r.m[1] ~ '{WORD_PATTERN}' THEN quote_literal(r.m[1]) || ':*'
+                    ELSE (
+                        SELECT '(' || string_agg(quote_literal(substr(r.m[1], i, 2)), ' <-> ' ORDER BY i) || ')'
+                        FROM generate_series(1, char_length(r.m[1]) - 1) AS i
+                    )
+                END AS part
+                FROM regexp_matches(lower(normalize(coalesce(term, ''), NFKC)), '{TOKEN_PATTERN}', 'g')
+                     WITH ORDINALITY AS r(m, run_position)
+                WHERE r.m[1] ~ '{WORD_PATTERN}' OR char_length(r.m[1]) > 1
+            ) parts
+        $$
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE records r
+        SET search_vector = kintone_search_vector(r.data, f.codes)
+        FROM (
+            SELECT app_id, array_agg(code) AS codes
+            FROM fields
+            WHERE type IN ('SINGLE_LINE_TEXT', 'MULTI_LINE_TEXT')
+            GROUP BY app_id
+        ) f
+        WHERE f.app_id = r.app_id
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_records_search_vector ON records USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_records_search_vector")
+    op.execute("DROP FUNCTION IF EXISTS kintone_search_query(text)")
+    op.execute("DROP FUNCTION IF EXISTS kintone_search_vector(jsonb, text[])")
+    op.execute("DROP FUNCTION IF EXISTS kintone_search_tokens(text)")
+    op.drop_column("records", "search_vector")
@@ -0,0 +1,28 @@
+"""mark timestamptz cast parallel unsafe
+
+Revision ID: f5b8d2a6c4e1
+Revises: f1a7c3e9b5d2
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b8d2a6c4e1"
+down_revision: Union[str, Sequence[str], None] = "f1a7c3e9b5d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The EXCEPTION block opens a subtransaction, which is not allowed anywhere in a parallel
+    # query (leader included): aggregations over date fields failed once the planner chose a
+    # parallel plan. Expression indexes on the function are unaffected.
+    op.execute("ALTER FUNCTION kintone_to_timestamptz(text) PARALLEL UNSAFE")
+
+
+def downgrade() -> None:
+    op.execute("ALTER FUNCTION kintone_to_timestamptz(text) PARALLEL SAFE")
@@ -0,0 +1,64 @@
+"""add record rollups
+
+Revision ID: f7c1e4a9d3b6
+Revises: f5b8d2a6c4e1
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7c1e4a9d3b6"
+down_revision: Union[str, Sequence[str], None] = "f5b8d2a6c4e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "record_rollups",
+        sa.Column("app_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("group_value", sa.String(), nullable=False, server_default=""),
+        sa.Column("record_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("sums", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default="{}"),
+        sa.ForeignKeyConstraint(["app_id"], ["apps.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("app_id", "status", "group_value"),
+    )
+    # Key-wise sum of two {code: number} objects; merges rollup sums on upsert.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION kintone_jsonb_sum(a jsonb, b jsonb) RETURNS jsonb
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(jsonb_object_agg(key, total), '{}'::jsonb)
+            FROM (
+                SELECT key, sum(value::numeric) AS total
+                FROM (
+                    SELECT * FROM jsonb_each_text(coalesce(a, '{}'::jsonb))
+                    UNION ALL
+                    SELECT * FROM jsonb_each_text(coalesce(b, '{}'::jsonb))
+                ) AS entries
+                GROUP BY key
+            ) AS totals
+        $$
+        """
+    )
+    # No App has a grouping field or sum fields configured yet, so existing records roll up by status only.
+    op.execute(
+        """
+        INSERT INTO record_rollups (app_id, status, group_value, record_count, sums)
+        SELECT app_id, coalesce(status, ''), '', count(*), '{}'::jsonb
+        FROM records
+        GROUP BY app_id, coalesce(status, '')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("record_rollups")
+    op.execute("DROP FUNCTION IF EXISTS kintone_jsonb_sum(jsonb, jsonb)")
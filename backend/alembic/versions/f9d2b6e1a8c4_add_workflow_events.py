@@ -0,0 +1,89 @@
+"""add workflow events
+
+Revision ID: f9d2b6e1a8c4
+Revises: f7c1e4a9d3b6
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f9d2b6e1a8c4"
+down_revision: Union[str, Sequence[str], None] = "f7c1e4a9d3b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workflow_events",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("record_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("app_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("actor_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("from_status", sa.String(), nullable=True),
+        sa.Column("to_status", sa.String(), nullable=True),
+        sa.Column("comment", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["record_id"], ["records.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["app_id"], ["apps.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["actor_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Backfill in history order so ids keep each record's events in sequence.
+    # Actors that no longer exist are kept as NULL rather than failing the foreign key.
+    op.execute(
+        """
+        INSERT INTO workflow_events (record_id, app_id, actor_id, action, from_status, to_status, comment, created_at)
+        SELECT records.id,
+               records.app_id,
+               users.id,
+               coalesce(event ->> 'action', ''),
+               event ->> 'from_status',
+               event ->> 'to_status',
+               event ->> 'comment',
+               coalesce((event ->> 'at')::timestamptz, records.updated_at, records.created_at, now())
+        FROM records
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(records.workflow_history) = 'array' THEN records.workflow_history ELSE '[]'::jsonb END
+        ) WITH ORDINALITY AS history(event, position)
+        LEFT JOIN users ON users.id::text = history.event ->> 'actor_id'
+        ORDER BY records.id, history.position
+        """
+    )
+    op.create_index("ix_workflow_events_record_id_id", "workflow_events", ["record_id", "id"])
+    op.drop_column("records", "workflow_history")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "records",
+        sa.Column("workflow_history", postgresql.JSONB(astext_type=sa.Text()), nullable=True, server_default="[]"),
+    )
+    op.execute(
+        """
+        UPDATE records
+        SET workflow_history = events.history
+        FROM (
+            SELECT record_id,
+                   jsonb_agg(
+                       jsonb_build_object(
+                           'actor_id', actor_id, 'action', action, 'from_status', from_status,
+                           'to_status', to_status, 'comment', comment, 'at', created_at
+                       )
+                       ORDER BY id
+                   ) AS history
+            FROM workflow_events
+            GROUP BY record_id
+        ) AS events
+        WHERE records.id = events.record_id
+        """
+    )
+    op.drop_index("ix_workflow_events_record_id_id", table_name="workflow_events")
+    op.drop_table("workflow_events")
@@ -0,0 +1,49 @@
+"""add record revisions
+
+Revision ID: fb3e7a2c5d90
+Revises: f9d2b6e1a8c4
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "fb3e7a2c5d90"
+down_revision: Union[str, Sequence[str], None] = "f9d2b6e1a8c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing records start at revision 1 with their current data; their history begins
+    # with the first update after this migration (no rows are backfilled).
+    op.add_column("records", sa.Column("revision", sa.Integer(), server_default="1", nullable=False))
+    op.create_table(
+        "record_revisions",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("record_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("app_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("actor_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("delta", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("snapshot", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["record_id"], ["records.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["app_id"], ["apps.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["actor_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_record_revisions_record_id_revision", "record_revisions", ["record_id", "revision"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_record_revisions_record_id_revision", table_name="record_revisions")
+    op.drop_table("record_revisions")
+    op.drop_column("records", "revision")
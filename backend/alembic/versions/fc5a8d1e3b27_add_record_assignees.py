@@ -0,0 +1,61 @@
+"""add record assignees
+
+Revision ID: fc5a8d1e3b27
+Revises: fb3e7a2c5d90
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "fc5a8d1e3b27"
+down_revision: Union[str, Sequence[str], None] = "fb3e7a2c5d90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "record_assignees",
+        sa.Column("record_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("app_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("assigned_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["record_id"], ["records.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["app_id"], ["apps.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("record_id", "user_id"),
+    )
+    # Backfill from the current approver lists; ids that are not (or no longer) users are skipped.
+    op.execute(
+        """
+        INSERT INTO record_assignees (record_id, user_id, app_id, assigned_at)
+        SELECT DISTINCT ON (records.id, users.id)
+               records.id, users.id, records.app_id,
+               coalesce(records.updated_at, records.workflow_submitted_at, records.created_at, now())
+        FROM records
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(records.workflow_approver_ids) = 'array' THEN records.workflow_approver_ids ELSE '[]'::jsonb END
+        ) AS approver(user_id)
+        JOIN users ON users.id::text = approver.user_id
+        """
+    )
+    op.create_index(
+        "ix_record_assignees_user_id_assigned_at", "record_assignees", ["user_id", "assigned_at", "record_id"]
+    )
+    op.create_index(
+        "ix_record_assignees_user_id_app_id_assigned_at",
+        "record_assignees",
+        ["user_id", "app_id", "assigned_at", "record_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_record_assignees_user_id_app_id_assigned_at", table_name="record_assignees")
+    op.drop_index("ix_record_assignees_user_id_assigned_at", table_name="record_assignees")
+    op.drop_table("record_assignees")
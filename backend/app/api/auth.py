@@ -10,6 +10,7 @@ from app.core.database import get_db
 from app.core.security import create_access_token, get_password_hash, verify_password, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models.user import User
 from app.schemas.user_schema import Token, UserCreate, UserResponse
+from app.services.org_membership_service import OrgMembershipService
 
 router = APIRouter()
 
@@ -63,5 +64,6 @@ async def create_user(
     )
     db.add(user)
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(user)
     return user
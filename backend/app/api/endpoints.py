@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 
 from app.core.database import get_db
-from app.schemas.app_schema import AppCreate, AppUpdate, AppResponse, ProcessManagementUpdate, ViewSettingsUpdate
+from app.schemas.app_schema import AppCreate, AppUpdate, AppResponse, AppStatusCounts, ProcessManagementUpdate, ViewSettingsUpdate
 from app.schemas.permission_schema import PermissionUpdate
 from app.services.app_service import AppService
 from app.api.deps import get_current_user
+from app.api.responses import NEGOTIATED_ROUTER_OPTIONS
+from app.services.record_aggregate_service import RecordAggregateService
+from app.services.record_rollup_service import RecordRollupService, RollupSettings
 from app.services.app_service import AppService
 from app.api.deps import get_current_user
 from app.models.user import User
 
-router = APIRouter()
+router = APIRouter(**NEGOTIATED_ROUTER_OPTIONS)
 
 @router.post("", response_model=AppResponse, status_code=status.HTTP_201_CREATED)
 async def create_app(
@@ -47,6 +50,25 @@ async def read_apps(
 
     return visible_apps
 
+@router.get("/status-counts", response_model=List[AppStatusCounts])
+async def read_status_counts(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Record counts per status for every App the user can view, read from the maintained rollups.
+    Apps with record ACL rules are counted live so that hidden records stay hidden.
+    """
+    apps = await AppService.get_apps(db, skip=skip, limit=limit)
+    visible_apps = [app for app in apps if AppService.evaluate_app_permissions(app, current_user).view]
+    counts = await RecordRollupService.status_counts(db, [app.id for app in visible_apps if not app.record_acl])
+    for app in visible_apps:
+        if app.record_acl:
+            counts[app.id] = await RecordAggregateService.status_counts(db, app, current_user)
+    return [{"app_id": app.id, "counts": counts[app.id]} for app in visible_apps]
+
 @router.get("/{app_id}", response_model=AppResponse)
 async def read_app(
     app_id: UUID,
@@ -145,6 +167,7 @@ async def update_permissions(
 async def update_view_settings(
     app_id: UUID,
     view_update: ViewSettingsUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -159,6 +182,13 @@ async def update_view_settings(
     if not perms.manage:
         raise HTTPException(status_code=403, detail="Not authorized to manage this app")
 
-    app = await AppService.update_view_settings(db, app_id, view_update)
+    rollup_before = RollupSettings.from_app(app)
+    try:
+        app = await AppService.update_view_settings(db, app_id, view_update)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if RollupSettings.from_app(app) != rollup_before:
+        # Rollups are keyed by these settings: recompute them once the change is committed.
+        background_tasks.add_task(RecordRollupService.rebuild_app, db.bind, app_id)
     app.user_permissions = perms
     return app
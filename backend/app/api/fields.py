@@ -1,23 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
+from app.api.responses import NEGOTIATED_ROUTER_OPTIONS
 from app.core.database import get_db
 from app.schemas.field_schema import FieldCreate, FieldResponse
+from app.services.field_index_service import FieldIndexService
 from app.services.field_service import FieldService
+from app.services.record_search_service import SEARCH_TEXT_TYPES, RecordSearchService
+
+router = APIRouter(**NEGOTIATED_ROUTER_OPTIONS)
+
+
+async def _schedule_index_sync(db: AsyncSession, background_tasks: BackgroundTasks, app_id: UUID) -> None:
+    # CREATE INDEX CONCURRENTLY waits for every open transaction, including this
+    # request's, so end it before the build starts after the response.
+    await db.commit()
+    background_tasks.add_task(FieldIndexService.sync_app_indexes, db.bind, app_id)
+
+
+async def _schedule_search_rebuild(db: AsyncSession, background_tasks: BackgroundTasks, app_id: UUID) -> None:
+    # Record search vectors cover the App's text fields; recompute them once the change is committed.
+    await db.commit()
+    background_tasks.add_task(RecordSearchService.rebuild_app_vectors, db.bind, app_id)
 
-router = APIRouter()
 
 @router.post("", response_model=FieldResponse, status_code=status.HTTP_201_CREATED)
 async def create_field(
     field_in: FieldCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Add a field to an App.
     """
-    return await FieldService.create_field(db, field_in)
+    field = await FieldService.create_field(db, field_in)
+    if FieldIndexService.requests_indexes(field):
+        await _schedule_index_sync(db, background_tasks, field.app_id)
+        field.index_state = "pending"
+    if field.type in SEARCH_TEXT_TYPES:
+        await _schedule_search_rebuild(db, background_tasks, field.app_id)
+    return field
 
 @router.get("/app/{app_id}", response_model=List[FieldResponse])
 async def read_fields(
@@ -27,15 +51,24 @@ async def read_fields(
     """
     Get all fields for a specific App.
     """
-    return await FieldService.get_fields_by_app(db, app_id)
+    fields = await FieldService.get_fields_by_app(db, app_id)
+    return await FieldIndexService.attach_index_states(db, app_id, fields)
 
 @router.put("/app/{app_id}", response_model=List[FieldResponse])
 async def sync_fields(
     app_id: UUID,
     fields_in: List[FieldCreate],
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Replace all fields for an App.
     """
-    return await FieldService.sync_fields(db, app_id, fields_in)
+    search_codes = set(await RecordSearchService.text_field_codes(db, app_id))
+    fields = await FieldService.sync_fields(db, app_id, fields_in)
+    fields = await FieldIndexService.attach_index_states(db, app_id, fields)
+    # Always reconcile: removed or un-flagged fields must drop their index as well.
+    await _schedule_index_sync(db, background_tasks, app_id)
+    if search_codes != {field.code for field in fields if field.type in SEARCH_TEXT_TYPES}:
+        await _schedule_search_rebuild(db, background_tasks, app_id)
+    return fields
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.api.deps import get_current_user
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.job_schema import JobResponse
+from app.services.job_service import JobService
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def read_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get progress of a background job.
+    """
+    job = await JobService.get_job(db, job_id)
+    if not job or (job.created_by != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.api.deps import get_current_user
+from app.api.responses import NEGOTIATED_ROUTER_OPTIONS
 from app.core.database import get_db
 from app.models.user import User
 from app.schemas.notification_schema import (
@@ -12,7 +13,7 @@ from app.schemas.notification_schema import (
 )
 from app.services.notification_service import NotificationService
 
-router = APIRouter()
+router = APIRouter(**NEGOTIATED_ROUTER_OPTIONS)
 
 
 def _to_response(item) -> NotificationResponse:
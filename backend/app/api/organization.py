@@ -11,6 +11,7 @@ from app.schemas.organization_schema import (
     JobTitleCreate, JobTitleUpdate, JobTitleResponse
 )
 from app.api.deps import get_current_user
+from app.services.org_membership_service import OrgMembershipService
 from app.models.user import User
 
 router = APIRouter()
@@ -29,6 +30,7 @@ async def create_department(
     new_dept = Department(**dept.model_dump())
     db.add(new_dept)
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(new_dept)
     return new_dept
 
@@ -60,6 +62,7 @@ async def update_department(
         setattr(dept, key, value)
     
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(dept)
     return dept
 
@@ -79,6 +82,7 @@ async def delete_department(
         
     await db.delete(dept)
     await db.commit()
+    OrgMembershipService.invalidate()
     return {"ok": True}
 
 # --- Job Titles ---
@@ -95,6 +99,7 @@ async def create_job_title(
     new_title = JobTitle(**title.model_dump())
     db.add(new_title)
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(new_title)
     return new_title
 
@@ -127,6 +132,7 @@ async def update_job_title(
         setattr(title, key, value)
     
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(title)
     return title
 
@@ -146,4 +152,5 @@ async def delete_job_title(
         
     await db.delete(title)
     await db.commit()
+    OrgMembershipService.invalidate()
     return {"ok": True}
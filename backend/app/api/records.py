@@ -1,24 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Header, HTTPException, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
 from app.core.database import get_db
 from app.schemas.record_schema import (
+    RECORD_AGGREGATE_MAX_GROUPS,
+    RecordBulkCreate,
+    RecordBulkCreateResponse,
+    RecordBulkDelete,
+    RecordBulkResult,
+    RecordBulkUpdate,
     RecordCreate,
     RecordResponse,
     RecordUpdate,
     RecordListResponse,
     RecordListPageResponse,
+    RecordCountResponse,
+    RecordAggregateRequest,
+    RecordAggregateResponse,
+    RecordRollupResponse,
+    WorkflowEventPageResponse,
+    PendingApprovalPageResponse,
+    RecordRevisionPageResponse,
+    RecordAsOfResponse,
 )
+from app.schemas.job_schema import JobResponse
 from app.schemas.process_schema import RecordStatusUpdate, WorkflowActionExecuteRequest
-from app.services.record_service import RecordService
+from app.services.record_service import RecordService, WorkflowTransitionConflict
 from app.api.deps import get_current_user
+from app.api.responses import NegotiatedResponse, NEGOTIATED_ROUTER_OPTIONS
+from app.models.models import App, Record
 from app.models.user import User
 from app.services.permission_service import PermissionService
 from app.services.app_service import AppService
+from app.services.job_service import JobService
+from app.services.field_service import FieldService
+from app.services.record_export_service import EXPORT_FORMATS, RecordExportService
+from app.services.record_import_service import RecordImportService
+from app.services.record_count_service import RecordCountService
+from app.services.record_revision_service import RecordRevisionConflict, RecordRevisionService
+from app.services.record_assignee_service import RecordAssigneeService
+from app.services.record_aggregate_service import RecordAggregateError, RecordAggregateService
+from app.services.record_rollup_service import RecordRollupService, RollupSettings
+from app.services.record_cursor import RecordCursorError
+from app.services.record_query import CompiledQuery, RecordQueryError, compile_query
+from app.services.workflow_event_service import WorkflowEventService
+
+router = APIRouter(**NEGOTIATED_ROUTER_OPTIONS)
+
+async def _compile_record_query(
+    db: AsyncSession, app_id: UUID, query: Optional[str], current_user: User
+) -> Optional[CompiledQuery]:
+    if not query:
+        return None
+    fields = await FieldService.get_fields_by_app(db, app_id)
+    try:
+        return compile_query(query, fields, current_user)
+    except RecordQueryError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {exc}")
 
-router = APIRouter()
+def _list_field_codes(app: App, field_codes: Optional[str]) -> Optional[List[str]]:
+    # Field codes to return in list rows: the comma-separated request parameter,
+    # else the App's list view columns (view_settings.list_fields), else all of data.
+    if field_codes:
+        return [code.strip() for code in field_codes.split(",") if code.strip()]
+    return list((app.view_settings or {}).get("list_fields") or []) or None
 
 @router.post("", response_model=RecordResponse, status_code=status.HTTP_201_CREATED)
 async def create_record(
@@ -50,18 +99,187 @@ async def create_record(
 
     return await RecordService.create_record(db, record_in, current_user.id)
 
+@router.post("/bulk", response_model=RecordBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_records_bulk(
+    bulk_in: RecordBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many Records for one App in a single transaction.
+    """
+    app_ids = {record.app_id for record in bulk_in.records}
+    if len(app_ids) != 1:
+        raise HTTPException(status_code=400, detail="All records must belong to the same app")
+
+    app = await AppService.get_app(db, app_ids.pop())
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    # Same rule as single record creation: app view permission allows adding records.
+    if not PermissionService.check_app_permission(current_user, app, 'view'):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    items = await RecordService.create_records_bulk(db, app, bulk_in.records, current_user.id)
+    return RecordBulkCreateResponse(items=items)
+
+@router.patch("/bulk", response_model=RecordBulkResult)
+async def update_records_bulk(
+    bulk_update: RecordBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply a data patch and/or status to records selected by ids or filters.
+    """
+    app = await AppService.get_app(db, bulk_update.app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    if not PermissionService.check_app_permission(current_user, app, 'edit'):
+        raise HTTPException(status_code=403, detail="Not authorized to edit record")
+
+    record_query = await _compile_record_query(db, app.id, bulk_update.query, current_user)
+    affected = await RecordService.bulk_update_records(
+        db,
+        app.id,
+        data=bulk_update.data,
+        status=bulk_update.status,
+        ids=bulk_update.ids,
+        filters=bulk_update.filters,
+        user=current_user,
+        app_record_acl=app.record_acl,
+        record_query=record_query,
+    )
+    return RecordBulkResult(affected=affected)
+
+async def _get_app_for_bulk_delete(db: AsyncSession, app_id: UUID, current_user: User):
+    app = await AppService.get_app(db, app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    if not PermissionService.check_app_permission(current_user, app, 'delete'):
+        raise HTTPException(status_code=403, detail="Not authorized to delete records")
+    return app
+
+@router.post("/bulk/delete", response_model=RecordBulkResult)
+async def delete_records_bulk(
+    bulk_delete: RecordBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete records selected by ids or filters, in bounded batches.
+    """
+    app = await _get_app_for_bulk_delete(db, bulk_delete.app_id, current_user)
+    record_query = await _compile_record_query(db, app.id, bulk_delete.query, current_user)
+    affected = await RecordService.bulk_delete_records(
+        db,
+        app.id,
+        ids=bulk_delete.ids,
+        filters=bulk_delete.filters,
+        user=current_user,
+        app_record_acl=app.record_acl,
+        record_query=record_query,
+    )
+    return RecordBulkResult(affected=affected)
+
+@router.post("/bulk/purge", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def purge_records(
+    bulk_delete: RecordBulkDelete,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a background job deleting records selected by ids or filters.
+    Progress is available from GET /api/v1/jobs/{job_id}.
+    """
+    app = await _get_app_for_bulk_delete(db, bulk_delete.app_id, current_user)
+    record_query = await _compile_record_query(db, app.id, bulk_delete.query, current_user)
+    total = await RecordService.count_bulk_targets(
+        db,
+        app.id,
+        ids=bulk_delete.ids,
+        filters=bulk_delete.filters,
+        user=current_user,
+        app_record_acl=app.record_acl,
+        record_query=record_query,
+    )
+    job = await JobService.create_job(db, "records.purge", current_user.id, total=total)
+    # The request session is closed once the response is sent, so the job opens its own.
+    engine = db.bind
+    record_acl = app.record_acl
+
+    async def work(report):
+        async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+            deleted = await RecordService.bulk_delete_records(
+                session,
+                app.id,
+                ids=bulk_delete.ids,
+                filters=bulk_delete.filters,
+                user=current_user,
+                app_record_acl=record_acl,
+                record_query=record_query,
+                on_batch=report,
+            )
+        return {"deleted": deleted}
+
+    background_tasks.add_task(JobService.run, engine, job, work)
+    return job
+
+@router.post("/import", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_records(
+    background_tasks: BackgroundTasks,
+    app_id: UUID = Form(...),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a background job importing records from a CSV file.
+    Header cells are matched to field codes (or labels); per-row errors are
+    collected in the job result. Progress is available from GET /api/v1/jobs/{job_id}.
+    """
+    app = await AppService.get_app(db, app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    if not PermissionService.check_app_permission(current_user, app, 'view'):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    fields = await FieldService.get_fields_by_app(db, app_id)
+    job = await JobService.create_job(db, "records.import", current_user.id)
+    engine = db.bind
+    user_id = current_user.id
+
+    async def work(report):
+        async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+            return await RecordImportService.import_csv(
+                session, app, fields, file.file, user_id, on_progress=report
+            )
+
+    background_tasks.add_task(JobService.run, engine, job, work)
+    return job
+
 @router.get("", response_model=List[RecordListResponse])
 async def read_records(
     app_id: UUID,
     skip: int = 0,
     limit: int = 100,
     filters: Optional[str] = None,
+    query: Optional[str] = None,
+    search: Optional[str] = None,
     field_codes: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get records for an App with optional filtering.
+    `query` takes a record query expression, e.g.
+    amount >= 1000 and status in ("A", "B") order by amount desc
+    `search` is a full-text search over the text fields; results are ranked
+    by relevance unless `query` has an order by.
     """
     app = await AppService.get_app(db, app_id)
     if not app:
@@ -79,11 +297,10 @@ async def read_records(
         except json.JSONDecodeError:
              raise HTTPException(status_code=400, detail="Invalid filters JSON")
 
-    list_field_codes: Optional[List[str]] = None
-    if field_codes:
-        list_field_codes = [code.strip() for code in field_codes.split(",") if code.strip()]
+    list_field_codes = _list_field_codes(app, field_codes)
 
-    return await RecordService.get_records(
+    record_query = await _compile_record_query(db, app_id, query, current_user)
+    records = await RecordService.get_records(
         db, 
         app_id, 
         skip=skip, 
@@ -91,20 +308,29 @@ async def read_records(
         filters=filter_dict,
         field_codes=list_field_codes,
         user=current_user,
-        app_record_acl=app.record_acl
+        app_record_acl=app.record_acl,
+        record_query=record_query,
+        search=search.strip() if search else None,
     )
+    # Rows are encoded as-is; response_model only documents the shape.
+    return NegotiatedResponse(records)
 
 
 @router.get("/paged", response_model=RecordListPageResponse)
 async def read_records_paged(
     app_id: UUID,
     limit: int = 50,
-    cursor: Optional[int] = None,
+    cursor: Optional[str] = None,
     filters: Optional[str] = None,
+    query: Optional[str] = None,
     field_codes: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Get one page of records in the sort order of `query` (newest first by default).
+    Pass the returned next_cursor to fetch the following page.
+    """
     app = await AppService.get_app(db, app_id)
     if not app:
         raise HTTPException(status_code=404, detail="App not found")
@@ -121,58 +347,253 @@ async def read_records_paged(
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid filters JSON")
 
-    list_field_codes: Optional[List[str]] = None
-    if field_codes:
-        list_field_codes = [code.strip() for code in field_codes.split(",") if code.strip()]
+    list_field_codes = _list_field_codes(app, field_codes)
+
+    record_query = await _compile_record_query(db, app_id, query, current_user)
+    try:
+        page = await RecordService.get_records_paged(
+            db=db,
+            app_id=app_id,
+            limit=limit,
+            cursor=cursor,
+            filters=filter_dict,
+            field_codes=list_field_codes,
+            user=current_user,
+            app_record_acl=app.record_acl,
+            record_query=record_query,
+        )
+    except RecordCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return NegotiatedResponse(page)
 
-    return await RecordService.get_records_paged(
-        db=db,
-        app_id=app_id,
-        limit=limit,
-        cursor_record_number=cursor,
+
+@router.get("/count", response_model=RecordCountResponse)
+async def count_records(
+    app_id: UUID,
+    filters: Optional[str] = None,
+    query: Optional[str] = None,
+    search: Optional[str] = None,
+    exact: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Count the records a listing with the same filters/query/search would show.
+    Large results are the planner's estimate (exact=false) unless `exact` is requested.
+    Counts are cached for a few seconds.
+    """
+    app = await AppService.get_app(db, app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    perms = AppService.evaluate_app_permissions(app, current_user)
+    if not perms.view:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    filter_dict = {}
+    if filters:
+        try:
+            import json
+            filter_dict = json.loads(filters)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid filters JSON")
+
+    record_query = await _compile_record_query(db, app_id, query, current_user)
+    return await RecordCountService.count_records(
+        db,
+        app_id,
         filters=filter_dict,
-        field_codes=list_field_codes,
         user=current_user,
         app_record_acl=app.record_acl,
+        record_query=record_query,
+        search=search.strip() if search else None,
+        exact=exact,
+    )
+
+
+@router.post("/aggregate", response_model=RecordAggregateResponse)
+async def aggregate_records(
+    request: RecordAggregateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Group records by up to two fields and compute count/sum/avg/min/max over NUMBER fields.
+    Only records the user may view are included. Results are column-oriented.
+    """
+    app = await AppService.get_app(db, request.app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    perms = AppService.evaluate_app_permissions(app, current_user)
+    if not perms.view:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    record_query = await _compile_record_query(db, request.app_id, request.query, current_user)
+    fields = await FieldService.get_fields_by_app(db, request.app_id)
+    try:
+        return await RecordAggregateService.aggregate(
+            db,
+            request,
+            fields,
+            user=current_user,
+            app_record_acl=app.record_acl,
+            record_query=record_query,
+        )
+    except RecordAggregateError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/rollup", response_model=RecordRollupResponse)
+async def read_record_rollup(
+    app_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Record counts (and sums of the App's rollup_sum_fields) per status and rollup_group_field value,
+    read from the maintained rollups. Apps with record ACL rules are aggregated live instead.
+    """
+    app = await AppService.get_app(db, app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    perms = AppService.evaluate_app_permissions(app, current_user)
+    if not perms.view:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    rollup = RollupSettings.from_app(app)
+    if not app.record_acl:
+        groups = await RecordRollupService.get_app_rollup(db, app_id)
+    else:
+        groups = await _live_rollup(db, app, rollup, current_user)
+    return {"app_id": app_id, "group_field": rollup.group_field, "sum_fields": list(rollup.sum_fields), "groups": groups}
+
+
+async def _live_rollup(db: AsyncSession, app: App, rollup: RollupSettings, current_user: User) -> List[dict]:
+    # Same shape as the stored rollups, computed over the records the user may view.
+    fields = await FieldService.get_fields_by_app(db, app.id)
+    group_by = [{"field": "status"}]
+    if rollup.group_field:
+        group_by.append({"field": rollup.group_field})
+    request = RecordAggregateRequest(
+        app_id=app.id,
+        group_by=group_by,
+        measures=[{"op": "count"}, *({"op": "sum", "field": code} for code in rollup.sum_fields)],
+        limit=RECORD_AGGREGATE_MAX_GROUPS,
     )
+    try:
+        result = await RecordAggregateService.aggregate(
+            db, request, fields, user=current_user, app_record_acl=app.record_acl
+        )
+    except RecordAggregateError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    columns = [column["values"] for column in result["columns"]]
+    statuses = columns[0]
+    group_values = columns[1] if rollup.group_field else [None] * len(statuses)
+    counts = columns[len(group_by)]
+    sums = columns[len(group_by) + 1:]
+    return [
+        {
+            "status": status or "",
+            "group_value": group_value or None,
+            "count": count,
+            "sums": {code: total or 0.0 for code, total in zip(rollup.sum_fields, (column[row] for column in sums))},
+        }
+        for row, (status, group_value, count) in enumerate(zip(statuses, group_values, counts))
+    ]
+
+
+@router.get("/export")
+async def export_records(
+    app_id: UUID,
+    format: str = "ndjson",
+    filters: Optional[str] = None,
+    query: Optional[str] = None,
+    field_codes: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream all records of an App matching the filters as NDJSON or CSV.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be one of: " + ", ".join(EXPORT_FORMATS))
 
+    app = await AppService.get_app(db, app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    perms = AppService.evaluate_app_permissions(app, current_user)
+    if not perms.view:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    filter_dict = {}
+    if filters:
+        try:
+            import json
+            filter_dict = json.loads(filters)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid filters JSON")
 
-@router.get("/pending-approvals", response_model=List[RecordResponse])
+    list_field_codes: Optional[List[str]] = None
+    if field_codes:
+        list_field_codes = [code.strip() for code in field_codes.split(",") if code.strip()]
+
+    record_query = await _compile_record_query(db, app_id, query, current_user)
+    stream = RecordExportService.stream_csv if format == "csv" else RecordExportService.stream_ndjson
+    return StreamingResponse(
+        stream(
+            db,
+            app_id,
+            filters=filter_dict,
+            field_codes=list_field_codes,
+            user=current_user,
+            app_record_acl=app.record_acl,
+            record_query=record_query,
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="records-{app_id}.{format}"'},
+    )
+
+
+@router.get("/pending-approvals", response_model=PendingApprovalPageResponse)
 async def read_pending_approvals(
     app_id: Optional[UUID] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get records currently waiting for current user's approval.
+    Get one page of the records currently waiting for the current user's approval,
+    most recently assigned first. Pass the returned next_cursor to fetch older ones.
+    Only records of Apps the user can view are listed.
     """
-    records = await RecordService.get_pending_approvals_for_user(
-        db=db,
-        user_id=current_user.id,
-        app_id=app_id,
-    )
-
+    app_ids = None
     if current_user.is_superuser:
-        return records
-
-    app_cache = {}
-    visible = []
-    for record in records:
-        if record.app_id not in app_cache:
-            app_cache[record.app_id] = await AppService.get_app(db, record.app_id)
-        app = app_cache[record.app_id]
-        if app and AppService.evaluate_app_permissions(app, current_user).view:
-            visible.append(record)
-    return visible
+        if app_id:
+            app_ids = [app_id]
+    else:
+        # Apps are loaded in one query and each is checked once; the allowed set filters the page in SQL.
+        apps = await RecordAssigneeService.assigned_apps(db, current_user.id, app_id=app_id)
+        app_ids = [app.id for app in apps if AppService.evaluate_app_permissions(app, current_user).view]
+    try:
+        return await RecordAssigneeService.list_pending(
+            db, current_user.id, app_ids=app_ids, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{record_id}", response_model=RecordResponse)
 async def read_record(
     record_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get record by ID.
+    Get record by ID. The ETag header carries the record's revision, for If-Match on update.
     """
     record = await RecordService.get_record(db, record_id)
     if not record:
@@ -191,8 +612,83 @@ async def read_record(
     if not RecordService.check_record_permission(record, current_user, app.record_acl):
         raise HTTPException(status_code=403, detail="Not authorized to view this record")
 
+    response.headers["ETag"] = _revision_etag(record.revision)
     return record
 
+async def _get_viewable_record(db: AsyncSession, record_id: UUID, current_user: User) -> Record:
+    record = await RecordService.get_record(db, record_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Record not found")
+
+    app = await AppService.get_app(db, record.app_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="App not found")
+
+    app_perms = AppService.evaluate_app_permissions(app, current_user)
+    if not app_perms.view:
+        raise HTTPException(status_code=403, detail="Not authorized to view this app")
+
+    if not RecordService.check_record_permission(record, current_user, app.record_acl):
+        raise HTTPException(status_code=403, detail="Not authorized to view this record")
+    return record
+
+@router.get("/{record_id}/workflow/events", response_model=WorkflowEventPageResponse)
+async def read_workflow_events(
+    record_id: UUID,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get one page of the record's workflow history, newest first.
+    Pass the returned next_cursor to fetch older events.
+    """
+    await _get_viewable_record(db, record_id, current_user)
+    try:
+        return await WorkflowEventService.list_events(db, record_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{record_id}/revisions", response_model=RecordRevisionPageResponse)
+async def read_record_revisions(
+    record_id: UUID,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get one page of the record's data revisions (changed keys only), newest first.
+    """
+    await _get_viewable_record(db, record_id, current_user)
+    try:
+        return await RecordRevisionService.list_revisions(db, record_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{record_id}/as-of", response_model=RecordAsOfResponse)
+async def read_record_as_of(
+    record_id: UUID,
+    revision: Optional[int] = None,
+    at: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the record's data as of a revision, or as of a point in time (`at`, ISO 8601).
+    """
+    if (revision is None) == (at is None):
+        raise HTTPException(status_code=400, detail="Specify exactly one of revision or at")
+    if at is not None and at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+
+    record = await _get_viewable_record(db, record_id, current_user)
+    state = await RecordRevisionService.data_at(db, record, revision=revision, at=at)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return state
+
 @router.put("/{record_id}/status", response_model=RecordResponse)
 async def update_record_status(
     record_id: UUID,
@@ -207,21 +703,41 @@ async def update_record_status(
         raise HTTPException(status_code=404, detail="Record not found")
     return record
 
+def _revision_etag(revision: int) -> str:
+    return f'"{revision}"'
+
+def _expected_revision(if_match: Optional[str]) -> Optional[int]:
+    # If-Match: "<revision>" (as sent in ETag); a weak W/ prefix is accepted, * matches any revision.
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
 @router.put("/{record_id}", response_model=RecordResponse)
 async def update_record(
     record_id: UUID,
     record_update: RecordUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update Record Data.
+    With If-Match: "<revision>" the update is applied only if the record is still at that
+    revision; otherwise 409 is returned and nothing is written.
     """
-    record = await RecordService.get_record(db, record_id)
-    if not record:
+    expected_revision = _expected_revision(if_match)
+    app_id = await RecordService.get_record_app_id(db, record_id)
+    if not app_id:
         raise HTTPException(status_code=404, detail="Record not found")
 
-    app = await AppService.get_app(db, record.app_id)
+    app = await AppService.get_app(db, app_id)
     if not app:
           raise HTTPException(status_code=404, detail="App not found")
 
@@ -233,7 +749,19 @@ async def update_record(
         # For now, strict app edit permission.
         raise HTTPException(status_code=403, detail="Not authorized to edit record")
 
-    updated_record = await RecordService.update_record(db, record_id, record_update)
+    try:
+        updated_record = await RecordService.update_record(
+            db, app, record_id, record_update, actor_id=current_user.id, expected_revision=expected_revision
+        )
+    except RecordRevisionConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Record was modified (current revision {e.current_revision})",
+            headers={"ETag": _revision_etag(e.current_revision)},
+        )
+    if not updated_record:
+        raise HTTPException(status_code=404, detail="Record not found")
+    response.headers["ETag"] = _revision_etag(updated_record.revision)
     return updated_record
 
 
@@ -261,17 +789,16 @@ async def execute_workflow_action(
         updated = await RecordService.execute_workflow_action(
             db=db,
             app=app,
-            record_id=record_id,
+            record=record,
             actor=current_user,
             action_name=action_name,
             next_assignee_id=request.next_assignee_id,
             comment=request.comment,
         )
+    except WorkflowTransitionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
-
-    if not updated:
-        raise HTTPException(status_code=404, detail="Record not found")
     return updated
@@ -0,0 +1,60 @@
+"""
+Content negotiation for API responses: orjson-encoded JSON by default, MessagePack
+for clients sending `Accept: application/msgpack`.
+
+Routers opt in with APIRouter(**NEGOTIATED_ROUTER_OPTIONS). NegotiatingRoute records
+the negotiated media type for the duration of the request; NegotiatedResponse, the
+routers' default response class, renders in that format. Endpoints that build their
+own body return NegotiatedResponse(content) to get the same behaviour.
+"""
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Mapping, Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from app.core import encoding
+
+_media_type: ContextVar[str] = ContextVar("negotiated_media_type", default=encoding.JSON_MEDIA_TYPE)
+
+
+class NegotiatedResponse(Response):
+    media_type = encoding.JSON_MEDIA_TYPE
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        super().__init__(content, status_code, headers, media_type or _media_type.get(), background)
+        self.headers["Vary"] = "Accept"
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type == encoding.MSGPACK_MEDIA_TYPE:
+            return encoding.packb(content)
+        return encoding.dumps(content)
+
+
+class NegotiatingRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def negotiating_handler(request: Request) -> Response:
+            token = _media_type.set(encoding.negotiate(request.headers.get("accept", "")))
+            try:
+                return await handler(request)
+            finally:
+                _media_type.reset(token)
+
+        return negotiating_handler
+
+
+NEGOTIATED_ROUTER_OPTIONS = {
+    "route_class": NegotiatingRoute,
+    "default_response_class": NegotiatedResponse,
+}
@@ -10,6 +10,7 @@ from app.models.user import User
 from app.schemas.user_schema import UserCreate, UserResponse, UserUpdate
 from app.core.security import get_password_hash
 from app.api.deps import get_current_user
+from app.services.org_membership_service import OrgMembershipService
 
 router = APIRouter()
 
@@ -65,6 +66,7 @@ async def create_user(
     )
     db.add(user)
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(user)
     return user
 
@@ -93,6 +95,7 @@ async def update_user(
         setattr(user, key, value)
 
     await db.commit()
+    OrgMembershipService.invalidate()
     await db.refresh(user)
     return user
 
@@ -112,4 +115,5 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    OrgMembershipService.invalidate()
     return {"ok": True}
@@ -0,0 +1,45 @@
+"""
+Small in-process caches for values that may be slightly stale, e.g. record counts.
+Each worker process holds its own copy; nothing is shared between processes.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Mapping whose entries expire `ttl` seconds after being set. Holds at most
+    `maxsize` entries and drops the least recently set ones beyond that.
+    Meant for use from the event loop thread only.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
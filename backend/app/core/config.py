@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "kintone_db"
     POSTGRES_PORT: int = 5432
     TEST_DATABASE_URL: Optional[str] = None
+    # JSON/JSONB codec of database connections: "orjson" (fast) or "json" (stdlib).
+    # orjson reads integers beyond 64 bits as floats; pick "json" if data relies on them.
+    DB_JSON_CODEC: str = "orjson"
     
     @computed_field
     def SQLALCHEMY_DATABASE_URI(self) -> str:
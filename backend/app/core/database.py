@@ -1,8 +1,69 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import json
+from typing import Any
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
 
-engine = create_async_engine(
+JSON_CODECS = ("orjson", "json")
+
+
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _orjson_loads(value: Any) -> Any:
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        # Numbers outside the double range, which the stdlib parser still accepts.
+        return json.loads(bytes(value) if isinstance(value, memoryview) else value)
+
+
+def _jsonb_encoder(value: str) -> bytes:
+    # Binary jsonb is the text prefixed with its format version, 1.
+    return b"\x01" + value.encode()
+
+
+def _jsonb_decoder(value: bytes) -> Any:
+    return _orjson_loads(memoryview(value)[1:])
+
+
+async def _set_orjson_codecs(connection: Any) -> None:
+    await connection.set_type_codec(
+        "json", encoder=str.encode, decoder=_orjson_loads, schema="pg_catalog", format="binary"
+    )
+    await connection.set_type_codec(
+        "jsonb", encoder=_jsonb_encoder, decoder=_jsonb_decoder, schema="pg_catalog", format="binary"
+    )
+
+
+def create_engine(url: str, json_codec: str = settings.DB_JSON_CODEC, **kwargs: Any) -> AsyncEngine:
+    """
+    create_async_engine with the configured JSON/JSONB codec.
+
+    "orjson" serializes with orjson and registers asyncpg codecs that hand the raw
+    bytes to orjson.loads, replacing SQLAlchemy's decode-then-json.loads codecs
+    (registered on connect, so these run after and take precedence).
+    "json" keeps SQLAlchemy's stdlib codecs.
+    """
+    if json_codec not in JSON_CODECS:
+        raise ValueError(f"Unknown JSON codec {json_codec!r}; expected one of {JSON_CODECS}")
+    if json_codec == "json":
+        return create_async_engine(url, **kwargs)
+
+    engine = create_async_engine(url, json_serializer=_orjson_dumps, json_deserializer=_orjson_loads, **kwargs)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_orjson_codecs(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.run_async(_set_orjson_codecs)
+
+    return engine
+
+
+engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
     echo=True, # Enable SQL logging for dev
 )
@@ -0,0 +1,80 @@
+"""
+Response body encoders. JSON goes through orjson and matches what FastAPI's
+JSONResponse produces for the same Pydantic models (compact, UTF-8, UTC as "Z"),
+so clients cannot tell the paths apart. MessagePack carries the same values,
+with UUIDs and datetimes as the same strings.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import msgpack
+import orjson
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+_UTC_OFFSET = timedelta(0)
+
+
+def isoformat(value: datetime) -> str:
+    # Pydantic writes UTC as "Z" rather than "+00:00".
+    text = value.isoformat()
+    if value.utcoffset() == _UTC_OFFSET:
+        return text[:-6] + "Z"
+    return text
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return isoformat(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    # orjson encodes UUID, datetime and date natively; json_default covers the rest.
+    return orjson.dumps(content, default=json_default, option=orjson.OPT_UTC_Z)
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=json_default, use_bin_type=True)
+
+
+def negotiate(accept: str) -> str:
+    """
+    Media type for an Accept header: MessagePack when the client ranks it above JSON
+    (an explicit type beats a wildcard of the same quality), JSON otherwise.
+    """
+    qualities = {"json": 0.0, "wildcard": 0.0, "msgpack": 0.0}
+    for part in (accept or "").split(","):
+        media_type, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.strip().lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            kind = "msgpack"
+        elif media_type == JSON_MEDIA_TYPE:
+            kind = "json"
+        elif media_type in ("application/*", "*/*"):
+            kind = "wildcard"
+        else:
+            continue
+        qualities[kind] = max(qualities[kind], quality)
+    msgpack_quality = qualities["msgpack"]
+    if msgpack_quality > qualities["json"] and msgpack_quality >= qualities["wildcard"]:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
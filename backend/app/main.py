@@ -35,6 +35,7 @@ from app.api.upload import router as upload_router
 from app.api.organization import router as organization_router
 from app.api.users import router as users_router
 from app.api.notifications import router as notifications_router
+from app.api.jobs import router as jobs_router
 
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(apps_router, prefix="/api/v1/apps", tags=["apps"])
@@ -44,6 +45,7 @@ app.include_router(upload_router, prefix="/api/v1/files", tags=["files"])
 app.include_router(organization_router, prefix="/api/v1/organization", tags=["organization"])
 app.include_router(users_router, prefix="/api/v1/users", tags=["users"])
 app.include_router(notifications_router, prefix="/api/v1/notifications", tags=["notifications"])
+app.include_router(jobs_router, prefix="/api/v1/jobs", tags=["jobs"])
 
 @app.get("/")
 def root():
@@ -1,4 +1,5 @@
 from .organization import Department, JobTitle
 from .user import User
-from .models import App, Field, Record
+from .models import App, AppRecordCounter, Field, Record, RecordAssignee, RecordRevision, RecordRollup, WorkflowEvent
 from .notification import Notification
+from .job import Job
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, BigInteger
-from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, JSON, DateTime, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import uuid
 from app.core.database import Base
@@ -70,6 +70,8 @@ class Record(Base):
     record_number = Column(BigInteger, nullable=False) # User-friendly ID
     data = Column(JSONB, default={}) # The actual dynamic data
     status = Column(String, default="Draft") # Workflow status
+    # Incremented by every data update; each revision after the first is logged in record_revisions.
+    revision = Column(Integer, nullable=False, server_default="1")
     
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     workflow_requester_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
@@ -77,9 +79,80 @@ class Record(Base):
     workflow_current_step = Column(Integer, default=0, nullable=False)
     workflow_submitted_at = Column(DateTime(timezone=True), nullable=True)
     workflow_decided_at = Column(DateTime(timezone=True), nullable=True)
-    workflow_history = Column(JSONB, default=[])  # [{actor_id, action, comment, at}]
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Full-text search tokens of the text fields, written together with data (see RecordSearchService).
+    # Deferred: only used in WHERE/ORDER BY, never loaded with the record.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
 
     # Relationships
     app = relationship("App", back_populates="records")
+
+class AppRecordCounter(Base):
+    __tablename__ = "app_record_counters"
+
+    # One row per app; last_number is the highest record_number handed out so far.
+    app_id = Column(UUID(as_uuid=True), ForeignKey("apps.id", ondelete="CASCADE"), primary_key=True)
+    last_number = Column(BigInteger, nullable=False, default=0)
+
+class RecordRollup(Base):
+    __tablename__ = "record_rollups"
+
+    # Record count and NUMBER field sums per (app, status, grouping field value), kept in step
+    # with every record write (see RecordRollupService). group_value is "" when the App has no
+    # grouping field configured or the record has no value for it.
+    app_id = Column(UUID(as_uuid=True), ForeignKey("apps.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, primary_key=True)
+    group_value = Column(String, primary_key=True, default="")
+    record_count = Column(BigInteger, nullable=False, default=0)
+    sums = Column(JSONB, nullable=False, default={})  # {field_code: sum}
+
+class WorkflowEvent(Base):
+    __tablename__ = "workflow_events"
+    # A record's history is read newest first: WHERE record_id = ? AND id < cursor ORDER BY id DESC.
+    __table_args__ = (Index("ix_workflow_events_record_id_id", "record_id", "id"),)
+
+    # One row per executed workflow action; rows are only ever inserted.
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    record_id = Column(UUID(as_uuid=True), ForeignKey("records.id", ondelete="CASCADE"), nullable=False)
+    app_id = Column(UUID(as_uuid=True), ForeignKey("apps.id", ondelete="CASCADE"), nullable=False)
+    # Deleting a user keeps the history and forgets who acted.
+    actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    action = Column(String, nullable=False)
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=True)
+    comment = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class RecordAssignee(Base):
+    __tablename__ = "record_assignees"
+    # A user's approval inbox is read newest assignment first:
+    # WHERE user_id = ? [AND app_id = ?] AND (assigned_at, record_id) < cursor ORDER BY assigned_at DESC, record_id DESC.
+    __table_args__ = (
+        Index("ix_record_assignees_user_id_assigned_at", "user_id", "assigned_at", "record_id"),
+        Index("ix_record_assignees_user_id_app_id_assigned_at", "user_id", "app_id", "assigned_at", "record_id"),
+    )
+
+    # One row per user in a record's workflow_approver_ids, rewritten by every workflow transition.
+    record_id = Column(UUID(as_uuid=True), ForeignKey("records.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    app_id = Column(UUID(as_uuid=True), ForeignKey("apps.id", ondelete="CASCADE"), nullable=False)
+    assigned_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class RecordRevision(Base):
+    __tablename__ = "record_revisions"
+    __table_args__ = (Index("ix_record_revisions_record_id_revision", "record_id", "revision", unique=True),)
+
+    # One row per data update holding only the keys it changed (see RecordRevisionService).
+    # snapshot is the full data as of the revision; it is stored on a base row for the revision
+    # a record had before its first logged update and on every REVISION_SNAPSHOT_INTERVAL-th
+    # revision, and reads replay the deltas after the nearest one.
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    record_id = Column(UUID(as_uuid=True), ForeignKey("records.id", ondelete="CASCADE"), nullable=False)
+    app_id = Column(UUID(as_uuid=True), ForeignKey("apps.id", ondelete="CASCADE"), nullable=False)
+    revision = Column(Integer, nullable=False)
+    # Deleting a user keeps the revisions and forgets who made them.
+    actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    delta = Column(JSONB, nullable=False, default={})  # {field_code: new value} for the changed keys
+    snapshot = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -51,3 +51,11 @@ class ProcessManagementUpdate(BaseModel):
 class ViewSettingsUpdate(BaseModel):
     list_fields: Optional[List[str]] = None
     form_columns: Optional[int] = Field(default=None, ge=1, le=3)
+    # Record rollups (status counts): an optional DROP_DOWN/RADIO_BUTTON field to split them by
+    # ("" clears it) and NUMBER fields to sum.
+    rollup_group_field: Optional[str] = None
+    rollup_sum_fields: Optional[List[str]] = Field(default=None, max_length=10)
+
+class AppStatusCounts(BaseModel):
+    app_id: UUID
+    counts: Dict[str, int]
@@ -16,6 +16,8 @@ class FieldCreate(FieldBase):
 class FieldResponse(FieldBase):
     id: UUID
     app_id: UUID
+    # Per-field record index requested via config.indexed: ready / building / pending.
+    index_state: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: str  # pending / running / succeeded / failed
+    processed: int = 0
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_by: UUID
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field as PydanticField
-from typing import Optional, Any, Dict, List
+from pydantic import BaseModel, Field as PydanticField, model_validator
+from typing import Optional, Any, Dict, List, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -12,16 +12,63 @@ class RecordBase(BaseModel):
 class RecordCreate(RecordBase):
     pass
 
-class RecordUpdate(BaseModel):
+# Upper bound for one bulk create request.
+RECORD_BULK_MAX_ITEMS = 10000
+
+
+class RecordBulkCreate(BaseModel):
+    records: List[RecordCreate] = PydanticField(min_length=1, max_length=RECORD_BULK_MAX_ITEMS)
+
+
+class RecordBulkCreatedItem(BaseModel):
+    id: UUID
+    record_number: int
+
+
+class RecordBulkCreateResponse(BaseModel):
+    items: List[RecordBulkCreatedItem]
+
+
+class RecordBulkSelection(BaseModel):
+    app_id: UUID
+    ids: Optional[List[UUID]] = PydanticField(default=None, max_length=RECORD_BULK_MAX_ITEMS)
+    filters: Optional[Dict[str, Any]] = PydanticField(
+        default=None, description="Same format as the list endpoint filters; ignored when ids is given"
+    )
+    query: Optional[str] = PydanticField(
+        default=None, description="Record query expression; combined with filters, ignored when ids is given"
+    )
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.ids is None and self.filters is None and not self.query:
+            raise ValueError("either ids, filters or query is required")
+        return self
+
+
+class RecordBulkUpdate(RecordBulkSelection):
     data: Optional[Dict[str, Any]] = None
     status: Optional[str] = None
 
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.data and not self.status:
+            raise ValueError("data or status is required")
+        return self
+
+
+class RecordBulkDelete(RecordBulkSelection):
+    pass
+
+
+class RecordBulkResult(BaseModel):
+    affected: int
+
+
+class RecordUpdate(BaseModel):
+    data: Optional[Dict[str, Any]] = None
+    status: Optional[str] = None
 
-class WorkflowEvent(BaseModel):
-    actor_id: UUID
-    action: str
-    comment: Optional[str] = None
-    at: datetime
 
 class RecordResponse(RecordBase):
     id: UUID
@@ -32,7 +79,7 @@ class RecordResponse(RecordBase):
     workflow_current_step: int = 0
     workflow_submitted_at: Optional[datetime] = None
     workflow_decided_at: Optional[datetime] = None
-    workflow_history: List[WorkflowEvent] = PydanticField(default_factory=list)
+    revision: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -55,5 +102,114 @@ class RecordListResponse(BaseModel):
 
 class RecordListPageResponse(BaseModel):
     items: List[RecordListResponse]
-    next_cursor: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_next: bool
+
+
+class WorkflowEventResponse(BaseModel):
+    id: int
+    actor_id: Optional[UUID] = None
+    action: str
+    from_status: Optional[str] = None
+    to_status: Optional[str] = None
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WorkflowEventPageResponse(BaseModel):
+    items: List[WorkflowEventResponse]
+    next_cursor: Optional[str] = None
+    has_next: bool
+
+
+class PendingApprovalPageResponse(BaseModel):
+    items: List[RecordResponse]
+    next_cursor: Optional[str] = None
+    has_next: bool
+
+
+class RecordRevisionResponse(BaseModel):
+    revision: int
+    actor_id: Optional[UUID] = None
+    delta: Dict[str, Any] = PydanticField(description="Data keys changed by this revision, with their new values")
+    created_at: datetime
+
+
+class RecordRevisionPageResponse(BaseModel):
+    items: List[RecordRevisionResponse]
+    next_cursor: Optional[str] = None
     has_next: bool
+
+
+class RecordAsOfResponse(BaseModel):
+    record_id: UUID
+    revision: int
+    data: Dict[str, Any]
+    revised_at: Optional[datetime] = None
+
+
+class RecordCountResponse(BaseModel):
+    count: int
+    exact: bool = PydanticField(description="False when count is the query planner's estimate")
+
+
+# Upper bound for the number of groups one aggregation returns.
+RECORD_AGGREGATE_MAX_GROUPS = 10000
+
+
+class RecordAggregateGroupBy(BaseModel):
+    field: str = PydanticField(description="Field code, or status / created_by / created_at / updated_at")
+    interval: Optional[Literal["day", "week", "month"]] = PydanticField(
+        default=None, description="Required for DATE/DATETIME fields and created_at/updated_at"
+    )
+
+
+class RecordAggregateMeasure(BaseModel):
+    op: Literal["count", "sum", "avg", "min", "max"]
+    field: Optional[str] = PydanticField(default=None, description="NUMBER field code; not used by count")
+
+    @model_validator(mode="after")
+    def check_field(self):
+        if self.op != "count" and not self.field:
+            raise ValueError(f"{self.op} requires a NUMBER field")
+        return self
+
+
+class RecordAggregateRequest(BaseModel):
+    app_id: UUID
+    group_by: List[RecordAggregateGroupBy] = PydanticField(default=[], max_length=2)
+    measures: List[RecordAggregateMeasure] = PydanticField(
+        default_factory=lambda: [RecordAggregateMeasure(op="count")], min_length=1, max_length=20
+    )
+    filters: Optional[Dict[str, Any]] = PydanticField(default=None, description="Same format as the list endpoint filters")
+    query: Optional[str] = PydanticField(default=None, description="Record query expression (its order by is ignored)")
+    timezone: str = PydanticField(default="UTC", description="Time zone for day/week/month buckets")
+    limit: int = PydanticField(default=1000, ge=1, le=RECORD_AGGREGATE_MAX_GROUPS)
+
+
+class RecordAggregateColumn(BaseModel):
+    name: str
+    values: List[Any]
+
+
+class RecordAggregateResponse(BaseModel):
+    # Column-oriented: the group columns, then one column per measure, all of equal length.
+    columns: List[RecordAggregateColumn]
+    truncated: bool = PydanticField(description="True when there were more than `limit` groups")
+
+
+class RecordRollupGroup(BaseModel):
+    status: str
+    group_value: Optional[str] = None
+    count: int
+    sums: Dict[str, float] = {}
+
+
+class RecordRollupResponse(BaseModel):
+    app_id: UUID
+    group_field: Optional[str] = None
+    sum_fields: List[str] = []
+    groups: List[RecordRollupGroup]
@@ -6,6 +6,7 @@ from app.models.models import App, Field
 from app.models.user import User
 from app.schemas.app_schema import AppCreate, AppUpdate, ProcessManagementUpdate, ViewSettingsUpdate, AppUserPermissions
 from sqlalchemy.orm.attributes import flag_modified
+from app.services.record_rollup_service import ROLLUP_GROUP_TYPES, ROLLUP_SUM_TYPES
 
 class AppService:
     @staticmethod
@@ -33,6 +34,22 @@ class AppService:
                     f"status '{status_name}': field_code '{field_code}' must be USER_SELECTION, got '{field_type}'"
                 )
 
+    @staticmethod
+    async def _validate_rollup_settings(db: AsyncSession, app_id: UUID, view_update: ViewSettingsUpdate) -> None:
+        result = await db.execute(select(Field.code, Field.type).where(Field.app_id == app_id))
+        field_type_by_code = {code: field_type for code, field_type in result.all()}
+
+        if view_update.rollup_group_field:
+            field_type = field_type_by_code.get(view_update.rollup_group_field)
+            if field_type not in ROLLUP_GROUP_TYPES:
+                raise ValueError(
+                    f"rollup_group_field '{view_update.rollup_group_field}' must be one of: "
+                    + ", ".join(ROLLUP_GROUP_TYPES)
+                )
+        for code in view_update.rollup_sum_fields or []:
+            if field_type_by_code.get(code) not in ROLLUP_SUM_TYPES:
+                raise ValueError(f"rollup_sum_fields: '{code}' must be a NUMBER field")
+
     @staticmethod
     def evaluate_app_permissions(app: App, user: User) -> AppUserPermissions:
         if user.is_superuser:
@@ -199,11 +216,17 @@ class AppService:
         if not app:
             return None
         
+        await AppService._validate_rollup_settings(db, app_id, view_update)
+
         current_settings = app.view_settings or {}
         if view_update.list_fields is not None:
             current_settings["list_fields"] = view_update.list_fields
         if view_update.form_columns is not None:
             current_settings["form_columns"] = view_update.form_columns
+        if view_update.rollup_group_field is not None:
+            current_settings["rollup_group_field"] = view_update.rollup_group_field or None
+        if view_update.rollup_sum_fields is not None:
+            current_settings["rollup_sum_fields"] = list(dict.fromkeys(view_update.rollup_sum_fields))
         
         app.view_settings = current_settings
         flag_modified(app, "view_settings")
@@ -0,0 +1,195 @@
+import hashlib
+import logging
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.future import select
+from app.models.models import Field, Record
+
+logger = logging.getLogger(__name__)
+
+# How each field type is indexed: the value is cast to this SQL type.
+INDEXED_VALUE_TYPES = {
+    "NUMBER": "numeric",
+    "DATE": "timestamptz",
+    "DATETIME": "timestamptz",
+    "SINGLE_LINE_TEXT": "text",
+    "DROP_DOWN": "text",
+    "RADIO_BUTTON": "text",
+}
+
+# Text fields that may request a trigram index (`config.trigramIndexed`) for substring search.
+TRIGRAM_INDEXED_TYPES = {"SINGLE_LINE_TEXT", "MULTI_LINE_TEXT", "LINK"}
+
+INDEX_NAME_PREFIX = "ix_rf_"
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class FieldIndexService:
+    @staticmethod
+    def value_expression(field_type: str, code: str) -> Any:
+        """
+        Typed SQL expression for a field value, e.g. kintone_to_numeric(data ->> 'amount').
+        The field code is rendered inline (not as a bind parameter) so that
+        filters built from this expression match the per-field index.
+        """
+        raw = FieldIndexService.text_expression(code)
+        value_type = INDEXED_VALUE_TYPES.get(field_type, "text")
+        if value_type == "numeric":
+            return func.kintone_to_numeric(raw)
+        if value_type == "timestamptz":
+            return func.kintone_to_timestamptz(raw)
+        return raw
+
+    @staticmethod
+    def is_indexed(field: Field) -> bool:
+        return bool((field.config or {}).get("indexed")) and field.type in INDEXED_VALUE_TYPES
+
+    @staticmethod
+    def is_trigram_indexed(field: Field) -> bool:
+        return bool((field.config or {}).get("trigramIndexed")) and field.type in TRIGRAM_INDEXED_TYPES
+
+    @staticmethod
+    def text_expression(code: str) -> Any:
+        """data ->> 'code' with the code inline, matching the per-field trigram index."""
+        return Record.data.op("->>")(literal_column(_sql_string(code)))
+
+    @staticmethod
+    def _name(app_id: UUID, key: str) -> str:
+        # Stable per (app, key): re-syncing fields keeps existing indexes,
+        # while a type change produces a new name and therefore a rebuild.
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"{INDEX_NAME_PREFIX}{app_id.hex}_{digest[:10]}"
+
+    @staticmethod
+    def index_name(app_id: UUID, field: Field) -> str:
+        return FieldIndexService._name(app_id, f"{field.code}:{INDEXED_VALUE_TYPES[field.type]}")
+
+    @staticmethod
+    def trigram_index_name(app_id: UUID, field: Field) -> str:
+        return FieldIndexService._name(app_id, f"{field.code}:trgm")
+
+    @staticmethod
+    def create_index_sql(app_id: UUID, field: Field) -> str:
+        expression = FieldIndexService.value_expression(field.type, field.code).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        # record_number is the tiebreaker for sorted listings, so it is part of the key.
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {FieldIndexService.index_name(app_id, field)} "
+            f"ON records (({expression}), record_number) "
+            f"WHERE app_id = {_sql_string(str(app_id))}::uuid"
+        )
+
+    @staticmethod
+    def create_trigram_index_sql(app_id: UUID, field: Field) -> str:
+        # GIN trigram index on the raw text: serves ILIKE '%...%' (and `like` in record queries).
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {FieldIndexService.trigram_index_name(app_id, field)} "
+            f"ON records USING gin ((data ->> {_sql_string(field.code)}) gin_trgm_ops) "
+            f"WHERE app_id = {_sql_string(str(app_id))}::uuid"
+        )
+
+    @staticmethod
+    def field_indexes(app_id: UUID, field: Field) -> Dict[str, str]:
+        """Index name -> CREATE INDEX statement for every index the field's config requests."""
+        indexes: Dict[str, str] = {}
+        if FieldIndexService.is_indexed(field):
+            indexes[FieldIndexService.index_name(app_id, field)] = FieldIndexService.create_index_sql(app_id, field)
+        if FieldIndexService.is_trigram_indexed(field):
+            indexes[FieldIndexService.trigram_index_name(app_id, field)] = (
+                FieldIndexService.create_trigram_index_sql(app_id, field)
+            )
+        return indexes
+
+    @staticmethod
+    def requests_indexes(field: Field) -> bool:
+        return FieldIndexService.is_indexed(field) or FieldIndexService.is_trigram_indexed(field)
+
+    @staticmethod
+    async def _existing_indexes(conn: Any, app_id: UUID) -> Dict[str, bool]:
+        # index name -> valid flag
+        result = await conn.execute(
+            text(
+                """
+                SELECT c.relname, i.indisvalid
+                FROM pg_class c
+                JOIN pg_index i ON i.indexrelid = c.oid
+                WHERE c.relname LIKE :pattern
+                """
+            ),
+            {"pattern": f"{INDEX_NAME_PREFIX}{app_id.hex}_%"},
+        )
+        return {name: valid for name, valid in result.all()}
+
+    @staticmethod
+    async def sync_app_indexes(engine: AsyncEngine, app_id: UUID) -> None:
+        """
+        Create indexes for fields configured with `indexed` or `trigramIndexed`, and drop indexes of
+        fields that were removed or no longer request one. Uses CREATE/DROP INDEX
+        CONCURRENTLY, so it runs on its own autocommit connection and never holds
+        a write-blocking lock on records.
+        """
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            result = await conn.execute(
+                select(Field.code, Field.type, Field.config).where(Field.app_id == app_id)
+            )
+            wanted: Dict[str, Tuple[Field, str]] = {}
+            for code, field_type, config in result.all():
+                field = Field(code=code, type=field_type, config=config)
+                for name, statement in FieldIndexService.field_indexes(app_id, field).items():
+                    wanted[name] = (field, statement)
+
+            existing = await FieldIndexService._existing_indexes(conn, app_id)
+            for name, valid in existing.items():
+                # Invalid indexes are leftovers of an interrupted build: drop and rebuild them.
+                if name not in wanted or not valid:
+                    await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            for name, (field, statement) in wanted.items():
+                if existing.get(name):
+                    continue
+                try:
+                    await conn.execute(text(statement))
+                except Exception:
+                    logger.exception("failed to build index %s for field %s", name, field.code)
+
+    @staticmethod
+    async def attach_index_states(db: AsyncSession, app_id: UUID, fields: List[Field]) -> List[Field]:
+        """
+        Set `index_state` on each field: None when no index is requested, otherwise
+        "ready", "building" or "pending" (requested but not built yet / failed).
+        A field with several indexes reports its least ready one.
+        """
+        if not any(FieldIndexService.requests_indexes(field) for field in fields):
+            return fields
+
+        result = await db.execute(
+            text(
+                """
+                SELECT c.relname, i.indisvalid, p.pid IS NOT NULL AS building
+                FROM pg_class c
+                JOIN pg_index i ON i.indexrelid = c.oid
+                LEFT JOIN pg_stat_progress_create_index p ON p.index_relid = c.oid
+                WHERE c.relname LIKE :pattern
+                """
+            ),
+            {"pattern": f"{INDEX_NAME_PREFIX}{app_id.hex}_%"},
+        )
+        states = {}
+        for name, valid, building in result.all():
+            states[name] = "ready" if valid else ("building" if building else "pending")
+
+        for field in fields:
+            names = FieldIndexService.field_indexes(app_id, field)
+            if names:
+                field_states = {states.get(name, "pending") for name in names}
+                field.index_state = next(
+                    state for state in ("pending", "building", "ready") if state in field_states
+                )
+        return fields
@@ -0,0 +1,85 @@
+"""
+Background jobs (purges, imports) and their progress.
+
+A job runs in the worker process that accepted its request, but its status,
+progress and result are kept in the jobs table, so GET /jobs/{id} answers the
+same from every worker. A job whose worker exits before it finishes is left
+"running".
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.future import select
+
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs stay queryable for this long.
+JOB_RETENTION = timedelta(hours=1)
+
+ProgressReport = Callable[[int], Awaitable[None]]
+
+
+class JobService:
+    @staticmethod
+    async def create_job(db: AsyncSession, kind: str, user_id: UUID, total: Optional[int] = None) -> Job:
+        await JobService._prune(db)
+        job = Job(
+            id=uuid4(),
+            kind=kind,
+            status="pending",
+            processed=0,
+            total=total,
+            created_by=user_id,
+            created_at=datetime.now(timezone.utc),
+        )
+        db.add(job)
+        await db.commit()
+        return job
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: UUID) -> Optional[Job]:
+        # The job is written by another session (and possibly another worker): always reload it.
+        result = await db.execute(select(Job).where(Job.id == job_id).execution_options(populate_existing=True))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def run(
+        engine: AsyncEngine, job: Job, work: Callable[[ProgressReport], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> None:
+        """
+        Execute `work` for a job, recording its status in the jobs table. `work` is given an
+        async report(processed) callback for its progress and returns the job result payload.
+        """
+        async with AsyncSession(bind=engine) as session:
+
+            async def report(processed: int) -> None:
+                await JobService._update(session, job.id, processed=processed)
+
+            await JobService._update(session, job.id, status="running")
+            try:
+                result = await work(report)
+            except Exception as exc:
+                logger.exception("job %s (%s) failed", job.id, job.kind)
+                await JobService._update(
+                    session, job.id, status="failed", error=str(exc), finished_at=datetime.now(timezone.utc)
+                )
+            else:
+                await JobService._update(
+                    session, job.id, status="succeeded", result=result, finished_at=datetime.now(timezone.utc)
+                )
+
+    @staticmethod
+    async def _update(session: AsyncSession, job_id: UUID, **values: Any) -> None:
+        await session.execute(update(Job).where(Job.id == job_id).values(**values))
+        await session.commit()
+
+    @staticmethod
+    async def _prune(db: AsyncSession) -> None:
+        cutoff = datetime.now(timezone.utc) - JOB_RETENTION
+        await db.execute(delete(Job).where(Job.finished_at < cutoff))
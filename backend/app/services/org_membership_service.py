@@ -0,0 +1,77 @@
+"""
+Organization membership index for workflow assignee resolution: the users in each
+department and holding each job title.
+
+Members are cached per department / job title, and every uncached one in a lookup is
+read with a single query. The cache is cleared whenever users, departments or job
+titles change in this process; its TTL bounds how long another worker process can
+keep serving memberships from before such a change.
+"""
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import TTLCache
+from app.models.user import User
+
+MEMBERSHIP_CACHE_TTL_SECONDS = 60.0
+
+# ("department" | "job_title", id) -> ids (as strings) of the users in it.
+MEMBERSHIP_CACHE: TTLCache[FrozenSet[str]] = TTLCache(ttl=MEMBERSHIP_CACHE_TTL_SECONDS, maxsize=4096)
+
+
+def _uuids(values: Iterable[object]) -> List[UUID]:
+    # Entity ids come from App settings as strings; one that is not a UUID matches no one.
+    ids = []
+    for value in values:
+        try:
+            ids.append(value if isinstance(value, UUID) else UUID(str(value)))
+        except ValueError:
+            continue
+    return ids
+
+
+class OrgMembershipService:
+    @staticmethod
+    async def members(
+        db: AsyncSession, department_ids: Iterable[object] = (), job_title_ids: Iterable[object] = ()
+    ) -> Set[str]:
+        """Ids of the users in any of the departments or holding any of the job titles."""
+        keys: List[Tuple[str, UUID]] = [("department", eid) for eid in _uuids(department_ids)]
+        keys += [("job_title", eid) for eid in _uuids(job_title_ids)]
+
+        user_ids: Set[str] = set()
+        missing: List[Tuple[str, UUID]] = []
+        for key in keys:
+            cached = MEMBERSHIP_CACHE.get(key)
+            if cached is None:
+                missing.append(key)
+            else:
+                user_ids |= cached
+        if not missing:
+            return user_ids
+
+        departments = [eid for kind, eid in missing if kind == "department"]
+        job_titles = [eid for kind, eid in missing if kind == "job_title"]
+        result = await db.execute(
+            select(User.id, User.department_id, User.job_title_id).where(
+                or_(User.department_id.in_(departments), User.job_title_id.in_(job_titles))
+            )
+        )
+        found: Dict[Tuple[str, UUID], Set[str]] = {key: set() for key in missing}
+        for user_id, department_id, job_title_id in result.all():
+            for key in (("department", department_id), ("job_title", job_title_id)):
+                if key in found:
+                    found[key].add(str(user_id))
+        for key, members in found.items():
+            MEMBERSHIP_CACHE.set(key, frozenset(members))
+            user_ids |= members
+        return user_ids
+
+    @staticmethod
+    def invalidate() -> None:
+        """Forget all cached memberships; call after committing a change to users or the organization."""
+        MEMBERSHIP_CACHE.clear()
@@ -0,0 +1,158 @@
+"""
+Group-by aggregations over records, computed in PostgreSQL.
+
+One statement per request:
+
+    SELECT <group keys>, count(*), sum(kintone_to_numeric(data ->> 'amount')), ...
+    FROM records [LEFT JOIN LATERAL jsonb_array_elements_text(...) ON true]
+    WHERE <app, record ACL, filters, query>
+    GROUP BY <group keys> ORDER BY <group keys> LIMIT :limit + 1
+
+Field values are read with the same typed casts as the per-field indexes. Multi-value
+fields (USER_SELECTION) count a record once per selected user. Results are returned
+column by column, which is what chart and pivot components consume.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import Date, Float, Text, case, cast, func, literal, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.models import App, Field, Record
+from app.models.user import User
+from app.schemas.record_schema import (
+    RECORD_AGGREGATE_MAX_GROUPS,
+    RecordAggregateGroupBy,
+    RecordAggregateMeasure,
+    RecordAggregateRequest,
+)
+from app.services.field_index_service import FieldIndexService
+from app.services.record_query import CompiledQuery
+from app.services.record_service import RecordService
+
+GROUPABLE_TYPES = {"DROP_DOWN", "RADIO_BUTTON", "USER_SELECTION", "DATE", "DATETIME"}
+DATE_TYPES = {"DATE", "DATETIME"}
+MULTI_VALUE_TYPES = {"USER_SELECTION"}
+MEASURABLE_TYPES = {"NUMBER"}
+
+SYSTEM_GROUP_COLUMNS = {
+    "status": Record.status,
+    "created_by": cast(Record.created_by, Text),
+    "created_at": Record.created_at,
+    "updated_at": Record.updated_at,
+}
+SYSTEM_DATE_COLUMNS = {"created_at", "updated_at"}
+
+MEASURE_FUNCTIONS = {"sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max}
+
+
+class RecordAggregateError(ValueError):
+    pass
+
+
+class RecordAggregateService:
+    @staticmethod
+    def _date_bucket(local_value: Any, interval: Optional[str], name: str) -> Any:
+        # `local_value` is a timestamp without time zone; returns its bucket's first day as a date.
+        if not interval:
+            raise RecordAggregateError(f"grouping by {name} requires an interval (day, week or month)")
+        return cast(func.date_trunc(interval, local_value), Date)
+
+    @staticmethod
+    def _group_key(
+        query: Any, group: RecordAggregateGroupBy, position: int, fields: Dict[str, Field], timezone: Any
+    ) -> tuple:
+        """Returns (query, key expression): multi-value fields add a lateral join to the query."""
+        if group.field in SYSTEM_GROUP_COLUMNS:
+            column = SYSTEM_GROUP_COLUMNS[group.field]
+            if group.field in SYSTEM_DATE_COLUMNS:
+                local = func.timezone(timezone, column)
+                return query, RecordAggregateService._date_bucket(local, group.interval, group.field)
+            return query, column
+
+        field = fields.get(group.field)
+        if field is None:
+            raise RecordAggregateError(f"unknown field: {group.field}")
+        if field.type not in GROUPABLE_TYPES:
+            raise RecordAggregateError(f"cannot group by {field.code} ({field.type})")
+
+        if field.type in DATE_TYPES:
+            value = FieldIndexService.value_expression(field.type, field.code)
+            # DATETIME values are bucketed in the requested time zone. DATE values are calendar days,
+            # cast to UTC midnight, so they are read back in UTC and never shift to a neighbouring day.
+            local = func.timezone(timezone if field.type == "DATETIME" else "UTC", value)
+            return query, RecordAggregateService._date_bucket(local, group.interval, field.code)
+        if field.type in MULTI_VALUE_TYPES:
+            raw = Record.data[field.code]
+            values = case((func.jsonb_typeof(raw) == "array", raw), else_=func.jsonb_build_array(raw))
+            elements = func.jsonb_array_elements_text(values).table_valued("value").lateral(f"group_{position}")
+            return query.outerjoin(elements, true()), elements.c.value
+        return query, FieldIndexService.text_expression(field.code)
+
+    @staticmethod
+    def _measure(measure: RecordAggregateMeasure, fields: Dict[str, Field]) -> Any:
+        if measure.op == "count":
+            return func.count()
+        field = fields.get(measure.field or "")
+        if field is None:
+            raise RecordAggregateError(f"unknown field: {measure.field}")
+        if field.type not in MEASURABLE_TYPES:
+            raise RecordAggregateError(f"cannot {measure.op} {field.code} ({field.type})")
+        value = FieldIndexService.value_expression(field.type, field.code)
+        # Chart clients want plain numbers rather than exact decimals.
+        return cast(MEASURE_FUNCTIONS[measure.op](value), Float)
+
+    @staticmethod
+    def column_names(request: RecordAggregateRequest) -> List[str]:
+        names = [f"{group.field}:{group.interval}" if group.interval else group.field for group in request.group_by]
+        names += [measure.op if measure.op == "count" else f"{measure.op}:{measure.field}" for measure in request.measures]
+        return names
+
+    @staticmethod
+    async def aggregate(
+        db: AsyncSession,
+        request: RecordAggregateRequest,
+        fields: Sequence[Field],
+        *,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+    ) -> Dict[str, Any]:
+        try:
+            ZoneInfo(request.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise RecordAggregateError(f"unknown time zone: {request.timezone}")
+        fields_by_code = {field.code: field for field in fields}
+        timezone = literal(request.timezone)
+
+        query = select().select_from(Record)
+        keys = []
+        for position, group in enumerate(request.group_by):
+            query, key = RecordAggregateService._group_key(query, group, position, fields_by_code, timezone)
+            keys.append(key)
+        measures = [RecordAggregateService._measure(measure, fields_by_code) for measure in request.measures]
+
+        query = query.add_columns(*keys, *measures).where(RecordService._app_filter(request.app_id))
+        query = RecordService._apply_record_acl_filter(query, user, app_record_acl)
+        query = RecordService._apply_search_filters(query, request.filters)
+        query = RecordService._apply_record_query(query, record_query)
+        if keys:
+            query = query.group_by(*keys).order_by(*(key.asc().nulls_last() for key in keys))
+        query = query.limit(request.limit + 1)
+
+        rows = (await (await db.connection()).execute(query)).all()
+        truncated = len(rows) > request.limit
+        rows = rows[:request.limit]
+        names = RecordAggregateService.column_names(request)
+        values: List[List[Any]] = [list(column) for column in zip(*rows)] if rows else [[] for _ in names]
+        return {
+            "columns": [{"name": name, "values": column} for name, column in zip(names, values)],
+            "truncated": truncated,
+        }
+
+    @staticmethod
+    async def status_counts(db: AsyncSession, app: App, user: Optional[User]) -> Dict[str, int]:
+        """{status: count} over the records `user` may view, e.g. for Apps whose rollups the record ACL rules out."""
+        request = RecordAggregateRequest(app_id=app.id, group_by=[{"field": "status"}], limit=RECORD_AGGREGATE_MAX_GROUPS)
+        result = await RecordAggregateService.aggregate(db, request, [], user=user, app_record_acl=app.record_acl)
+        statuses, counts = (column["values"] for column in result["columns"])
+        return {status or "": count for status, count in zip(statuses, counts)}
@@ -0,0 +1,121 @@
+"""
+Approval inbox: record_assignees mirrors each record's workflow_approver_ids as one row
+per (record, user), so "records waiting for me" is an index range scan on
+(user_id, assigned_at) instead of a scan of every record's approver list.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Collection, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.models import App, Record, RecordAssignee
+from app.models.user import User
+
+PENDING_APPROVAL_MAX_PAGE = 200
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _user_ids(approver_ids: Sequence[str]) -> List[UUID]:
+    # Approver lists hold ids as strings; anything that is not a UUID cannot be a user.
+    ids = []
+    for value in approver_ids:
+        try:
+            ids.append(UUID(str(value)))
+        except ValueError:
+            continue
+    return ids
+
+
+def _encode_cursor(assigned_at: datetime, record_id: UUID) -> str:
+    return f"{(assigned_at - EPOCH) // timedelta(microseconds=1)}:{record_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        micros, record_id = cursor.split(":", 1)
+        return EPOCH + timedelta(microseconds=int(micros)), UUID(record_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+class RecordAssigneeService:
+    @staticmethod
+    def replace_statements(approver_ids: Sequence[str]) -> Dict[str, Any]:
+        """
+        Builders of the data-modifying CTEs that make the record_assignees rows of the updated
+        records (a CTE exposing id and app_id) match `approver_ids`, for _update_statement(chained=...).
+        Users that stay assigned get a fresh assigned_at: the transition is a new request to them.
+        """
+        user_ids = _user_ids(approver_ids)
+        statements = {
+            "unassigned": lambda updated: delete(RecordAssignee).where(
+                RecordAssignee.record_id.in_(select(updated.c.id)), RecordAssignee.user_id.notin_(user_ids)
+            )
+        }
+        if user_ids:
+            def assign(updated: Any) -> Any:
+                stmt = pg_insert(RecordAssignee).from_select(
+                    ["record_id", "user_id", "app_id", "assigned_at"],
+                    select(updated.c.id, User.id, updated.c.app_id, func.now()).join_from(
+                        updated, User, User.id.in_(user_ids)
+                    ),
+                )
+                return stmt.on_conflict_do_update(
+                    index_elements=[RecordAssignee.record_id, RecordAssignee.user_id],
+                    set_={"assigned_at": stmt.excluded.assigned_at},
+                )
+
+            statements["assigned"] = assign
+        return statements
+
+    @staticmethod
+    async def assigned_apps(db: AsyncSession, user_id: UUID, app_id: Optional[UUID] = None) -> List[App]:
+        """The Apps (optionally just `app_id`) in which the user currently has records assigned, in one query."""
+        app_ids = select(RecordAssignee.app_id).where(RecordAssignee.user_id == user_id)
+        if app_id:
+            app_ids = app_ids.where(RecordAssignee.app_id == app_id)
+        result = await db.execute(select(App).where(App.id.in_(app_ids)))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def list_pending(
+        db: AsyncSession,
+        user_id: UUID,
+        app_ids: Optional[Collection[UUID]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of the records currently assigned to the user, most recently assigned first,
+        optionally only those in `app_ids`. `cursor` is the next_cursor of the previous page.
+        """
+        limit = max(1, min(limit, PENDING_APPROVAL_MAX_PAGE))
+        after = _decode_cursor(cursor) if cursor else None
+        if app_ids is not None and not app_ids:
+            return {"items": [], "next_cursor": None, "has_next": False}
+        query = (
+            select(Record, RecordAssignee.assigned_at)
+            .join(RecordAssignee, RecordAssignee.record_id == Record.id)
+            .where(RecordAssignee.user_id == user_id)
+        )
+        if app_ids is not None:
+            query = query.where(RecordAssignee.app_id.in_(list(app_ids)))
+        if after:
+            query = query.where(tuple_(RecordAssignee.assigned_at, RecordAssignee.record_id) < tuple_(*after))
+
+        rows = (
+            await db.execute(
+                query.order_by(RecordAssignee.assigned_at.desc(), RecordAssignee.record_id.desc()).limit(limit + 1)
+            )
+        ).all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [row.Record for row in rows],
+            "next_cursor": _encode_cursor(rows[-1].assigned_at, rows[-1].Record.id) if has_next else None,
+            "has_next": has_next,
+        }
@@ -0,0 +1,110 @@
+"""
+Total counts for record listings.
+
+Counts use the same ACL, filter and query compilation as the listing itself.
+Small results are counted exactly; when the planner expects more than
+EXACT_COUNT_THRESHOLD rows, its estimate is returned instead (flagged as not
+exact), so huge Apps never pay for a full count(*) on every list view.
+Results are cached briefly per App, filter and ACL signature, and per user and
+day for queries using LOGINUSER() or TODAY(); counts of queries using NOW() are
+never cached.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.future import select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.core.cache import TTLCache
+from app.models.user import User
+from app.services.record_cursor import listing_signature
+from app.services.record_query import CompiledQuery
+from app.services.record_service import RecordService
+
+# Estimated row counts above this are returned as estimates unless an exact count is requested.
+EXACT_COUNT_THRESHOLD = 100_000
+COUNT_CACHE_TTL_SECONDS = 10.0
+
+COUNT_CACHE: TTLCache[Dict[str, Any]] = TTLCache(ttl=COUNT_CACHE_TTL_SECONDS, maxsize=4096)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, with the statement's parameters bound as usual."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Any) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def acl_signature(user: Optional[User], app_record_acl: Optional[List[dict]]) -> str:
+    # The record ACL filter depends on the rules and on who is asking (user, department, job title).
+    if not (user and app_record_acl):
+        return ""
+    source = json.dumps(
+        [app_record_acl, str(user.id), str(user.department_id), str(user.job_title_id)], sort_keys=True, default=str
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+class RecordCountService:
+    @staticmethod
+    async def estimate_rows(connection: AsyncConnection, statement: Any) -> int:
+        result = await connection.execute(Explain(statement))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    async def count_records(
+        db: AsyncSession,
+        app_id: UUID,
+        *,
+        filters: Optional[dict] = None,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+        search: Optional[str] = None,
+        exact: bool = False,
+    ) -> Dict[str, Any]:
+        """Returns {"count": n, "exact": bool} for the records a listing with these arguments would show."""
+        functions = record_query.functions if record_query else {}
+        key = (
+            listing_signature(app_id, filters, record_query.source if record_query else None),
+            search or "",
+            acl_signature(user, app_record_acl),
+            exact,
+            tuple(sorted(functions.items())),
+        )
+        # NOW() differs on every call, so such a count is never served from the cache.
+        cacheable = "NOW" not in functions
+        cached = COUNT_CACHE.get(key) if cacheable else None
+        if cached is not None:
+            return cached
+
+        target = RecordService._bulk_target_query(app_id, None, filters, user, app_record_acl, record_query)
+        if search:
+            target = RecordService._apply_full_text_search(target, search)
+        connection = await db.connection()
+
+        counted: Optional[Dict[str, Any]] = None
+        if not exact:
+            estimate = await RecordCountService.estimate_rows(connection, target)
+            if estimate > EXACT_COUNT_THRESHOLD:
+                counted = {"count": estimate, "exact": False}
+        if counted is None:
+            result = await connection.execute(select(func.count()).select_from(target.subquery()))
+            counted = {"count": int(result.scalar_one()), "exact": True}
+
+        if cacheable:
+            COUNT_CACHE.set(key, counted)
+        return counted
@@ -0,0 +1,123 @@
+"""
+Opaque keyset cursors for record listings.
+
+A cursor carries the sort key values of the last row on a page plus a signature
+of the App, filters and query it was issued for. The next page is read with
+keyset conditions ("rows sorting after these values") instead of OFFSET, so the
+cost of a page does not depend on how deep it is.
+"""
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+from app.core.security import SECRET_KEY
+from app.services.record_query import SortKey
+
+SIGNATURE_LENGTH = 16
+
+
+class RecordCursorError(ValueError):
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(key: SortKey, value: Any) -> Any:
+    if value is None:
+        return None
+    if key.kind == "record_number":
+        return int(value)
+    if key.kind == "number":
+        return Decimal(value)
+    if key.kind in ("date", "datetime"):
+        return datetime.fromisoformat(value)
+    if key.kind == "user":
+        return UUID(value)
+    return str(value)
+
+
+def _sign(payload: bytes) -> str:
+    return hmac.new(SECRET_KEY.encode("utf-8"), payload, hashlib.sha256).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def listing_signature(app_id: UUID, filters: Optional[dict], query: Optional[str]) -> str:
+    """Identifies the result set a cursor belongs to: App, filters and query (including its sort)."""
+    source = json.dumps([str(app_id), filters or {}, query or ""], sort_keys=True, default=str)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def encode_cursor(signature: str, values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        {"k": [_encode_value(value) for value in values], "s": signature},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    token = payload + b"." + _sign(payload).encode("ascii")
+    return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, signature: str, keys: Sequence[SortKey]) -> List[Any]:
+    """Return the sort key values stored in a cursor issued for the same listing."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload, mac = raw.rsplit(b".", 1)
+        if not hmac.compare_digest(mac.decode("ascii"), _sign(payload)):
+            raise RecordCursorError("Invalid cursor")
+        data = json.loads(payload)
+        values = data["k"]
+        cursor_signature = data["s"]
+    except RecordCursorError:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise RecordCursorError("Invalid cursor")
+    if cursor_signature != signature or not isinstance(values, list) or len(values) != len(keys):
+        raise RecordCursorError("Cursor does not match the current filters or sort")
+    try:
+        return [_decode_value(key, value) for key, value in zip(keys, values)]
+    except (ValueError, ArithmeticError):
+        raise RecordCursorError("Invalid cursor")
+
+
+def _equal(key: SortKey, value: Any) -> Any:
+    return key.expression.is_(None) if value is None else key.expression == value
+
+
+def _after(key: SortKey, value: Any) -> List[Any]:
+    # NULLs sort as the largest value: last in ascending order, first in descending order.
+    if key.descending:
+        if value is None:
+            return [key.expression.isnot(None)]
+        return [key.expression < value]
+    if value is None:
+        return []
+    conditions = [key.expression > value]
+    if key.nullable:
+        conditions.append(key.expression.is_(None))
+    return conditions
+
+
+def keyset_branches(keys: Sequence[SortKey], values: Sequence[Any]) -> List[List[Any]]:
+    """
+    Split "rows sorting after `values`" into disjoint branches of AND-ed conditions:
+    for each key i, the earlier keys are equal and key i is strictly after.
+    Every branch is a range on an index prefix, so each can be answered by an index
+    scan that stops after one page, instead of one OR-ed filter that scans from the start.
+    """
+    branches: List[List[Any]] = []
+    for index in range(len(keys) - 1, -1, -1):
+        prefix = [_equal(keys[position], values[position]) for position in range(index)]
+        for condition in _after(keys[index], values[index]):
+            branches.append(prefix + [condition])
+    return branches
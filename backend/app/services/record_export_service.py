@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.models import Field, Record
+from app.models.user import User
+from app.services.record_query import CompiledQuery
+from app.services.record_service import RecordService
+
+# Rows fetched per server-side cursor round trip; each batch becomes one response chunk.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Scalar columns leading every CSV row, followed by one column per field code.
+CSV_SYSTEM_COLUMNS = ["id", "record_number", "status", "created_by", "created_at", "updated_at"]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class RecordExportService:
+    @staticmethod
+    async def _stream_rows(
+        db: AsyncSession,
+        app_id: UUID,
+        filters: Optional[dict],
+        user: Optional[User],
+        app_record_acl: Optional[List[dict]],
+        record_query: Optional[CompiledQuery] = None,
+    ) -> AsyncIterator[List[Any]]:
+        # Plain column tuples through a server-side cursor: no ORM identity map,
+        # and only EXPORT_BATCH_SIZE rows are held in memory at a time.
+        query = select(
+            Record.id,
+            Record.record_number,
+            Record.status,
+            Record.created_by,
+            Record.created_at,
+            Record.updated_at,
+            Record.data,
+        ).where(RecordService._app_filter(app_id))
+        query = RecordService._apply_record_acl_filter(query, user, app_record_acl)
+        query = RecordService._apply_search_filters(query, filters)
+        query = RecordService._apply_record_query(query, record_query)
+        order_by = record_query.order_clauses() if record_query else [Record.record_number.desc()]
+        query = query.order_by(*order_by)
+
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    async def export_field_codes(db: AsyncSession, app_id: UUID, field_codes: Optional[List[str]]) -> List[str]:
+        if field_codes:
+            return field_codes
+        result = await db.execute(select(Field.code).where(Field.app_id == app_id).order_by(Field.code))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def stream_ndjson(
+        db: AsyncSession,
+        app_id: UUID,
+        *,
+        filters: Optional[dict] = None,
+        field_codes: Optional[List[str]] = None,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+    ) -> AsyncIterator[bytes]:
+        async for rows in RecordExportService._stream_rows(
+            db, app_id, filters, user, app_record_acl, record_query
+        ):
+            lines = []
+            for row in rows:
+                item: Dict[str, Any] = dict(row._mapping)
+                data = item["data"] or {}
+                if field_codes:
+                    data = {code: data[code] for code in field_codes if code in data}
+                item["data"] = data
+                lines.append(json.dumps(item, ensure_ascii=False, default=_json_default))
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    @staticmethod
+    async def stream_csv(
+        db: AsyncSession,
+        app_id: UUID,
+        *,
+        filters: Optional[dict] = None,
+        field_codes: Optional[List[str]] = None,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+    ) -> AsyncIterator[bytes]:
+        codes = await RecordExportService.export_field_codes(db, app_id, field_codes)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        # UTF-8 BOM so spreadsheet apps detect the encoding of Japanese text.
+        writer.writerow(CSV_SYSTEM_COLUMNS + codes)
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+        async for rows in RecordExportService._stream_rows(
+            db, app_id, filters, user, app_record_acl, record_query
+        ):
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                data = row.data or {}
+                writer.writerow(
+                    [_csv_cell(getattr(row, column)) for column in CSV_SYSTEM_COLUMNS]
+                    + [_csv_cell(data.get(code)) for code in codes]
+                )
+            yield buffer.getvalue().encode("utf-8")
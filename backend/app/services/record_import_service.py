@@ -0,0 +1,217 @@
+import csv
+import io
+import json
+import re
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.models import App, Field
+from app.models.user import User
+from app.schemas.record_schema import RecordCreate
+from app.services.record_service import RecordService
+
+# Valid rows are inserted (and committed) in batches of this size.
+IMPORT_BATCH_SIZE = 1000
+# Only the first errors are reported back; the failed row count is always exact.
+IMPORT_MAX_ERRORS = 1000
+
+# Export columns that are generated by the server and skipped on import.
+IGNORED_COLUMNS = {"id", "record_number", "created_by", "created_at", "updated_at"}
+# Field types that never carry a value.
+NON_VALUE_TYPES = {"LABEL"}
+
+NUMBER_SEPARATORS = re.compile(r"[,\s]")
+
+
+class RecordImportService:
+    @staticmethod
+    def _split_multi(raw: str) -> List[str]:
+        # Multi-valued cells are either a JSON array (as written by the export) or one value per line.
+        if raw.startswith("["):
+            try:
+                values = json.loads(raw)
+            except json.JSONDecodeError:
+                values = None
+            if isinstance(values, list):
+                return [str(value).strip() for value in values if str(value).strip()]
+        return [part.strip() for part in raw.splitlines() if part.strip()]
+
+    @staticmethod
+    def _coerce_number(raw: str) -> Any:
+        text = NUMBER_SEPARATORS.sub("", raw)
+        try:
+            return int(text)
+        except ValueError:
+            pass
+        try:
+            value = float(text)
+        except ValueError:
+            raise ValueError(f"'{raw}' is not a number")
+        if value != value or value in (float("inf"), float("-inf")):
+            raise ValueError(f"'{raw}' is not a number")
+        return value
+
+    @staticmethod
+    def _coerce_date(raw: str) -> str:
+        try:
+            return date.fromisoformat(raw.replace("/", "-")).isoformat()
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(raw.replace("/", "-")).date().isoformat()
+        except ValueError:
+            raise ValueError(f"'{raw}' is not a date (YYYY-MM-DD)")
+
+    @staticmethod
+    def _coerce_datetime(raw: str) -> str:
+        try:
+            value = datetime.fromisoformat(raw.replace("/", "-"))
+        except ValueError:
+            raise ValueError(f"'{raw}' is not a datetime (ISO 8601)")
+        if value.tzinfo is None:
+            # Values without an offset are taken as UTC.
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+
+    @staticmethod
+    def _check_options(field: Field, values: List[str]) -> None:
+        options = field.options
+        if not options:
+            return
+        for value in values:
+            if value not in options:
+                raise ValueError(f"'{value}' is not an option of {field.code}")
+
+    @staticmethod
+    def coerce_value(field: Field, raw: str, user_ids: Dict[str, str]) -> Any:
+        """
+        Convert a CSV cell into the JSON value stored in Record.data for the field type.
+        Raises ValueError with a user-facing message when the cell is invalid.
+        """
+        field_type = field.type
+        if field_type == "NUMBER":
+            return RecordImportService._coerce_number(raw)
+        if field_type == "DATE":
+            return RecordImportService._coerce_date(raw)
+        if field_type == "DATETIME":
+            return RecordImportService._coerce_datetime(raw)
+        if field_type in ("DROP_DOWN", "RADIO_BUTTON"):
+            RecordImportService._check_options(field, [raw])
+            return raw
+        if field_type == "CHECKBOX":
+            values = RecordImportService._split_multi(raw)
+            RecordImportService._check_options(field, values)
+            return values
+        if field_type == "USER_SELECTION":
+            resolved = []
+            for value in RecordImportService._split_multi(raw):
+                user_id = user_ids.get(value.lower())
+                if not user_id:
+                    raise ValueError(f"user '{value}' does not exist")
+                resolved.append(user_id)
+            if (field.config or {}).get("isMultiSelect"):
+                return resolved
+            if len(resolved) > 1:
+                raise ValueError(f"{field.code} accepts a single user")
+            return resolved[0]
+        return raw
+
+    @staticmethod
+    async def _load_user_ids(db: AsyncSession) -> Dict[str, str]:
+        # USER_SELECTION cells may reference users by id or by email.
+        result = await db.execute(select(User.id, User.email))
+        user_ids: Dict[str, str] = {}
+        for user_id, email in result.all():
+            user_ids[str(user_id)] = str(user_id)
+            if email:
+                user_ids[email.lower()] = str(user_id)
+        return user_ids
+
+    @staticmethod
+    def _map_columns(header: List[str], fields: List[Field]) -> Tuple[Dict[int, Any], List[Dict[str, Any]]]:
+        # Header cells match a field code first, then a field label. "status" maps to the record status.
+        by_code = {field.code: field for field in fields}
+        by_label = {field.label: field for field in fields}
+        columns: Dict[int, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        for index, name in enumerate(header):
+            name = name.strip()
+            field = by_code.get(name) or by_label.get(name)
+            if field:
+                if field.type not in NON_VALUE_TYPES:
+                    columns[index] = field
+            elif name == "status":
+                columns[index] = "status"
+            elif name and name not in IGNORED_COLUMNS:
+                errors.append({"row": 1, "column": name, "message": "column does not match any field and was ignored"})
+        return columns, errors
+
+    @staticmethod
+    async def import_csv(
+        db: AsyncSession,
+        app: App,
+        fields: List[Field],
+        source: BinaryIO,
+        user_id: UUID,
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import records from a UTF-8 CSV stream with a header row.
+        The file is read row by row; invalid rows are reported and skipped,
+        valid rows are inserted in IMPORT_BATCH_SIZE batches.
+        """
+        reader = csv.reader(io.TextIOWrapper(source, encoding="utf-8-sig", newline=""))
+        header = next(reader, None)
+        if header is None:
+            return {"inserted": 0, "failed": 0, "errors": []}
+
+        columns, errors = RecordImportService._map_columns(header, fields)
+        user_ids: Dict[str, str] = {}
+        if any(isinstance(target, Field) and target.type == "USER_SELECTION" for target in columns.values()):
+            user_ids = await RecordImportService._load_user_ids(db)
+
+        inserted = 0
+        failed = 0
+        processed = 0
+        batch: List[RecordCreate] = []
+
+        async def flush() -> None:
+            nonlocal inserted
+            if batch:
+                await RecordService.create_records_bulk(db, app, batch, user_id)
+                inserted += len(batch)
+                batch.clear()
+            if on_progress:
+                await on_progress(processed)
+
+        # Data rows start at line 2 (after the header).
+        for row_number, row in enumerate(reader, start=2):
+            processed += 1
+            data: Dict[str, Any] = {}
+            status: Optional[str] = None
+            row_errors: List[Dict[str, Any]] = []
+            for index, target in columns.items():
+                raw = row[index].strip() if index < len(row) else ""
+                if raw == "":
+                    continue
+                if target == "status":
+                    status = raw
+                    continue
+                try:
+                    data[target.code] = RecordImportService.coerce_value(target, raw, user_ids)
+                except ValueError as exc:
+                    row_errors.append({"row": row_number, "column": target.code, "message": str(exc)})
+
+            if row_errors:
+                failed += 1
+                errors.extend(row_errors[: max(0, IMPORT_MAX_ERRORS - len(errors))])
+                continue
+
+            batch.append(RecordCreate(app_id=app.id, status=status, data=data))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush()
+
+        await flush()
+        return {"inserted": inserted, "failed": failed, "errors": errors}
@@ -0,0 +1,579 @@
+"""
+kintone-style record query expressions.
+
+    amount >= 1000 and close_date < "2026-01-01" and status in ("A", "B") order by amount desc
+
+A query is tokenized and parsed once (the parse tree is cached per query text),
+then type-checked against the App's field definitions and compiled into a
+SQLAlchemy filter and sort keys. Field values are compared through the same
+typed expressions used by the per-field indexes (FieldIndexService.value_expression),
+so filters and sorts on indexed fields are answered from those indexes.
+"""
+import operator
+import re
+from dataclasses import dataclass, field as dataclass_field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import and_, func, literal, not_, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from app.models.models import Field, Record
+from app.models.user import User
+from app.services.field_index_service import FieldIndexService
+
+QUERY_MAX_LENGTH = 4000
+# Deepest parenthesized group a query may contain.
+QUERY_MAX_DEPTH = 32
+
+COMPARISON_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+# Operators allowed per value kind.
+NUMBER_OPERATORS = {"=", "!=", ">", "<", ">=", "<=", "in", "not in", "is empty", "is not empty"}
+DATETIME_OPERATORS = {"=", "!=", ">", "<", ">=", "<=", "is empty", "is not empty"}
+TEXT_OPERATORS = {"=", "!=", "in", "not in", "like", "not like", "is empty", "is not empty"}
+LONG_TEXT_OPERATORS = {"like", "not like", "is empty", "is not empty"}
+MULTI_VALUE_OPERATORS = {"in", "not in", "is empty", "is not empty"}
+STATUS_OPERATORS = {"=", "!=", "in", "not in"}
+USER_OPERATORS = {"=", "!=", "in", "not in"}
+
+# Field type -> value kind.
+FIELD_VALUE_KINDS = {
+    "NUMBER": "number",
+    "DATE": "date",
+    "DATETIME": "datetime",
+    "SINGLE_LINE_TEXT": "text",
+    "LINK": "text",
+    "DROP_DOWN": "text",
+    "RADIO_BUTTON": "text",
+    "MULTI_LINE_TEXT": "long_text",
+    "CHECKBOX": "multi",
+    "USER_SELECTION": "multi",
+}
+
+SORTABLE_KINDS = {"number", "date", "datetime", "text"}
+
+# Record columns addressable by name in queries.
+SYSTEM_FIELDS = {
+    "record_number": "record_number",
+    "status": "status",
+    "created_at": "datetime",
+    "updated_at": "datetime",
+    "created_by": "user",
+}
+
+KEYWORDS = {"and", "or", "in", "not", "like", "is", "empty", "order", "by", "asc", "desc"}
+FUNCTIONS = {"TODAY", "NOW", "LOGINUSER"}
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    | (?P<string>"(?:[^"\\]|\\.)*")
+    | (?P<number>-?\d+(?:\.\d+)?(?![\w$]))
+    | (?P<op>>=|<=|!=|=|>|<)
+    | (?P<punct>[(),])
+    | (?P<ident>[^\W\d][\w$]*|\$[\w$]*)
+    """,
+    re.VERBOSE | re.UNICODE,
+)
+
+
+class RecordQueryError(ValueError):
+    pass
+
+
+def contains_pattern(value: str) -> str:
+    """ILIKE pattern matching `value` as a literal substring (use with escape="\\")."""
+    return "%" + re.sub(r"([\\%_])", r"\\\1", value) + "%"
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str  # string | number | op | punct | ident
+    value: str
+    position: int
+
+
+@dataclass(frozen=True)
+class QueryValue:
+    kind: str  # string | number | function
+    value: str
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    operator: str
+    values: Tuple[QueryValue, ...] = ()
+
+
+@dataclass(frozen=True)
+class Group:
+    operator: str  # and | or
+    items: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class SortItem:
+    field: str
+    descending: bool
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    where: Optional[Any]
+    order_by: Tuple[SortItem, ...]
+
+
+@dataclass
+class SortKey:
+    field: str
+    kind: str
+    expression: Any
+    descending: bool
+    nullable: bool = True
+
+    def clause(self) -> Any:
+        return self.expression.desc() if self.descending else self.expression.asc()
+
+
+def record_number_key(descending: bool = True) -> SortKey:
+    return SortKey("record_number", "record_number", Record.record_number, descending, nullable=False)
+
+
+@dataclass
+class CompiledQuery:
+    where: Optional[Any]
+    order_by: List[SortKey]
+    source: str = ""
+    # Values the query's functions evaluated to (e.g. {"LOGINUSER": "<user id>"}): the same
+    # source can select different records for another user or at another time.
+    functions: Dict[str, str] = dataclass_field(default_factory=dict)
+
+    def apply(self, query: Any) -> Any:
+        if self.where is not None:
+            query = query.where(self.where)
+        return query
+
+    def sort_keys(self) -> List[SortKey]:
+        """
+        The full sort, ending with record_number as the tiebreaker (newest first by default).
+        NULLs keep the PostgreSQL default (sorted as the largest value) and the tiebreaker
+        follows the direction of the last key, so the per-field (value, record_number)
+        indexes can return rows already in order, forwards or backwards.
+        """
+        return with_tiebreaker(self.order_by)
+
+    def order_clauses(self) -> List[Any]:
+        return [key.clause() for key in self.sort_keys()]
+
+
+def with_tiebreaker(order_by: Sequence[SortKey]) -> List[SortKey]:
+    if not order_by:
+        return [record_number_key()]
+    keys = list(order_by)
+    if not any(key.kind == "record_number" for key in keys):
+        keys.append(record_number_key(keys[-1].descending))
+    return keys
+
+
+def _tokenize(text: str) -> List[Token]:
+    tokens: List[Token] = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match:
+            raise RecordQueryError(f"Unexpected character {text[position]!r} at position {position}")
+        kind = match.lastgroup
+        if kind != "ws":
+            value = match.group(kind)
+            if kind == "string":
+                value = re.sub(r"\\(.)", r"\1", value[1:-1])
+            tokens.append(Token(kind, value, position))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.index = 0
+        self.depth = 0
+
+    def _peek(self, offset: int = 0) -> Optional[Token]:
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _is_keyword(self, word: str, offset: int = 0) -> bool:
+        token = self._peek(offset)
+        return token is not None and token.kind == "ident" and token.value.lower() == word
+
+    def _is_punct(self, value: str) -> bool:
+        token = self._peek()
+        return token is not None and token.kind == "punct" and token.value == value
+
+    def _advance(self) -> Token:
+        token = self._peek()
+        if token is None:
+            raise RecordQueryError("Unexpected end of query")
+        self.index += 1
+        return token
+
+    def _expect_keyword(self, word: str) -> None:
+        if not self._is_keyword(word):
+            raise self._error(f"Expected '{word}'")
+        self.index += 1
+
+    def _expect_punct(self, value: str) -> None:
+        if not self._is_punct(value):
+            raise self._error(f"Expected '{value}'")
+        self.index += 1
+
+    def _error(self, message: str) -> RecordQueryError:
+        token = self._peek()
+        if token is None:
+            return RecordQueryError(f"{message} at end of query")
+        return RecordQueryError(f"{message} at position {token.position}")
+
+    def parse(self) -> ParsedQuery:
+        where = None
+        if self._peek() is not None and not self._is_order_by():
+            where = self._parse_or()
+        order_by: List[SortItem] = []
+        if self._is_order_by():
+            self.index += 2
+            order_by.append(self._parse_sort_item())
+            while self._is_punct(","):
+                self.index += 1
+                order_by.append(self._parse_sort_item())
+        if self._peek() is not None:
+            raise self._error(f"Unexpected {self._peek().value!r}")
+        return ParsedQuery(where=where, order_by=tuple(order_by))
+
+    def _is_order_by(self) -> bool:
+        return self._is_keyword("order") and self._is_keyword("by", 1)
+
+    def _parse_or(self) -> Any:
+        items = [self._parse_and()]
+        while self._is_keyword("or"):
+            self.index += 1
+            items.append(self._parse_and())
+        return items[0] if len(items) == 1 else Group("or", tuple(items))
+
+    def _parse_and(self) -> Any:
+        items = [self._parse_primary()]
+        while self._is_keyword("and"):
+            self.index += 1
+            items.append(self._parse_primary())
+        return items[0] if len(items) == 1 else Group("and", tuple(items))
+
+    def _parse_primary(self) -> Any:
+        if self._is_punct("("):
+            self.depth += 1
+            if self.depth > QUERY_MAX_DEPTH:
+                raise RecordQueryError("query is nested too deeply")
+            self.index += 1
+            expression = self._parse_or()
+            self._expect_punct(")")
+            self.depth -= 1
+            return expression
+        return self._parse_condition()
+
+    def _parse_sort_item(self) -> SortItem:
+        field = self._parse_field_name()
+        descending = False
+        if self._is_keyword("asc") or self._is_keyword("desc"):
+            descending = self._advance().value.lower() == "desc"
+        return SortItem(field, descending)
+
+    def _parse_field_name(self) -> str:
+        token = self._peek()
+        if token is None or token.kind != "ident" or token.value.lower() in KEYWORDS:
+            raise self._error("Expected a field code")
+        self.index += 1
+        return token.value
+
+    def _parse_condition(self) -> Condition:
+        field = self._parse_field_name()
+        token = self._peek()
+        if token is not None and token.kind == "op":
+            self.index += 1
+            return Condition(field, token.value, (self._parse_value(),))
+
+        negated = False
+        if self._is_keyword("not"):
+            negated = True
+            self.index += 1
+        if self._is_keyword("in"):
+            self.index += 1
+            self._expect_punct("(")
+            values = [self._parse_value()]
+            while self._is_punct(","):
+                self.index += 1
+                values.append(self._parse_value())
+            self._expect_punct(")")
+            return Condition(field, "not in" if negated else "in", tuple(values))
+        if self._is_keyword("like"):
+            self.index += 1
+            return Condition(field, "not like" if negated else "like", (self._parse_value(),))
+        if not negated and self._is_keyword("is"):
+            self.index += 1
+            is_not = self._is_keyword("not")
+            if is_not:
+                self.index += 1
+            self._expect_keyword("empty")
+            return Condition(field, "is not empty" if is_not else "is empty")
+        raise self._error("Expected an operator")
+
+    def _parse_value(self) -> QueryValue:
+        token = self._advance()
+        if token.kind == "string":
+            return QueryValue("string", token.value)
+        if token.kind == "number":
+            return QueryValue("number", token.value)
+        if token.kind == "ident" and token.value.upper() in FUNCTIONS and self._is_punct("("):
+            self.index += 1
+            self._expect_punct(")")
+            return QueryValue("function", token.value.upper())
+        raise RecordQueryError(f"Expected a value at position {token.position}")
+
+
+@lru_cache(maxsize=512)
+def parse_query(text: str) -> ParsedQuery:
+    if len(text) > QUERY_MAX_LENGTH:
+        raise RecordQueryError(f"Query is longer than {QUERY_MAX_LENGTH} characters")
+    return _Parser(text).parse()
+
+
+class _Compiler:
+    def __init__(self, fields: Sequence[Field], user: Optional[User], now: datetime):
+        self.fields: Dict[str, Field] = {field.code: field for field in fields}
+        self.user = user
+        self.now = now
+        self.functions: Dict[str, str] = {}
+
+    def _resolve(self, name: str) -> Tuple[str, Optional[Field]]:
+        if name in SYSTEM_FIELDS:
+            return SYSTEM_FIELDS[name], None
+        field = self.fields.get(name)
+        if field is None:
+            raise RecordQueryError(f"Unknown field '{name}'")
+        kind = FIELD_VALUE_KINDS.get(field.type)
+        if kind is None:
+            raise RecordQueryError(f"Field '{name}' of type {field.type} cannot be queried")
+        return kind, field
+
+    def compile(self, node: Any) -> Any:
+        if isinstance(node, Group):
+            clauses = [self.compile(item) for item in node.items]
+            return and_(*clauses) if node.operator == "and" else or_(*clauses)
+        return self._compile_condition(node)
+
+    def sort_key(self, item: SortItem) -> SortKey:
+        kind, field = self._resolve(item.field)
+        if kind == "record_number":
+            expression = Record.record_number
+        elif kind == "status":
+            expression = Record.status
+        elif field is None:
+            expression = getattr(Record, item.field)
+        elif kind in SORTABLE_KINDS:
+            expression = FieldIndexService.value_expression(field.type, field.code)
+        else:
+            raise RecordQueryError(f"Cannot sort by field '{item.field}' of type {field.type}")
+        return SortKey(
+            field=item.field,
+            kind=kind,
+            expression=expression,
+            descending=item.descending,
+            nullable=kind != "record_number",
+        )
+
+    def _compile_condition(self, condition: Condition) -> Any:
+        kind, field = self._resolve(condition.field)
+        allowed = {
+            "number": NUMBER_OPERATORS,
+            "record_number": NUMBER_OPERATORS - {"is empty", "is not empty"},
+            "date": DATETIME_OPERATORS,
+            "datetime": DATETIME_OPERATORS,
+            "text": TEXT_OPERATORS,
+            "long_text": LONG_TEXT_OPERATORS,
+            "multi": MULTI_VALUE_OPERATORS,
+            "status": STATUS_OPERATORS,
+            "user": USER_OPERATORS,
+        }[kind]
+        if field is None and kind == "datetime":
+            allowed = allowed - {"is empty", "is not empty"}
+        if condition.operator not in allowed:
+            raise RecordQueryError(f"Operator '{condition.operator}' is not supported for field '{condition.field}'")
+
+        if condition.operator in ("is empty", "is not empty"):
+            empty = self._empty_clause(kind, field)
+            return not_(empty) if condition.operator == "is not empty" else empty
+        if kind == "multi":
+            return self._multi_value_clause(condition, field)
+        if kind in ("date", "datetime"):
+            return self._datetime_clause(condition, kind, field)
+
+        if kind == "text" and condition.operator in ("=", "in") and not FieldIndexService.is_indexed(field):
+            # Without a per-field index, equality is answered by the GIN index on records.data.
+            values = [self._string(condition.field, value) for value in condition.values]
+            return or_(*(Record.data.contains({field.code: value}) for value in values))
+
+        expression, values = self._scalar_operands(condition, kind, field)
+        return self._scalar_clause(condition.operator, expression, values, nullable=field is not None)
+
+    def _scalar_operands(self, condition: Condition, kind: str, field: Optional[Field]) -> Tuple[Any, List[Any]]:
+        if kind in ("number", "record_number"):
+            values = [self._number(condition.field, value) for value in condition.values]
+            if kind == "record_number":
+                if any(value != value.to_integral_value() for value in values):
+                    raise RecordQueryError(f"Field '{condition.field}' expects an integer")
+                return Record.record_number, [int(value) for value in values]
+            return FieldIndexService.value_expression(field.type, field.code), values
+        if kind == "status":
+            return Record.status, [self._string(condition.field, value) for value in condition.values]
+        if kind == "user":
+            return Record.created_by, [self._user_id(condition.field, value) for value in condition.values]
+        values = [self._string(condition.field, value) for value in condition.values]
+        return FieldIndexService.value_expression(field.type, field.code), values
+
+    @staticmethod
+    def _scalar_clause(operator_name: str, expression: Any, values: List[Any], nullable: bool) -> Any:
+        if operator_name in ("like", "not like"):
+            clause = expression.ilike(contains_pattern(str(values[0])), escape="\\")
+        elif operator_name in ("in", "not in"):
+            clause = expression.in_(values)
+        else:
+            clause = COMPARISON_OPERATORS[operator_name](expression, values[0])
+
+        if operator_name in ("not in", "not like"):
+            clause = not_(clause)
+        if nullable and operator_name in ("!=", "not in", "not like"):
+            # Negative conditions also match records where the value is missing.
+            clause = or_(clause, expression.is_(None))
+        return clause
+
+    def _datetime_clause(self, condition: Condition, kind: str, field: Optional[Field]) -> Any:
+        if field is None:
+            expression = getattr(Record, condition.field)
+        else:
+            expression = FieldIndexService.value_expression(field.type, field.code)
+        value = self._datetime(condition.field, condition.values[0], kind)
+
+        def bound(moment: datetime) -> Any:
+            # Cast through the same function as the indexed expression so both sides agree.
+            return func.kintone_to_timestamptz(literal(moment.isoformat()))
+
+        if kind == "date" and condition.operator in ("=", "!="):
+            # A date matches every timestamp within that day.
+            start, end = bound(value), bound(value + timedelta(days=1))
+            if condition.operator == "=":
+                return and_(expression >= start, expression < end)
+            return or_(expression < start, expression >= end, expression.is_(None))
+        return self._scalar_clause(condition.operator, expression, [bound(value)], nullable=field is not None)
+
+    def _multi_value_clause(self, condition: Condition, field: Field) -> Any:
+        if field.type == "USER_SELECTION":
+            values = [str(self._user_id(condition.field, value)) for value in condition.values]
+        else:
+            values = [self._string(condition.field, value) for value in condition.values]
+        # Containment is answered by the GIN index on records.data.
+        matches = []
+        for value in values:
+            matches.append(Record.data.contains({field.code: [value]}))
+            if field.type == "USER_SELECTION":
+                # Single-select user fields store a scalar.
+                matches.append(Record.data.contains({field.code: value}))
+        clause = or_(*matches)
+        return not_(clause) if condition.operator == "not in" else clause
+
+    @staticmethod
+    def _empty_clause(kind: str, field: Field) -> Any:
+        raw = Record.data[field.code].astext
+        if kind == "multi":
+            return or_(raw.is_(None), Record.data[field.code] == literal([], JSONB))
+        if kind in ("number", "date", "datetime"):
+            return FieldIndexService.value_expression(field.type, field.code).is_(None)
+        return or_(raw.is_(None), raw == "")
+
+    @staticmethod
+    def _string(name: str, value: QueryValue) -> str:
+        if value.kind == "function":
+            raise RecordQueryError(f"{value.value}() cannot be used with field '{name}'")
+        return value.value
+
+    @staticmethod
+    def _number(name: str, value: QueryValue) -> Decimal:
+        if value.kind == "function":
+            raise RecordQueryError(f"{value.value}() cannot be used with field '{name}'")
+        try:
+            number = Decimal(value.value.strip())
+        except InvalidOperation:
+            raise RecordQueryError(f"Field '{name}' expects a number, got {value.value!r}")
+        if not number.is_finite():
+            raise RecordQueryError(f"Field '{name}' expects a number, got {value.value!r}")
+        return number
+
+    def _datetime(self, name: str, value: QueryValue, kind: str) -> datetime:
+        if value.kind == "function":
+            if value.value == "TODAY":
+                today = self.now.date()
+                self.functions["TODAY"] = today.isoformat()
+                return datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+            if value.value == "NOW":
+                self.functions["NOW"] = self.now.isoformat()
+                return self.now
+            raise RecordQueryError(f"{value.value}() cannot be used with field '{name}'")
+        if value.kind != "string":
+            raise RecordQueryError(f"Field '{name}' expects a date string, got {value.value}")
+        text = value.value.strip()
+        try:
+            if kind == "date" or len(text) == 10:
+                parsed_date = date.fromisoformat(text[:10])
+                moment = datetime(parsed_date.year, parsed_date.month, parsed_date.day)
+            else:
+                moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            raise RecordQueryError(f"Field '{name}' expects an ISO date, got {value.value!r}")
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment
+
+    def _user_id(self, name: str, value: QueryValue) -> UUID:
+        if value.kind == "function":
+            if value.value != "LOGINUSER" or self.user is None:
+                raise RecordQueryError(f"{value.value}() cannot be used with field '{name}'")
+            self.functions["LOGINUSER"] = str(self.user.id)
+            return self.user.id
+        try:
+            return UUID(value.value)
+        except ValueError:
+            raise RecordQueryError(f"Field '{name}' expects a user id, got {value.value!r}")
+
+
+def compile_query(
+    text: Optional[str],
+    fields: Sequence[Field],
+    user: Optional[User] = None,
+    now: Optional[datetime] = None,
+) -> Optional[CompiledQuery]:
+    """
+    Parse (cached) and compile a query for an App with the given fields.
+    Raises RecordQueryError for syntax errors, unknown fields and type mismatches.
+    """
+    if text is None or not text.strip():
+        return None
+    parsed = parse_query(text.strip())
+    compiler = _Compiler(fields, user, now or datetime.now(timezone.utc))
+    where = compiler.compile(parsed.where) if parsed.where is not None else None
+    order_by = [compiler.sort_key(item) for item in parsed.order_by]
+    return CompiledQuery(where=where, order_by=order_by, source=text.strip(), functions=compiler.functions)
@@ -0,0 +1,166 @@
+"""
+Revision log of record data.
+
+Every data or status update increments records.revision and inserts one
+record_revisions row holding only the data keys whose values changed (none for a
+status change). The first update of a record also writes
+a base row with the full data it had before (revision 1 for records never updated),
+and every REVISION_SNAPSHOT_INTERVAL-th revision stores the full data as well, so
+reconstructing any revision replays at most that many deltas.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import case, func, insert, literal, union_all
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.models import Record, RecordRevision
+
+REVISION_SNAPSHOT_INTERVAL = 20
+RECORD_REVISION_MAX_PAGE = 200
+# Columns of the log row, in insert order.
+REVISION_COLUMNS = ["record_id", "app_id", "revision", "actor_id", "delta", "snapshot", "created_at"]
+
+
+class RecordRevisionConflict(Exception):
+    """The record is no longer at the revision the update expected."""
+
+    def __init__(self, current_revision: int):
+        super().__init__(f"record is at revision {current_revision}")
+        self.current_revision = current_revision
+
+
+class RecordRevisionService:
+    @staticmethod
+    def old_columns() -> List[Any]:
+        """Pre-update columns to select (FOR UPDATE) into the `old` CTE of a set-based data update."""
+        return [
+            Record.revision.label("old_revision"),
+            func.coalesce(Record.data, literal({}, JSONB)).label("old_data"),
+            Record.created_by.label("old_created_by"),
+            Record.created_at.label("old_created_at"),
+        ]
+
+    @staticmethod
+    def log_statement(app_id: UUID, updated: Any, patch: Any, actor_id: Any) -> Any:
+        """
+        INSERT INTO record_revisions ... SELECT over the RETURNING of a data-modifying CTE that
+        merged `patch` (a JSONB expression) into data and incremented revision. `updated` must
+        expose id, revision and data (new values) and the old_columns(); actor_id is a SQL
+        expression as well.
+        """
+        patch_entries = func.jsonb_each(patch).table_valued("key", "value").render_derived()
+        delta = (
+            select(func.coalesce(func.jsonb_object_agg(patch_entries.c.key, patch_entries.c.value), literal({}, JSONB)))
+            .select_from(patch_entries)
+            .where(updated.c.old_data.op("->")(patch_entries.c.key).is_distinct_from(patch_entries.c.value))
+            .scalar_subquery()
+        )
+        base = select(
+            updated.c.id,
+            literal(app_id, RecordRevision.app_id.type),
+            updated.c.old_revision,
+            updated.c.old_created_by,
+            literal({}, JSONB),
+            updated.c.old_data,
+            updated.c.old_created_at,
+        ).where(updated.c.old_revision == 1)
+        changes = select(
+            updated.c.id,
+            literal(app_id, RecordRevision.app_id.type),
+            updated.c.revision,
+            actor_id,
+            delta,
+            case((updated.c.revision % REVISION_SNAPSHOT_INTERVAL == 0, updated.c.data)),
+            func.now(),
+        )
+        return insert(RecordRevision).from_select(REVISION_COLUMNS, union_all(base, changes))
+
+    @staticmethod
+    async def list_revisions(
+        db: AsyncSession, record_id: UUID, limit: int = 50, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of a record's revisions, newest first.
+        `cursor` is the next_cursor of the previous page (the last revision number on it).
+        """
+        limit = max(1, min(limit, RECORD_REVISION_MAX_PAGE))
+        query = select(
+            RecordRevision.revision, RecordRevision.actor_id, RecordRevision.delta, RecordRevision.created_at
+        ).where(RecordRevision.record_id == record_id)
+        if cursor:
+            try:
+                before = int(cursor)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            query = query.where(RecordRevision.revision < before)
+
+        rows = (await db.execute(query.order_by(RecordRevision.revision.desc()).limit(limit + 1))).mappings().all()
+        has_next = len(rows) > limit
+        items = [dict(row) for row in rows[:limit]]
+        return {
+            "items": items,
+            "next_cursor": str(items[-1]["revision"]) if has_next else None,
+            "has_next": has_next,
+        }
+
+    @staticmethod
+    async def _revision_at(db: AsyncSession, record_id: UUID, at: datetime) -> Optional[int]:
+        return (
+            await db.execute(
+                select(func.max(RecordRevision.revision)).where(
+                    RecordRevision.record_id == record_id, RecordRevision.created_at <= at
+                )
+            )
+        ).scalar()
+
+    @staticmethod
+    async def data_at(
+        db: AsyncSession, record: Record, revision: Optional[int] = None, at: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The record's data as of `revision`, or as of the last revision made at or before `at`.
+        Returns None when the record has no such revision.
+        """
+        if record.revision == 1:
+            # Never updated: the current data is the only state and nothing is logged yet.
+            if revision not in (None, 1) or (at is not None and (not record.created_at or record.created_at > at)):
+                return None
+            return {"record_id": record.id, "revision": 1, "data": record.data or {}, "revised_at": record.created_at}
+
+        if at is not None:
+            revision = await RecordRevisionService._revision_at(db, record.id, at)
+        if revision is None or revision < 1 or revision > record.revision:
+            return None
+
+        # The nearest snapshot at or before the revision, then every delta up to it.
+        snapshot_revision = (
+            select(func.max(RecordRevision.revision))
+            .where(
+                RecordRevision.record_id == record.id,
+                RecordRevision.revision <= revision,
+                RecordRevision.snapshot.isnot(None),
+            )
+            .scalar_subquery()
+        )
+        rows = (
+            await db.execute(
+                select(RecordRevision.delta, RecordRevision.snapshot, RecordRevision.created_at)
+                .where(
+                    RecordRevision.record_id == record.id,
+                    RecordRevision.revision >= snapshot_revision,
+                    RecordRevision.revision <= revision,
+                )
+                .order_by(RecordRevision.revision)
+            )
+        ).all()
+        if not rows:
+            return None
+
+        data = dict(rows[0].snapshot)
+        for row in rows[1:]:
+            data.update(row.delta)
+        return {"record_id": record.id, "revision": revision, "data": data, "revised_at": rows[-1].created_at}
@@ -0,0 +1,250 @@
+"""
+Per-App record counts by status, optionally split by one grouping field and carrying
+sums of NUMBER fields, kept in record_rollups so reads cost O(#groups).
+
+Every record write applies a signed delta in the same transaction, in one statement:
+
+    INSERT INTO record_rollups
+    SELECT :app_id, status, group_value, sum(sign), {code: sum(sign * value), ...}
+    FROM <changed rows> GROUP BY status, group_value ORDER BY status, group_value
+    ON CONFLICT DO UPDATE SET record_count = record_count + excluded.record_count, ...
+
+Creates add the new rows, deletes subtract the removed ones and updates do both
+with the old and new values. Rows are upserted in key order, so concurrent writers
+lock rollup rows in the same order and cannot deadlock on them.
+
+The grouping and sum fields are App view settings (rollup_group_field and
+rollup_sum_fields); changing them rebuilds the App's rollups. Writers hold a shared
+per-App advisory lock until commit and rebuild_app takes it exclusively, so a rebuild
+never interleaves with an in-flight write.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import Text, cast, delete, func, literal, or_, true, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.future import select
+from app.models.models import App, Record, RecordRollup
+
+logger = logging.getLogger(__name__)
+
+# First key of the per-App advisory lock; the second is hashtext(app_id).
+ROLLUP_LOCK_NAMESPACE = 7301
+# Field types allowed as the grouping field and as sum fields.
+ROLLUP_GROUP_TYPES = ("DROP_DOWN", "RADIO_BUTTON")
+ROLLUP_SUM_TYPES = ("NUMBER",)
+
+
+@dataclass(frozen=True)
+class RollupSettings:
+    group_field: Optional[str] = None
+    sum_fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_app(cls, app: Optional[App]) -> "RollupSettings":
+        view_settings = (app.view_settings if app else None) or {}
+        return cls(
+            group_field=view_settings.get("rollup_group_field") or None,
+            sum_fields=tuple(view_settings.get("rollup_sum_fields") or ()),
+        )
+
+    def affected_by(self, status_changed: bool, data_codes: Sequence[str]) -> bool:
+        """Whether a write changing the status and/or these data keys can change the rollups."""
+        if status_changed:
+            return True
+        return any(code == self.group_field or code in self.sum_fields for code in data_codes)
+
+
+class RecordRollupService:
+    @staticmethod
+    async def settings(db: AsyncSession, app_id: UUID) -> RollupSettings:
+        # db.get answers from the session's identity map when the App is already loaded.
+        return RollupSettings.from_app(await db.get(App, app_id))
+
+    @staticmethod
+    def _lock_key(app_id: UUID) -> Tuple[Any, Any]:
+        return ROLLUP_LOCK_NAMESPACE, func.hashtext(cast(literal(str(app_id)), Text))
+
+    @staticmethod
+    def keyed_columns(settings: RollupSettings, status: Any, data: Any, prefix: str = "") -> List[Any]:
+        """status, group_value and one numeric column per sum field, computed from a row's status and data."""
+        group_value = func.coalesce(data.op("->>")(settings.group_field), "") if settings.group_field else literal("")
+        return [
+            func.coalesce(status, "").label(prefix + "status"),
+            group_value.label(prefix + "group_value"),
+            *(
+                func.kintone_to_numeric(data.op("->>")(code)).label(f"{prefix}sum_{position}")
+                for position, code in enumerate(settings.sum_fields)
+            ),
+        ]
+
+    @staticmethod
+    def _signed(settings: RollupSettings, sign: int, source: Any, prefix: str = "") -> Any:
+        # SELECT :sign AS sign, status, group_value, sum_0, ... from keyed columns of `source`.
+        names = ["status", "group_value", *(f"sum_{position}" for position in range(len(settings.sum_fields)))]
+        return select(
+            literal(sign).label("sign"), *(source.c[prefix + name].label(name) for name in names)
+        )
+
+    @staticmethod
+    def _grouped(settings: RollupSettings, changes: Any) -> Any:
+        """(status, group_value, record_count, sums) per key of `changes`, skipping keys whose delta is zero."""
+        sums = [func.coalesce(func.sum(changes.c.sign * changes.c[f"sum_{position}"]), 0)
+                for position in range(len(settings.sum_fields))]
+        count = func.sum(changes.c.sign)
+        pairs = [item for code, total in zip(settings.sum_fields, sums) for item in (literal(code), total)]
+        return (
+            select(
+                changes.c.status,
+                changes.c.group_value,
+                count.label("record_count"),
+                func.jsonb_build_object(*pairs).label("sums"),
+            )
+            .group_by(changes.c.status, changes.c.group_value)
+            .having(or_(count != 0, *(total != 0 for total in sums)))
+        )
+
+    @staticmethod
+    def upsert_statement(app_id: UUID, settings: RollupSettings, changes: Any) -> Any:
+        """
+        Add the deltas of `changes` (a selectable of sign, status, group_value, sum_0, ...)
+        to the App's rollups, under the shared per-App lock.
+        """
+        changes = changes.subquery("changes") if hasattr(changes, "subquery") else changes
+        lock = select(func.pg_advisory_xact_lock_shared(*RecordRollupService._lock_key(app_id)).label("locked")).cte(
+            "rollup_lock"
+        )
+        grouped = RecordRollupService._grouped(settings, changes).join_from(changes, lock, true()).subquery("deltas")
+        stmt = pg_insert(RecordRollup).from_select(
+            ["app_id", "status", "group_value", "record_count", "sums"],
+            select(
+                literal(app_id, RecordRollup.app_id.type),
+                grouped.c.status,
+                grouped.c.group_value,
+                grouped.c.record_count,
+                grouped.c.sums,
+            ).order_by(grouped.c.status, grouped.c.group_value),
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[RecordRollup.app_id, RecordRollup.status, RecordRollup.group_value],
+            set_={
+                "record_count": RecordRollup.record_count + stmt.excluded.record_count,
+                "sums": func.kintone_jsonb_sum(RecordRollup.sums, stmt.excluded.sums),
+            },
+        )
+
+    @staticmethod
+    def record_changes(settings: RollupSettings, sign: int, where: Any) -> Any:
+        """Signed keyed rows of the records matching `where`, e.g. just-inserted ones."""
+        return select(
+            literal(sign).label("sign"), *RecordRollupService.keyed_columns(settings, Record.status, Record.data)
+        ).where(where)
+
+    @staticmethod
+    async def add_records(db: AsyncSession, app_id: UUID, settings: RollupSettings, where: Any) -> None:
+        await db.execute(
+            RecordRollupService.upsert_statement(app_id, settings, RecordRollupService.record_changes(settings, 1, where))
+        )
+
+    @staticmethod
+    def returned_changes(
+        settings: RollupSettings, returned: Any, old_prefix: Optional[str] = None, sign: int = 1, prefix: str = ""
+    ) -> Any:
+        """
+        Signed keyed rows from the RETURNING of a data-modifying CTE: the keyed columns (named
+        with `prefix`) with `sign`, plus (when old_prefix is given) the old-value columns negated.
+        """
+        parts = [RecordRollupService._signed(settings, sign, returned, prefix)]
+        if old_prefix is not None:
+            parts.append(RecordRollupService._signed(settings, -sign, returned, old_prefix))
+        return union_all(*parts) if len(parts) > 1 else parts[0]
+
+    @staticmethod
+    def _expected(app_id: UUID, settings: RollupSettings) -> Any:
+        changes = RecordRollupService.record_changes(settings, 1, Record.app_id == app_id).subquery("changes")
+        return RecordRollupService._grouped(settings, changes)
+
+    @staticmethod
+    async def rebuild_app(engine: AsyncEngine, app_id: UUID) -> int:
+        """Recompute an App's rollups from its records. Returns the number of groups."""
+        async with AsyncSession(bind=engine) as db:
+            settings = await RecordRollupService.settings(db, app_id)
+            await db.execute(select(func.pg_advisory_xact_lock(*RecordRollupService._lock_key(app_id))))
+            await db.execute(delete(RecordRollup).where(RecordRollup.app_id == app_id))
+            await db.execute(
+                RecordRollupService.upsert_statement(
+                    app_id, settings, RecordRollupService.record_changes(settings, 1, Record.app_id == app_id)
+                )
+            )
+            groups = await db.scalar(
+                select(func.count()).where(RecordRollup.app_id == app_id, RecordRollup.record_count != 0)
+            )
+            await db.commit()
+        logger.info("rebuilt %s record rollup groups for app %s", groups, app_id)
+        return int(groups or 0)
+
+    @staticmethod
+    async def check_app(db: AsyncSession, app_id: UUID) -> List[Dict[str, Any]]:
+        """Differences between the stored rollups and a fresh aggregation of the App's records."""
+        settings = await RecordRollupService.settings(db, app_id)
+        expected = {
+            (row.status, row.group_value): (int(row.record_count), row.sums)
+            for row in (await db.execute(RecordRollupService._expected(app_id, settings))).all()
+        }
+        stored = {
+            (row.status, row.group_value): (int(row.record_count), row.sums)
+            for row in (
+                await db.execute(
+                    select(RecordRollup.status, RecordRollup.group_value, RecordRollup.record_count, RecordRollup.sums)
+                    .where(RecordRollup.app_id == app_id)
+                )
+            ).all()
+            if row.record_count != 0 or any(row.sums.values())
+        }
+        mismatches = []
+        for key in sorted(set(expected) | set(stored)):
+            want = expected.get(key, (0, {}))
+            have = stored.get(key, (0, {}))
+            if want[0] != have[0] or _numbers(want[1]) != _numbers(have[1]):
+                mismatches.append(
+                    {"status": key[0], "group_value": key[1], "expected": want[0], "stored": have[0],
+                     "expected_sums": want[1], "stored_sums": have[1]}
+                )
+        return mismatches
+
+    @staticmethod
+    async def get_app_rollup(db: AsyncSession, app_id: UUID) -> List[Dict[str, Any]]:
+        result = await db.execute(
+            select(RecordRollup.status, RecordRollup.group_value, RecordRollup.record_count, RecordRollup.sums)
+            .where(RecordRollup.app_id == app_id, RecordRollup.record_count != 0)
+            .order_by(RecordRollup.status, RecordRollup.group_value)
+        )
+        return [
+            {"status": row.status, "group_value": row.group_value or None,
+             "count": int(row.record_count), "sums": _numbers(row.sums)}
+            for row in result.all()
+        ]
+
+    @staticmethod
+    async def status_counts(db: AsyncSession, app_ids: Sequence[UUID]) -> Dict[UUID, Dict[str, int]]:
+        """{app_id: {status: count}} summed over grouping values, for every App in app_ids."""
+        if not app_ids:
+            return {}
+        total = func.sum(RecordRollup.record_count)
+        result = await db.execute(
+            select(RecordRollup.app_id, RecordRollup.status, total)
+            .where(RecordRollup.app_id.in_(list(app_ids)))
+            .group_by(RecordRollup.app_id, RecordRollup.status)
+            .having(total != 0)
+            .order_by(RecordRollup.app_id, RecordRollup.status)
+        )
+        counts: Dict[UUID, Dict[str, int]] = {app_id: {} for app_id in app_ids}
+        for app_id, status, count in result.all():
+            counts[app_id][status] = int(count)
+        return counts
+
+
+def _numbers(sums: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    return {code: float(value) for code, value in (sums or {}).items()}
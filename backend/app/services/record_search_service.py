@@ -0,0 +1,113 @@
+import logging
+import re
+import unicodedata
+from typing import Any, List, Optional, Sequence, Union
+from uuid import UUID
+from sqlalchemy import Text, func, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.future import select
+from app.models.models import Field, Record
+
+logger = logging.getLogger(__name__)
+
+# Field types whose values are indexed in records.search_vector.
+SEARCH_TEXT_TYPES = ("SINGLE_LINE_TEXT", "MULTI_LINE_TEXT")
+
+# Same token rules as the kintone_search_tokens()/kintone_search_query() SQL functions.
+SEARCH_TOKEN_PATTERN = re.compile("([0-9a-z\u00c0-\u024f]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+)")
+SEARCH_WORD_PATTERN = re.compile("^[0-9a-z\u00c0-\u024f]+$")
+
+REBUILD_BATCH_SIZE = 1000
+
+
+class RecordSearchService:
+    """
+    Full-text search over the text fields of records.
+
+    records.search_vector holds Latin words and CJK bigrams of the SINGLE_LINE_TEXT /
+    MULTI_LINE_TEXT values (kintone_search_vector). It is written by the same
+    statement that writes `data`, so it never lags behind the record.
+    """
+
+    @staticmethod
+    def text_field_codes_subquery(app_id: Any) -> Any:
+        # Evaluated inside the write statement, so single-record writes need no extra round trip.
+        return (
+            select(func.array_agg(Field.code))
+            .where(Field.app_id == app_id, Field.type.in_(SEARCH_TEXT_TYPES))
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    async def text_field_codes(db: AsyncSession, app_id: UUID) -> List[str]:
+        result = await db.execute(
+            select(Field.code).where(Field.app_id == app_id, Field.type.in_(SEARCH_TEXT_TYPES))
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def vector_expression(data: Any, codes: Union[Sequence[str], Any]) -> Any:
+        """SQL expression computing search_vector from a data expression and the app's text field codes."""
+        if isinstance(codes, (list, tuple)):
+            codes = literal(list(codes), ARRAY(Text))
+        return func.kintone_search_vector(data, codes)
+
+    @staticmethod
+    def has_search_tokens(term: str) -> bool:
+        """True when the term yields a full-text query (a word or a run of two or more CJK characters)."""
+        normalized = unicodedata.normalize("NFKC", term).lower()
+        return any(
+            SEARCH_WORD_PATTERN.match(run) or len(run) > 1 for run in SEARCH_TOKEN_PATTERN.findall(normalized)
+        )
+
+    @staticmethod
+    def search_clause(term: str) -> Any:
+        """
+        Records whose text fields contain every word of `term` (as a word prefix) and
+        every CJK run of it (as adjacent bigrams). Served by ix_records_search_vector.
+        """
+        return Record.search_vector.op("@@")(func.kintone_search_query(term))
+
+    @staticmethod
+    def rank_expression(term: str) -> Any:
+        return func.ts_rank_cd(Record.search_vector, func.kintone_search_query(term))
+
+    @staticmethod
+    async def rebuild_app_vectors(
+        engine: AsyncEngine, app_id: UUID, batch_size: int = REBUILD_BATCH_SIZE
+    ) -> int:
+        """
+        Recompute search_vector for every record of an App, e.g. after its text fields
+        changed. Runs in committed batches on its own session.
+        """
+        rebuilt = 0
+        last_number: Optional[int] = None
+        async with AsyncSession(bind=engine) as db:
+            codes = await RecordSearchService.text_field_codes(db, app_id)
+            while True:
+                batch = select(Record.id).where(Record.app_id == app_id)
+                if last_number is not None:
+                    batch = batch.where(Record.record_number < last_number)
+                batch = batch.order_by(Record.record_number.desc()).limit(batch_size)
+                result = await db.execute(
+                    update(Record)
+                    .where(Record.id.in_(batch))
+                    .values(
+                        search_vector=RecordSearchService.vector_expression(Record.data, codes),
+                        # Not a user edit: keep updated_at as it was.
+                        updated_at=Record.updated_at,
+                    )
+                    .returning(Record.record_number)
+                    .execution_options(synchronize_session=False)
+                )
+                numbers = result.scalars().all()
+                await db.commit()
+                if not numbers:
+                    break
+                rebuilt += len(numbers)
+                last_number = min(numbers)
+                if len(numbers) < batch_size:
+                    break
+        logger.info("rebuilt search vectors of %s records for app %s", rebuilt, app_id)
+        return rebuilt
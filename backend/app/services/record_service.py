@@ -1,13 +1,44 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
-from typing import Any, Dict, List, Optional, Set
-from uuid import UUID
+from sqlalchemy import Text, and_, bindparam, case, cast, column, delete, false, func, insert, literal, or_, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+import re
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
-from app.models.models import App, Record
+from app.models.models import App, AppRecordCounter, Record
+from app.models.notification import Notification
 from app.models.user import User
 from app.schemas.record_schema import RecordCreate
+from app.services.record_cursor import decode_cursor, encode_cursor, keyset_branches, listing_signature
+from app.services.field_index_service import FieldIndexService
+from app.services.record_assignee_service import RecordAssigneeService
+from app.services.record_query import CompiledQuery, contains_pattern, with_tiebreaker
+from app.services.record_revision_service import RecordRevisionConflict, RecordRevisionService
+from app.services.record_rollup_service import RecordRollupService, RollupSettings
+from app.services.record_search_service import RecordSearchService
 from app.services.notification_service import NotificationService
+from app.services.org_membership_service import OrgMembershipService
+from app.services.workflow_event_service import WorkflowEventService
+
+# Rows per multi-row INSERT. Each record binds ~9 parameters and asyncpg caps a
+# statement at 32767, so this stays well below the limit.
+BULK_INSERT_BATCH_SIZE = 1000
+# Rows touched per UPDATE/DELETE statement in bulk operations; each batch commits on its own
+# so row locks on records are held only for one batch at a time.
+BULK_WRITE_BATCH_SIZE = 1000
+# Characters written as escape sequences in data::text, where a substring match could be missed.
+JSON_ESCAPED_CHARACTERS = re.compile(r'["\\\x00-\x1f]')
+# Columns loaded into Record by UPDATE ... RETURNING (search_vector is deferred and never returned).
+RECORD_COLUMNS = [column for column in Record.__table__.c if column.name != "search_vector"]
+# Keys of a record list row (RecordListResponse), in column order.
+LIST_ROW_KEYS = ("id", "app_id", "record_number", "status", "data", "created_at", "updated_at")
+
+
+class WorkflowTransitionConflict(Exception):
+    """The record left the status a workflow action was validated against before it applied."""
+
 
 class RecordService:
     @staticmethod
@@ -30,18 +61,49 @@ class RecordService:
         return value
 
     @staticmethod
-    async def get_next_record_number(db: AsyncSession, app_id: UUID) -> int:
-        # Simple auto-increment logic (Replace with sequence or robust locking in prod)
-        result = await db.execute(select(func.max(Record.record_number)).where(Record.app_id == app_id))
-        max_num = result.scalar()
-        return (max_num or 0) + 1
+    def _record_counter_upsert(app_id: UUID, count: int = 1) -> Any:
+        # Bumps the per-app counter by `count` and returns the new high-water mark.
+        # The row lock taken by ON CONFLICT DO UPDATE is held until commit, so
+        # concurrent writers on the same app queue on one counter row instead of
+        # racing on max(record_number).
+        stmt = pg_insert(AppRecordCounter).values(app_id=app_id, last_number=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AppRecordCounter.app_id],
+            set_={"last_number": AppRecordCounter.last_number + stmt.excluded.last_number},
+        )
+        return stmt.returning(AppRecordCounter.last_number)
 
     @staticmethod
-    async def create_record(db: AsyncSession, record_in: RecordCreate, user_id: UUID) -> Record:
-        # TODO: Validate record_in.data against App Fields
-        app = (await db.execute(select(App).where(App.id == record_in.app_id))).scalar_one_or_none()
+    async def reserve_record_numbers(db: AsyncSession, app_id: UUID, count: int = 1) -> int:
+        """
+        Reserve `count` contiguous record numbers for an app.
+        Returns the first number of the reserved range.
+        """
+        if count < 1:
+            raise ValueError("count must be positive")
+        result = await db.execute(RecordService._record_counter_upsert(app_id, count))
+        last_number = result.scalar_one()
+        return last_number - count + 1
+
+    @staticmethod
+    def _new_record_values(
+        app_id: UUID, status: str, data: Optional[Dict[str, Any]], user_id: Optional[UUID]
+    ) -> Dict[str, Any]:
+        # Column values for a freshly created record (everything except record_number).
+        # Python-side column defaults do not apply to INSERT ... SELECT, so they are spelled out here.
+        return {
+            "id": uuid4(),
+            "app_id": app_id,
+            "status": status,
+            "data": data or {},
+            "created_by": user_id,
+            "workflow_approver_ids": [],
+            "workflow_current_step": 0,
+        }
 
-        requested_status = (record_in.status or "").strip()
+    @staticmethod
+    def _resolve_initial_status(app: Optional[App], requested: Optional[str]) -> str:
+        requested_status = (requested or "").strip()
         initial_status = requested_status or "Draft"
 
         # If process management is enabled, initialize records from the first configured status.
@@ -55,41 +117,398 @@ class RecordService:
             )
             if process.get("enabled") and first_status_name and (not requested_status or requested_status == "Draft"):
                 initial_status = first_status_name
+        return initial_status
 
-        next_num = await RecordService.get_next_record_number(db, record_in.app_id)
-        
-        db_record = Record(
-            app_id=record_in.app_id,
-            record_number=next_num,
-            status=initial_status,
-            data=record_in.data,
-            created_by=user_id
+    @staticmethod
+    async def create_record(db: AsyncSession, record_in: RecordCreate, user_id: UUID) -> Record:
+        # TODO: Validate record_in.data against App Fields
+        app = (await db.execute(select(App).where(App.id == record_in.app_id))).scalar_one_or_none()
+
+        initial_status = RecordService._resolve_initial_status(app, record_in.status)
+
+        # Allocate the record number and insert the row in a single statement:
+        # WITH counter AS (INSERT ... ON CONFLICT DO UPDATE RETURNING last_number)
+        # INSERT INTO records (...) SELECT ..., counter.last_number FROM counter
+        counter = RecordService._record_counter_upsert(record_in.app_id).cte("counter")
+        values = RecordService._new_record_values(record_in.app_id, initial_status, record_in.data, user_id)
+        columns = list(values.keys())
+        stmt = (
+            insert(Record)
+            .from_select(
+                ["record_number", *columns, "search_vector"],
+                select(
+                    counter.c.last_number,
+                    *(literal(values[name], Record.__table__.c[name].type) for name in columns),
+                    RecordSearchService.vector_expression(
+                        literal(values["data"], JSONB),
+                        RecordSearchService.text_field_codes_subquery(record_in.app_id),
+                    ),
+                ),
+            )
+            .add_cte(counter)
+            .returning(Record)
+        )
+        db_record = (await db.execute(stmt)).scalar_one()
+        await RecordRollupService.add_records(
+            db, record_in.app_id, RollupSettings.from_app(app), Record.id == db_record.id
         )
-        db.add(db_record)
         await db.commit()
         await db.refresh(db_record)
         return db_record
 
+    @staticmethod
+    async def create_records_bulk(
+        db: AsyncSession, app: App, records_in: List[RecordCreate], user_id: UUID
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many records for one app in a single transaction.
+        Record numbers come from one reserved range; rows are written with
+        INSERT ... SELECT FROM jsonb_to_recordset(:rows) statements of
+        BULK_INSERT_BATCH_SIZE rows each, one bound parameter per batch.
+        """
+        if not records_in:
+            return []
+
+        search_codes = await RecordSearchService.text_field_codes(db, app.id)
+        first_number = await RecordService.reserve_record_numbers(db, app.id, len(records_in))
+        rows: List[Dict[str, Any]] = []
+        for offset, record_in in enumerate(records_in):
+            values = RecordService._new_record_values(
+                app.id,
+                RecordService._resolve_initial_status(app, record_in.status),
+                record_in.data,
+                user_id,
+            )
+            values["record_number"] = first_number + offset
+            rows.append(values)
+
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            batch = rows[start:start + BULK_INSERT_BATCH_SIZE]
+            await db.execute(RecordService._insert_rows_statement(batch, search_codes))
+        await RecordRollupService.add_records(
+            db,
+            app.id,
+            RollupSettings.from_app(app),
+            and_(
+                RecordService._app_filter(app.id),
+                Record.record_number.between(first_number, first_number + len(rows) - 1),
+            ),
+        )
+
+        await db.commit()
+        return [{"id": row["id"], "record_number": row["record_number"]} for row in rows]
+
+    @staticmethod
+    def _insert_rows_statement(rows: List[Dict[str, Any]], search_codes: List[str]) -> Any:
+        # INSERT INTO records (...) SELECT r.*, kintone_search_vector(r.data, :codes)
+        # FROM jsonb_to_recordset(:rows) AS r(id UUID, ...): each record's data is sent
+        # once and its search vector is computed from it server-side.
+        columns = list(rows[0].keys())
+        payload = [
+            {name: str(value) if isinstance(value, UUID) else value for name, value in row.items()}
+            for row in rows
+        ]
+        source = (
+            func.jsonb_to_recordset(literal(payload, JSONB))
+            .table_valued(*(column(name, Record.__table__.c[name].type) for name in columns))
+            .render_derived(name="r", with_types=True)
+        )
+        return insert(Record).from_select(
+            [*columns, "search_vector"],
+            select(
+                *(source.c[name] for name in columns),
+                RecordSearchService.vector_expression(source.c.data, search_codes),
+            ),
+        )
+
+    @staticmethod
+    def _app_filter(app_id: UUID) -> Any:
+        # app_id is rendered into the statement rather than bound, so the planner can
+        # match the per-app partial field indexes even for cached generic plans.
+        return Record.app_id == literal(app_id, Record.app_id.type, literal_execute=True)
+
+    @staticmethod
+    def _apply_record_query(query: Any, record_query: Optional[CompiledQuery]) -> Any:
+        if record_query is None:
+            return query
+        return record_query.apply(query)
+
+    @staticmethod
+    def _bulk_target_query(
+        app_id: UUID,
+        ids: Optional[List[UUID]],
+        filters: Optional[dict],
+        user: Optional[User],
+        app_record_acl: Optional[List[dict]],
+        record_query: Optional[CompiledQuery] = None,
+    ) -> Any:
+        # Records addressed by a bulk operation: explicit ids or a filter, always within the record ACL.
+        query = select(Record.id).where(RecordService._app_filter(app_id))
+        query = RecordService._apply_record_acl_filter(query, user, app_record_acl)
+        if ids is not None:
+            query = query.where(Record.id.in_(ids))
+        else:
+            query = RecordService._apply_search_filters(query, filters)
+            query = RecordService._apply_record_query(query, record_query)
+        return query
+
+    @staticmethod
+    async def _run_in_batches(
+        db: AsyncSession,
+        target_query: Any,
+        build_statement: Callable[[Any], Any],
+        batch_size: int,
+        on_batch: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> int:
+        """
+        Run a set-based statement over target_query in keyset-ordered batches.
+        build_statement(batch_select) must return a statement that RETURNs
+        (record_number, id) of the rows it touched. Commits after every batch.
+        """
+        affected = 0
+        cursor: Optional[tuple] = None
+        while True:
+            batch = target_query.order_by(Record.record_number.desc(), Record.id.desc()).limit(batch_size)
+            if cursor is not None:
+                batch = batch.where(tuple_(Record.record_number, Record.id) < cursor)
+            result = await db.execute(build_statement(batch))
+            touched = result.all()
+            await db.commit()
+            if not touched:
+                break
+            affected += len(touched)
+            if on_batch:
+                await on_batch(affected)
+            cursor = min((row[0], row[1]) for row in touched)
+            if len(touched) < batch_size:
+                break
+        return affected
+
+    @staticmethod
+    def _update_values(app_id: UUID, patch: Optional[Any], status: Optional[Any]) -> Dict[str, Any]:
+        # SET clause merging the JSONB `patch` expression into data (data = data || :patch)
+        # and/or setting status. Either one is a new revision (revision + 1).
+        values: Dict[str, Any] = {}
+        if patch is not None:
+            values["data"] = func.coalesce(Record.data, literal({}, JSONB)).op("||")(patch)
+            values["search_vector"] = RecordSearchService.vector_expression(
+                values["data"], RecordSearchService.text_field_codes_subquery(app_id)
+            )
+        if status is not None:
+            values["status"] = status
+        if values:
+            values["revision"] = Record.revision + 1
+        return values
+
+    @staticmethod
+    def _update_statement(
+        app_id: UUID,
+        condition: Any,
+        values: Dict[str, Any],
+        rollup: RollupSettings,
+        returning: List[Any],
+        *,
+        track_rollup: bool,
+        patch: Optional[Any] = None,
+        actor_id: Any = None,
+        chained: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        guard: Any = None,
+    ) -> Any:
+        """
+        A single statement applying `values` to the records matching `condition` and returning
+        the `returning` columns of the updated rows. When `values` bump the revision or the
+        rollups are affected, the revision log (with the keys of `patch`, a JSONB expression,
+        that changed) and the rollups are written in the same statement. `chained` maps CTE
+        names to builders of further data-modifying statements over the `updated` CTE. With
+        `guard`, only the locked records also matching it are updated, and a row is returned
+        for every locked record: the `returning` columns are NULL where the guard failed,
+        followed by the revision it was locked at (current_revision).
+        """
+        logged = "revision" in values
+        if not track_rollup and not logged and not chained and guard is None:
+            return (
+                update(Record)
+                .where(condition)
+                .values(**values)
+                .returning(*returning)
+                .execution_options(synchronize_session=False)
+            )
+        # WITH old AS (SELECT ... FOR UPDATE), updated AS (UPDATE ... FROM old RETURNING new and old values),
+        # rollup AS (INSERT INTO record_rollups ...), revisions AS (INSERT INTO record_revisions ...)
+        # SELECT <returning> FROM updated
+        names = [column.name for column in returning]
+        old_columns = []
+        new_columns = list(returning)
+        if track_rollup:
+            old_columns += RecordRollupService.keyed_columns(rollup, Record.status, Record.data, "old_")
+            new_columns += RecordRollupService.keyed_columns(rollup, Record.status, Record.data, "new_")
+        if logged:
+            old_columns += RecordRevisionService.old_columns()
+            new_columns += [column for column in (Record.revision, Record.data) if column.name not in names]
+        if guard is not None:
+            old_columns.append(Record.revision.label("current_revision"))
+        old = select(Record.id, *old_columns).where(condition).with_for_update().cte("old")
+        updated = update(Record).where(Record.id == old.c.id)
+        if guard is not None:
+            updated = updated.where(guard)
+        updated = (
+            updated.values(**values)
+            .returning(*new_columns, *(old.c[name] for name in old.c.keys() if name != "id"))
+            .cte("updated")
+        )
+        if guard is None:
+            statement = select(*(updated.c[name] for name in names))
+        else:
+            statement = select(*(updated.c[name] for name in names), old.c.current_revision).select_from(
+                old.outerjoin(updated, updated.c.id == old.c.id)
+            )
+        if track_rollup:
+            changes = RecordRollupService.returned_changes(rollup, updated, old_prefix="old_", prefix="new_")
+            statement = statement.add_cte(RecordRollupService.upsert_statement(app_id, rollup, changes).cte("rollup"))
+        if logged:
+            # A status-only revision is logged with an empty delta.
+            delta_source = patch if patch is not None else literal({}, JSONB)
+            statement = statement.add_cte(
+                RecordRevisionService.log_statement(app_id, updated, delta_source, actor_id).cte("revisions")
+            )
+        for name, build in (chained or {}).items():
+            statement = statement.add_cte(build(updated).cte(name))
+        return statement
+
+    @staticmethod
+    async def bulk_update_records(
+        db: AsyncSession,
+        app_id: UUID,
+        *,
+        data: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+        ids: Optional[List[UUID]] = None,
+        filters: Optional[dict] = None,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+        batch_size: int = BULK_WRITE_BATCH_SIZE,
+    ) -> int:
+        """
+        Merge `data` into (and/or set `status` on) every targeted record with
+        UPDATE records SET data = data || :patch ... in batches.
+        Returns the number of updated rows.
+        """
+        patch = literal(data, JSONB) if data else None
+        values = RecordService._update_values(app_id, patch, status or None)
+        if not values:
+            return 0
+
+        target = RecordService._bulk_target_query(app_id, ids, filters, user, app_record_acl, record_query)
+        rollup = await RecordRollupService.settings(db, app_id)
+        track_rollup = rollup.affected_by(bool(status), list(data or {}))
+        actor_id = literal(user.id if user else None, Record.created_by.type)
+
+        def build_statement(batch: Any) -> Any:
+            return RecordService._update_statement(
+                app_id,
+                Record.id.in_(batch),
+                values,
+                rollup,
+                [Record.record_number, Record.id],
+                track_rollup=track_rollup,
+                patch=patch,
+                actor_id=actor_id,
+            )
+
+        return await RecordService._run_in_batches(db, target, build_statement, batch_size)
+
+    @staticmethod
+    async def count_bulk_targets(
+        db: AsyncSession,
+        app_id: UUID,
+        *,
+        ids: Optional[List[UUID]] = None,
+        filters: Optional[dict] = None,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+    ) -> int:
+        target = RecordService._bulk_target_query(app_id, ids, filters, user, app_record_acl, record_query)
+        result = await db.execute(select(func.count()).select_from(target.subquery()))
+        return int(result.scalar() or 0)
+
+    @staticmethod
+    async def bulk_delete_records(
+        db: AsyncSession,
+        app_id: UUID,
+        *,
+        ids: Optional[List[UUID]] = None,
+        filters: Optional[dict] = None,
+        user: Optional[User] = None,
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+        batch_size: int = BULK_WRITE_BATCH_SIZE,
+        on_batch: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> int:
+        """
+        Delete targeted records (and their notifications) in bounded batches.
+        Returns the number of deleted records.
+        """
+        target = RecordService._bulk_target_query(app_id, ids, filters, user, app_record_acl, record_query)
+        rollup = await RecordRollupService.settings(db, app_id)
+
+        def build_statement(batch: Any) -> Any:
+            # WITH batch AS (...), purged_notifications AS (DELETE FROM notifications ...),
+            # deleted AS (DELETE FROM records WHERE id IN (SELECT id FROM batch) RETURNING ...),
+            # rollup AS (INSERT INTO record_rollups ...) SELECT record_number, id FROM deleted
+            batch_cte = batch.cte("batch")
+            purged_notifications = (
+                delete(Notification)
+                .where(Notification.record_id.in_(select(batch_cte.c.id)))
+                .cte("purged_notifications")
+            )
+            deleted = (
+                delete(Record)
+                .where(Record.id.in_(select(batch_cte.c.id)))
+                .returning(
+                    Record.record_number,
+                    Record.id,
+                    *RecordRollupService.keyed_columns(rollup, Record.status, Record.data),
+                )
+                .cte("deleted")
+            )
+            changes = RecordRollupService.returned_changes(rollup, deleted, sign=-1)
+            rollup_cte = RecordRollupService.upsert_statement(app_id, rollup, changes).cte("rollup")
+            return (
+                select(deleted.c.record_number, deleted.c.id)
+                .add_cte(batch_cte)
+                .add_cte(purged_notifications)
+                .add_cte(rollup_cte)
+            )
+
+        return await RecordService._run_in_batches(db, target, build_statement, batch_size, on_batch)
+
     @staticmethod
     async def execute_workflow_action(
         db: AsyncSession,
         app: App,
-        record_id: UUID,
+        record: Record,
         actor: User,
         action_name: str,
         next_assignee_id: Optional[UUID] = None,
         comment: Optional[str] = None,
-    ) -> Optional[Record]:
-        record = await RecordService.get_record(db, record_id)
-        if not record:
-            return None
-
+    ) -> Record:
+        """
+        Apply a workflow action to `record` (as loaded by the caller). The transition is one
+        UPDATE ... RETURNING guarded by the status (and, for non-superusers, the assignees) the
+        action was validated against, with the workflow event and rollups written in the same
+        statement. A transition in flight on the same record is waited for and the guard is
+        rechecked against the row it leaves; if the status moved on, WorkflowTransitionConflict
+        is raised.
+        """
         pm = app.process_management or {}
         if not pm.get("enabled"):
             raise ValueError("process management is disabled")
 
         actions = pm.get("actions") or []
-        action = RecordService._find_transition_action(actions, action_name, record.status)
+        from_status = record.status
+        action = RecordService._find_transition_action(actions, action_name, from_status)
         if not action:
             raise ValueError("action is not allowed from current status")
 
@@ -119,64 +538,60 @@ class RecordService:
             elif selection == "single" and len(next_assignees) > 1:
                 raise ValueError("next_assignee_id is required for single-select step")
 
+        condition = and_(Record.id == record.id, Record.status == from_status)
+        if not actor.is_superuser:
+            condition = and_(condition, RecordService._actor_can_execute_condition(actor))
+
         now = datetime.now(timezone.utc)
-        history = list(record.workflow_history or [])
-        history.append(
+        rollup = RollupSettings.from_app(app)
+        statement = RecordService._update_statement(
+            app.id,
+            condition,
             {
-                "actor_id": str(actor.id),
-                "action": action_name,
-                "from_status": record.status,
-                "to_status": to_status,
-                "comment": comment,
-                "at": now.isoformat(),
-            }
+                **RecordService._update_values(app.id, None, to_status),
+                "workflow_approver_ids": literal(next_assignees, JSONB),
+                "workflow_current_step": 0,
+                "workflow_submitted_at": func.coalesce(Record.workflow_submitted_at, now),
+                "workflow_requester_id": case(
+                    (Record.workflow_submitted_at.is_(None), Record.created_by),
+                    else_=Record.workflow_requester_id,
+                ),
+                "workflow_decided_at": None if next_assignees else now,
+            },
+            rollup,
+            RECORD_COLUMNS,
+            track_rollup=rollup.affected_by(to_status != from_status, ()),
+            actor_id=literal(actor.id, Record.created_by.type),
+            chained={
+                "events": lambda updated: WorkflowEventService.insert_statement(
+                    updated, actor.id, action_name, from_status, to_status, comment
+                ),
+                **RecordAssigneeService.replace_statements(next_assignees),
+            },
         )
-
-        if not record.workflow_submitted_at:
-            record.workflow_submitted_at = now
-            record.workflow_requester_id = record.created_by
-
-        record.status = to_status
-        record.workflow_approver_ids = next_assignees
-        record.workflow_current_step = 0
-        record.workflow_history = history
-        record.workflow_decided_at = None if next_assignees else now
+        result = await db.execute(
+            select(Record).from_statement(statement).execution_options(populate_existing=True)
+        )
+        updated = result.scalars().first()
+        if updated is None:
+            await db.rollback()
+            raise WorkflowTransitionConflict("record has already moved on from this status")
 
         if RecordService._is_terminal_status(pm, to_status):
-            creator_id = record.created_by
+            creator_id = updated.created_by
             if creator_id and str(creator_id) != str(actor.id):
                 await NotificationService.create_notification(
                     db,
                     user_id=creator_id,
-                    app_id=record.app_id,
-                    record_id=record.id,
+                    app_id=updated.app_id,
+                    record_id=updated.id,
                     kind="workflow_terminal",
-                    title=f"レコード #{record.record_number} が {to_status} になりました",
+                    title=f"レコード #{updated.record_number} が {to_status} になりました",
                     message=f"アクション「{action_name}」が実行され、最終ステータス「{to_status}」に遷移しました。",
                 )
 
         await db.commit()
-        await db.refresh(record)
-        return record
-
-    @staticmethod
-    async def get_pending_approvals_for_user(
-        db: AsyncSession, user_id: UUID, app_id: Optional[UUID] = None
-    ) -> List[Record]:
-        query = select(Record)
-        if app_id:
-            query = query.where(Record.app_id == app_id)
-
-        result = await db.execute(query.order_by(Record.created_at.desc()))
-        records = result.scalars().all()
-
-        uid = str(user_id)
-        matched: List[Record] = []
-        for record in records:
-            current_assignees = {str(aid) for aid in (record.workflow_approver_ids or [])}
-            if uid in current_assignees:
-                matched.append(record)
-        return matched
+        return updated
 
     @staticmethod
     def _find_transition_action(actions: List[Dict[str, Any]], action_name: str, from_status: str) -> Optional[Dict[str, Any]]:
@@ -216,6 +631,18 @@ class RecordService:
         if not record.created_by or str(record.created_by) != str(actor.id):
             raise PermissionError("only record creator can execute this action")
 
+    @staticmethod
+    def _actor_can_execute_condition(actor: User) -> Any:
+        # SQL counterpart of _ensure_actor_can_execute, re-checked by the transition UPDATE.
+        approvers = Record.workflow_approver_ids
+        no_assignees = or_(
+            approvers.is_(None), func.jsonb_typeof(approvers) == "null", approvers == literal([], JSONB)
+        )
+        return or_(
+            approvers.contains([str(actor.id)]),
+            and_(no_assignees, Record.created_by == actor.id),
+        )
+
     @staticmethod
     async def _resolve_status_assignees(
         db: AsyncSession,
@@ -258,23 +685,25 @@ class RecordService:
     async def _expand_entities_to_user_ids(
         db: AsyncSession, entities: List[Dict[str, Any]]
     ) -> Set[str]:
+        # Departments and job titles are resolved together: cached memberships, then one query for the rest.
         user_ids: Set[str] = set()
+        department_ids: List[Any] = []
+        job_title_ids: List[Any] = []
 
         for entity in entities:
             etype = entity.get("entity_type")
             eid = entity.get("entity_id")
-            if etype == "user" and eid:
-                user_ids.add(str(eid))
-                continue
-            if etype == "department" and eid:
-                result = await db.execute(select(User.id).where(User.department_id == eid))
-                user_ids |= {str(uid) for uid in result.scalars().all()}
-                continue
-            if etype == "job_title" and eid:
-                result = await db.execute(select(User.id).where(User.job_title_id == eid))
-                user_ids |= {str(uid) for uid in result.scalars().all()}
+            if not eid:
                 continue
+            if etype == "user":
+                user_ids.add(str(eid))
+            elif etype == "department":
+                department_ids.append(eid)
+            elif etype == "job_title":
+                job_title_ids.append(eid)
 
+        if department_ids or job_title_ids:
+            user_ids |= await OrgMembershipService.members(db, department_ids, job_title_ids)
         return user_ids
 
     @staticmethod
@@ -341,6 +770,25 @@ class RecordService:
             query = query.where(or_(*acl_expressions))
         return query
 
+    @staticmethod
+    def _apply_record_text_search(query: Any, value: str) -> Any:
+        # Matches record values only (not keys); served by the whole-record trigram index.
+        pattern = contains_pattern(value)
+        query = query.where(func.kintone_record_text(Record.data).ilike(pattern, escape="\\"))
+        if not JSON_ESCAPED_CHARACTERS.search(value):
+            # data::text is a cheap superset check that spares most rows the value extraction
+            # when the index cannot narrow the search (terms shorter than three characters).
+            query = query.where(cast(Record.data, Text).ilike(pattern, escape="\\"))
+        return query
+
+    @staticmethod
+    def _apply_full_text_search(query: Any, value: str) -> Any:
+        # Words and CJK bigrams go through records.search_vector; terms without such a
+        # token (a single kanji, punctuation) fall back to the substring search.
+        if RecordSearchService.has_search_tokens(value):
+            return query.where(RecordSearchService.search_clause(value))
+        return RecordService._apply_record_text_search(query, value)
+
     @staticmethod
     def _apply_search_filters(query: Any, filters: Optional[dict]) -> Any:
         if not filters:
@@ -354,8 +802,9 @@ class RecordService:
                 if "$contains" in raw_filter:
                     contains_value = raw_filter.get("$contains")
                     if contains_value:
-                        query = query.where(Record.data.astext.ilike(f"%{contains_value}%"))
+                        query = RecordService._apply_full_text_search(query, str(contains_value))
                     continue
+
                 op = str(raw_filter.get("op", "eq"))
                 value = raw_filter.get("value")
             elif isinstance(raw_filter, str):
@@ -365,7 +814,10 @@ class RecordService:
                 continue
 
             if op == "contains":
-                query = query.where(Record.data[key].astext.ilike(f"%{value}%"))
+                # Same expression as the field's trigram index (config.trigramIndexed).
+                query = query.where(
+                    FieldIndexService.text_expression(key).ilike(contains_pattern(str(value)), escape="\\")
+                )
                 continue
 
             coerced_value = RecordService._coerce_filter_value(value)
@@ -374,30 +826,37 @@ class RecordService:
         return query
 
     @staticmethod
-    def _compact_records_for_list(records: List[Record], field_codes: Optional[List[str]]) -> List[Any]:
-        if not field_codes:
-            return records
-
-        requested_codes = [code for code in field_codes if code]
-        if not requested_codes:
-            return records
-
-        compact_records: List[Dict[str, Any]] = []
-        for record in records:
-            source_data = record.data or {}
-            compact_data = {code: source_data.get(code) for code in requested_codes if code in source_data}
-            compact_records.append(
-                {
-                    "id": record.id,
-                    "app_id": record.app_id,
-                    "record_number": record.record_number,
-                    "status": record.status,
-                    "data": compact_data,
-                    "created_at": record.created_at,
-                    "updated_at": record.updated_at,
-                }
+    def _list_items(rows: List[Any]) -> List[Dict[str, Any]]:
+        # Plain dicts keyed by LIST_ROW_KEYS; trailing (sort key) columns are dropped.
+        return [dict(zip(LIST_ROW_KEYS, row)) for row in rows]
+
+    @staticmethod
+    def _list_columns(entity: Any, field_codes: Optional[List[str]]) -> List[Any]:
+        """
+        Columns of a list row. With field_codes, `data` is projected in SQL to the
+        requested keys so the rest of the document never leaves the database:
+        (SELECT jsonb_object_agg(key, value) FROM jsonb_each(data) WHERE key IN (...)).
+        jsonb_each reads the (possibly TOASTed) document once, however many codes are requested.
+        """
+        data: Any = entity.data
+        requested_codes = [code for code in (field_codes or []) if code]
+        if requested_codes:
+            entries = func.jsonb_each(entity.data).table_valued("key", "value")
+            data = (
+                select(func.coalesce(func.jsonb_object_agg(entries.c.key, entries.c.value), literal({}, JSONB)))
+                .where(entries.c.key.in_(requested_codes))
+                .scalar_subquery()
             )
-        return compact_records
+        # Same order as LIST_ROW_KEYS.
+        return [
+            entity.id,
+            entity.app_id,
+            entity.record_number,
+            entity.status,
+            data.label("data"),
+            entity.created_at,
+            entity.updated_at,
+        ]
 
     @staticmethod
     async def get_records(
@@ -408,54 +867,102 @@ class RecordService:
         filters: Optional[dict] = None,
         field_codes: Optional[List[str]] = None,
         user: Optional['User'] = None, # Make optional for backward compat, but logic requires it for ACL
-        app_record_acl: Optional[List[dict]] = None
-    ) -> List[Any]:
-        query = select(Record).where(Record.app_id == app_id)
+        app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
+        search: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        query = select(*RecordService._list_columns(Record, field_codes)).where(RecordService._app_filter(app_id))
 
         query = RecordService._apply_record_acl_filter(query, user, app_record_acl)
         query = RecordService._apply_search_filters(query, filters)
+        query = RecordService._apply_record_query(query, record_query)
+
+        order_by = record_query.order_clauses() if record_query else [Record.record_number.desc()]
+        if search:
+            query = RecordService._apply_full_text_search(query, search)
+            if not (record_query and record_query.order_by) and RecordSearchService.has_search_tokens(search):
+                # Best matches first unless the query asks for an explicit order.
+                order_by = [RecordSearchService.rank_expression(search).desc(), *order_by]
+        query = query.order_by(*order_by).offset(skip).limit(limit)
         
-        query = query.order_by(Record.record_number.desc()).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        records = result.scalars().all()
-        return RecordService._compact_records_for_list(records, field_codes)
+        # Core execution on the session's connection: column tuples, no ORM result processing.
+        result = await (await db.connection()).execute(query)
+        return RecordService._list_items(result.all())
 
     @staticmethod
     async def get_records_paged(
         db: AsyncSession,
         app_id: UUID,
         limit: int = 50,
-        cursor_record_number: Optional[int] = None,
+        cursor: Optional[str] = None,
         filters: Optional[dict] = None,
         field_codes: Optional[List[str]] = None,
         user: Optional["User"] = None,
         app_record_acl: Optional[List[dict]] = None,
+        record_query: Optional[CompiledQuery] = None,
     ) -> Dict[str, Any]:
+        """
+        Keyset-paginated listing in the query's sort order (record_number desc by default).
+        `cursor` is the opaque next_cursor of the previous page; plain record numbers
+        from older clients are still accepted for the default sort.
+        """
         page_size = max(1, min(limit, 200))
-        query = select(Record).where(Record.app_id == app_id)
+        sort_keys = record_query.sort_keys() if record_query else with_tiebreaker([])
+        signature = listing_signature(app_id, filters, record_query.source if record_query else None)
 
+        cursor_values: Optional[List[Any]] = None
+        if cursor:
+            if cursor.isdigit() and len(sort_keys) == 1 and sort_keys[0].kind == "record_number":
+                cursor_values = [int(cursor)]
+            else:
+                cursor_values = decode_cursor(cursor, signature, sort_keys)
+
+        list_columns = RecordService._list_columns(Record, field_codes)
+        sort_columns = [key.expression.label(f"sort_{position}") for position, key in enumerate(sort_keys)]
+        query = select(*list_columns, *sort_columns).where(RecordService._app_filter(app_id))
         query = RecordService._apply_record_acl_filter(query, user, app_record_acl)
         query = RecordService._apply_search_filters(query, filters)
-        if cursor_record_number is not None:
-            query = query.where(Record.record_number < cursor_record_number)
+        query = RecordService._apply_record_query(query, record_query)
+        order_by = [key.clause() for key in sort_keys]
+
+        branches = keyset_branches(sort_keys, cursor_values) if cursor_values is not None else [[]]
+        if len(branches) == 1:
+            query = query.where(*branches[0]).order_by(*order_by).limit(page_size + 1)
+        elif not branches:
+            query = query.where(false())
+        else:
+            # Each branch is an index range read that stops after one page; only the
+            # union of those few rows is sorted again.
+            pages = union_all(
+                *(query.where(*conditions).order_by(*order_by).limit(page_size + 1) for conditions in branches)
+            ).subquery("pages")
+            page_columns = [pages.c[f"sort_{position}"] for position in range(len(sort_keys))]
+            query = (
+                select(*list(pages.c)[:len(list_columns)], *page_columns)
+                .order_by(
+                    *(
+                        column.desc() if key.descending else column.asc()
+                        for column, key in zip(page_columns, sort_keys)
+                    )
+                )
+                .limit(page_size + 1)
+            )
 
-        query = query.order_by(Record.record_number.desc()).limit(page_size + 1)
-        result = await db.execute(query)
-        records = result.scalars().all()
+        result = await (await db.connection()).execute(query)
+        rows = result.all()
 
-        has_next = len(records) > page_size
-        page_records = records[:page_size]
-        next_cursor: Optional[int] = None
-        if has_next and page_records:
-            next_cursor = page_records[-1].record_number
+        has_next = len(rows) > page_size
+        page_rows = rows[:page_size]
+        next_cursor: Optional[str] = None
+        if has_next and page_rows:
+            next_cursor = encode_cursor(signature, list(page_rows[-1])[len(list_columns):])
 
         return {
-            "items": RecordService._compact_records_for_list(page_records, field_codes),
+            "items": RecordService._list_items(page_rows),
             "next_cursor": next_cursor,
             "has_next": has_next,
         }
-    
+
     @staticmethod
     def check_record_permission(record: Record, user: 'User', app_record_acl: List[dict] = None) -> bool:
         if user.is_superuser:
@@ -509,41 +1016,110 @@ class RecordService:
         result = await db.execute(select(Record).where(Record.id == record_id))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_record_app_id(db: AsyncSession, record_id: UUID) -> Optional[UUID]:
+        return (await db.execute(select(Record.app_id).where(Record.id == record_id))).scalar()
+
     @staticmethod
     async def update_status(db: AsyncSession, record_id: UUID, action_name: str) -> Optional[Record]:
-        record = await RecordService.get_record(db, record_id)
-        if not record:
+        app_id = await RecordService.get_record_app_id(db, record_id)
+        if not app_id:
             return None
-        
+
         # Simple update for now
-        record.status = action_name
         # In real world, we would validate against app.process_management['actions']
-        
+        rollup = await RecordRollupService.settings(db, app_id)
+        statement = RecordService._update_statement(
+            app_id,
+            Record.id == record_id,
+            RecordService._update_values(app_id, None, action_name),
+            rollup,
+            RECORD_COLUMNS,
+            track_rollup=rollup.affected_by(True, ()),
+            actor_id=literal(None, Record.created_by.type),
+        )
+        result = await db.execute(
+            select(Record).from_statement(statement).execution_options(populate_existing=True)
+        )
+        record = result.scalars().first()
         await db.commit()
-        await db.refresh(record)
         return record
 
     @staticmethod
-    async def update_record(db: AsyncSession, record_id: UUID, record_update: 'RecordUpdate') -> Optional[Record]:
-        record = await RecordService.get_record(db, record_id)
-        if not record:
+    async def update_record(
+        db: AsyncSession,
+        app: App,
+        record_id: UUID,
+        record_update: 'RecordUpdate',
+        actor_id: Optional[UUID] = None,
+        expected_revision: Optional[int] = None,
+    ) -> Optional[Record]:
+        """
+        Merge record_update.data into the record (data = data || :patch, revision + 1) and/or
+        set its status with one UPDATE ... RETURNING, so concurrent patches never drop keys.
+        With expected_revision the update applies only while the record is still at that
+        revision; otherwise RecordRevisionConflict is raised with the revision read under the
+        same statement's row lock.
+        """
+        if not record_update.data and not record_update.status:
+            record = await RecordService.get_record(db, record_id)
+            if record and expected_revision is not None and record.revision != expected_revision:
+                raise RecordRevisionConflict(record.revision)
+            return record
+
+        rollup = RollupSettings.from_app(app)
+        statement = _record_update_statement(
+            app.id,
+            rollup,
+            rollup.affected_by(bool(record_update.status), list(record_update.data or {})),
+            bool(record_update.data),
+            bool(record_update.status),
+            expected_revision is not None,
+        )
+        result = await db.execute(
+            statement,
+            {
+                "record_id": record_id,
+                "patch": record_update.data,
+                "new_status": record_update.status,
+                "expected_revision": expected_revision,
+                "actor_id": actor_id,
+            },
+        )
+        row = result.first()
+        record = row[0] if row else None
+        if record is None:
+            await db.rollback()
+            if row is not None:
+                # Locked but not at the expected revision; current_revision was read under that lock.
+                raise RecordRevisionConflict(row.current_revision)
             return None
-        
-        if record_update.status:
-            record.status = record_update.status
-            
-        if record_update.data:
-            # Deep merge or replace? For simplicity, we merge keys.
-            # If replacing entirely is desired, we should do so.
-            # Usually patches merge.
-            current_data = record.data or {}
-            current_data.update(record_update.data)
-            record.data = current_data
-            # Note: For JSONB mutations in SQLAlchemy, we might need flag_modified if we modify in place.
-            # But reapplying the dict usually works. Just to be safe:
-            from sqlalchemy.orm.attributes import flag_modified
-            flag_modified(record, "data")
-            
         await db.commit()
-        await db.refresh(record)
         return record
+
+
+@lru_cache(maxsize=512)
+def _record_update_statement(
+    app_id: UUID, rollup: RollupSettings, track_rollup: bool, has_data: bool, has_status: bool, has_expected: bool
+) -> Any:
+    # The single-record update statement for one App and shape of update. The patch, status,
+    # record id, expected revision and actor are bound at execution, so building the CTE chain
+    # and its compiled form is paid once per shape rather than per request. Parameter names
+    # must not match records columns: those would be added to the UPDATE's SET clause.
+    patch = bindparam("patch", type_=JSONB) if has_data else None
+    status = bindparam("new_status", type_=Record.status.type) if has_status else None
+    condition = and_(Record.id == bindparam("record_id", type_=Record.id.type), Record.app_id == app_id)
+    guard = Record.revision == bindparam("expected_revision", type_=Record.revision.type) if has_expected else None
+    statement = RecordService._update_statement(
+        app_id,
+        condition,
+        RecordService._update_values(app_id, patch, status),
+        rollup,
+        RECORD_COLUMNS,
+        track_rollup=track_rollup,
+        patch=patch,
+        actor_id=bindparam("actor_id", type_=Record.created_by.type),
+        guard=guard,
+    )
+    entities = [Record, column("current_revision", Record.revision.type)] if has_expected else [Record]
+    return select(*entities).from_statement(statement).execution_options(populate_existing=True)
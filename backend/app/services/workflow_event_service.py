@@ -0,0 +1,65 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.models import WorkflowEvent
+
+WORKFLOW_EVENT_MAX_PAGE = 200
+
+
+class WorkflowEventService:
+    @staticmethod
+    def insert_statement(
+        updated: Any,
+        actor_id: Optional[UUID],
+        action: str,
+        from_status: Optional[str],
+        to_status: Optional[str],
+        comment: Optional[str] = None,
+    ) -> Any:
+        """
+        INSERT INTO workflow_events ... SELECT over the RETURNING (id, app_id) of the
+        data-modifying CTE that moved the record, so the event is written only if it moved.
+        """
+        return insert(WorkflowEvent).from_select(
+            ["record_id", "app_id", "actor_id", "action", "from_status", "to_status", "comment"],
+            select(
+                updated.c.id,
+                updated.c.app_id,
+                literal(actor_id, WorkflowEvent.actor_id.type),
+                literal(action, WorkflowEvent.action.type),
+                literal(from_status, WorkflowEvent.from_status.type),
+                literal(to_status, WorkflowEvent.to_status.type),
+                literal(comment, WorkflowEvent.comment.type),
+            ),
+        )
+
+    @staticmethod
+    async def list_events(
+        db: AsyncSession, record_id: UUID, limit: int = 50, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of a record's workflow events, newest first.
+        `cursor` is the next_cursor of the previous page (the id of its last event).
+        """
+        limit = max(1, min(limit, WORKFLOW_EVENT_MAX_PAGE))
+        query = select(WorkflowEvent).where(WorkflowEvent.record_id == record_id)
+        if cursor:
+            try:
+                before_id = int(cursor)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            query = query.where(WorkflowEvent.id < before_id)
+
+        result = await db.execute(query.order_by(WorkflowEvent.id.desc()).limit(limit + 1))
+        events = list(result.scalars().all())
+        has_next = len(events) > limit
+        events = events[:limit]
+        return {
+            "items": events,
+            "next_cursor": str(events[-1].id) if has_next else None,
+            "has_next": has_next,
+        }
@@ -0,0 +1,125 @@
+"""
+Workflow assignee rules naming many departments and job titles: one query per entity
+vs one batched query backed by the cached membership index.
+
+Seeds --departments departments and --job-titles job titles with --users users spread
+over them, then resolves a rule naming all of them. The legacy path runs one
+SELECT users.id per entity; RecordService._expand_entities_to_user_ids resolves them
+together, first with an empty cache and then warm. Reports time and statements.
+
+    python -m benchmarks.bench_assignee_entities --departments 20 --job-titles 20 --users 5000
+"""
+import argparse
+import asyncio
+import statistics
+from typing import Any, Dict, List, Set
+from uuid import uuid4
+
+from sqlalchemy import delete, event, text
+from sqlalchemy.future import select
+
+from app.models.organization import Department, JobTitle
+from app.models.user import User
+from app.services.org_membership_service import OrgMembershipService
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_engine, session_factory
+
+
+async def legacy_expand(db, entities: List[Dict[str, Any]]) -> Set[str]:
+    user_ids: Set[str] = set()
+    for entity in entities:
+        column = User.department_id if entity["entity_type"] == "department" else User.job_title_id
+        result = await db.execute(select(User.id).where(column == entity["entity_id"]))
+        user_ids |= {str(uid) for uid in result.scalars().all()}
+    return user_ids
+
+
+async def cold_expand(db, entities: List[Dict[str, Any]]) -> Set[str]:
+    OrgMembershipService.invalidate()
+    return await RecordService._expand_entities_to_user_ids(db, entities)
+
+
+async def warm_expand(db, entities: List[Dict[str, Any]]) -> Set[str]:
+    return await RecordService._expand_entities_to_user_ids(db, entities)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--job-titles", type=int, default=20)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    Session = session_factory(engine)
+    tag = uuid4().hex[:8]
+    department_ids = [uuid4() for _ in range(args.departments)]
+    job_title_ids = [uuid4() for _ in range(args.job_titles)]
+    try:
+        async with Session() as db:
+            db.add_all(
+                Department(id=eid, name=f"bench-{tag}-{n}", code=f"bench-{tag}-{n}")
+                for n, eid in enumerate(department_ids)
+            )
+            db.add_all(JobTitle(id=eid, name=f"bench-{tag}-{n}", rank=n) for n, eid in enumerate(job_title_ids))
+            await db.flush()
+            await db.execute(
+                text(
+                    """
+                    INSERT INTO users (id, email, hashed_password, is_active, is_superuser, department_id, job_title_id)
+                    SELECT gen_random_uuid(), 'bench-' || :tag || '-' || n || '@example.com', '-', true, false,
+                           (CAST(:departments AS uuid[]))[1 + n % :department_count],
+                           (CAST(:job_titles AS uuid[]))[1 + n % :job_title_count]
+                    FROM generate_series(1, :users) AS n
+                    """
+                ),
+                {
+                    "tag": tag,
+                    "departments": department_ids,
+                    "department_count": len(department_ids),
+                    "job_titles": job_title_ids,
+                    "job_title_count": len(job_title_ids),
+                    "users": args.users,
+                },
+            )
+            await db.commit()
+        async with engine.connect() as conn:
+            await conn.execute(text("ANALYZE users"))
+            await conn.commit()
+
+        entities = [{"entity_type": "department", "entity_id": str(eid)} for eid in department_ids]
+        entities += [{"entity_type": "job_title", "entity_id": str(eid)} for eid in job_title_ids]
+        async with Session() as db:
+            expected = await legacy_expand(db, entities)
+            strategies = (("per entity", legacy_expand), ("batched, cold", cold_expand), ("batched, warm", warm_expand))
+            for label, expand in strategies:
+                samples = []
+                for _ in range(args.repeat):
+                    statements = 0
+                    with Timer() as timer:
+                        resolved = await expand(db, entities)
+                    samples.append(timer.elapsed)
+                assert resolved == expected
+                print(
+                    f"{label:>13}: {statistics.median(samples) * 1000:7.2f} ms, {statements} statements, "
+                    f"{len(entities)} entities -> {len(resolved)} users"
+                )
+    finally:
+        async with Session() as db:
+            await db.execute(delete(User).where(User.email.like(f"bench-{tag}-%")))
+            await db.execute(delete(Department).where(Department.id.in_(department_ids)))
+            await db.execute(delete(JobTitle).where(JobTitle.id.in_(job_title_ids)))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+JSONB decode cost on connections: stdlib json vs the orjson codec.
+
+Seeds one app with --records wide rows (--fields keys, Japanese and ASCII text,
+numbers) and, once per codec (app.core.database.create_engine(json_codec=...)),
+measures process CPU time for:
+
+  list    RecordService.get_records, --page-size rows with the whole data document
+  export  RecordExportService._stream_rows over every record (server-side cursor)
+
+    python -m benchmarks.bench_json_codec --records 5000 --fields 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.services.record_export_service import RecordExportService
+from app.services.record_service import RecordService
+from benchmarks.common import bench_app, bench_engine, session_factory
+
+CODECS = ("json", "orjson")
+
+
+async def seed(engine, app_id: UUID, records: int, fields: int) -> None:
+    async with session_factory(engine)() as db:
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'Draft',
+                       (SELECT jsonb_object_agg(
+                                   'f' || i,
+                                   CASE i % 3 WHEN 0 THEN to_jsonb(n * i)
+                                   WHEN 1 THEN to_jsonb('見積書 ' || md5(n::text || i))
+                                   ELSE to_jsonb(md5(n::text || i)) END
+                               )
+                        FROM generate_series(1, :fields) AS i),
+                       '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records, "fields": fields},
+        )
+        await db.commit()
+
+
+async def cpu_time(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        await run()
+        samples.append(time.process_time() - started)
+    return statistics.median(samples)
+
+
+async def measure(json_codec: str, app_id: UUID, page_size: int, repeat: int) -> dict:
+    engine = bench_engine(json_codec=json_codec)
+    session = session_factory(engine)
+    try:
+        async with session() as db:
+
+            async def list_page() -> None:
+                await RecordService.get_records(db, app_id, limit=page_size)
+
+            async def export_all() -> None:
+                async for _ in RecordExportService._stream_rows(db, app_id, None, None, None):
+                    pass
+
+            await list_page()  # connect and warm up statement caches
+            return {
+                "list": await cpu_time(list_page, repeat),
+                "export": await cpu_time(export_all, max(1, repeat // 5)),
+            }
+    finally:
+        await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=5_000)
+    parser.add_argument("--fields", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-json-codec") as app_id:
+            await seed(engine, app_id, args.records, args.fields)
+            results = {codec: await measure(codec, app_id, args.page_size, args.repeat) for codec in CODECS}
+            for query in ("list", "export"):
+                baseline = results["json"][query]
+                line = " | ".join(f"{codec} {results[codec][query] * 1000:8.1f} ms" for codec in CODECS)
+                print(f"{query:>6}: {line} CPU ({baseline / results['orjson'][query]:.1f}x)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
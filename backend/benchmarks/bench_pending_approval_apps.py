@@ -0,0 +1,131 @@
+"""
+Approval inbox spread over many Apps: per-App permission lookups vs one batched query.
+
+Seeds --apps Apps with --records-per-app records each, all assigned to one non-admin
+user, and times that user's pending-approvals request. The legacy path lists the
+records and then loads each distinct App with its own query to check view permission;
+the batched path loads every App the user has assignments in with one query, checks
+each once and filters the page by the allowed App ids in SQL. Reports time and
+statements per request.
+
+    python -m benchmarks.bench_pending_approval_apps --apps 300
+"""
+import argparse
+import asyncio
+import statistics
+from uuid import uuid4
+
+from sqlalchemy import delete, event, text
+from sqlalchemy.future import select
+
+from app.models.models import App, Record, RecordAssignee
+from app.models.user import User
+from app.services.app_service import AppService
+from app.services.record_assignee_service import RecordAssigneeService
+from benchmarks.common import Timer, bench_engine, session_factory
+
+
+async def legacy_inbox(db, user: User, limit: int) -> list:
+    records = (
+        await db.execute(
+            select(Record)
+            .join(RecordAssignee, RecordAssignee.record_id == Record.id)
+            .where(RecordAssignee.user_id == user.id)
+            .order_by(RecordAssignee.assigned_at.desc(), RecordAssignee.record_id.desc())
+            .limit(limit)
+        )
+    ).scalars().all()
+    app_cache = {}
+    visible = []
+    for record in records:
+        if record.app_id not in app_cache:
+            app_cache[record.app_id] = await AppService.get_app(db, record.app_id)
+        app = app_cache[record.app_id]
+        if app and AppService.evaluate_app_permissions(app, user).view:
+            visible.append(record)
+    return visible
+
+
+async def batched_inbox(db, user: User, limit: int) -> list:
+    apps = await RecordAssigneeService.assigned_apps(db, user.id)
+    app_ids = [app.id for app in apps if AppService.evaluate_app_permissions(app, user).view]
+    return (await RecordAssigneeService.list_pending(db, user.id, app_ids=app_ids, limit=limit))["items"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=300)
+    parser.add_argument("--records-per-app", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    Session = session_factory(engine)
+    user_id = uuid4()
+    app_ids = [uuid4() for _ in range(args.apps)]
+    try:
+        async with Session() as db:
+            db.add(User(id=user_id, email=f"bench-approver-{user_id}@example.com", hashed_password="-"))
+            # Every other App hides itself from the user, so the permission check has work to do.
+            db.add_all(
+                App(
+                    id=app_id,
+                    name=f"bench-pending-approval-apps-{n}",
+                    app_acl=[] if n % 2 == 0 else [{"entity_type": "everyone", "allow_view": False}],
+                    record_acl=[],
+                )
+                for n, app_id in enumerate(app_ids)
+            )
+            await db.flush()
+            await db.execute(
+                text(
+                    """
+                    WITH inserted AS (
+                        INSERT INTO records (id, app_id, record_number, status, data,
+                                             workflow_approver_ids, workflow_current_step)
+                        SELECT gen_random_uuid(), app_id, n, 'In Review', '{}'::jsonb,
+                               jsonb_build_array(CAST(:user_id AS text)), 0
+                        FROM unnest(CAST(:app_ids AS uuid[])) AS app_id, generate_series(1, :per_app) AS n
+                        RETURNING id, app_id
+                    )
+                    INSERT INTO record_assignees (record_id, user_id, app_id)
+                    SELECT id, CAST(:user_id AS uuid), app_id FROM inserted
+                    """
+                ),
+                {"user_id": str(user_id), "app_ids": app_ids, "per_app": args.records_per_app},
+            )
+            await db.commit()
+
+        for label, inbox in (("per-app lookups", legacy_inbox), ("batched", batched_inbox)):
+            samples, per_request = [], 0
+            for _ in range(args.repeat):
+                async with Session() as db:
+                    user = await db.get(User, user_id)
+                    statements = 0
+                    with Timer() as timer:
+                        records = await inbox(db, user, args.page_size)
+                    samples.append(timer.elapsed)
+                    per_request = statements
+            print(
+                f"{label:>15}: {statistics.median(samples) * 1000:8.2f} ms, "
+                f"{per_request} statements, {len(records)} visible records"
+            )
+    finally:
+        async with Session() as db:
+            await db.execute(text("DELETE FROM records WHERE app_id = ANY(:app_ids)"), {"app_ids": app_ids})
+            await db.execute(delete(App).where(App.id.in_(app_ids)))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Approval inbox: scanning every record's approver list vs the record_assignees index.
+
+Seeds one app with --records rows, each assigned to one of --users approvers, and times
+one user's inbox the old way (load every record and filter workflow_approver_ids in
+Python) and as RecordAssigneeService.list_pending (first page and the page after it).
+
+    python -m benchmarks.bench_pending_approvals --records 200000 --users 50
+"""
+import argparse
+import asyncio
+import statistics
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, text
+from sqlalchemy.future import select
+
+from app.models.models import Record
+from app.models.user import User
+from app.services.record_assignee_service import RecordAssigneeService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+
+async def seed(engine, app_id: UUID, records: int, user_ids: list) -> None:
+    async with session_factory(engine)() as db:
+        db.add_all(
+            User(id=user_id, email=f"bench-approver-{user_id}@example.com", hashed_password="-") for user_id in user_ids
+        )
+        await db.flush()
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'In Review',
+                       jsonb_build_object('title', 'record ' || n),
+                       jsonb_build_array((CAST(:user_ids AS text[]))[1 + n % :users]), 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {
+                "app_id": app_id,
+                "records": records,
+                "user_ids": [str(user_id) for user_id in user_ids],
+                "users": len(user_ids),
+            },
+        )
+        await db.execute(
+            text(
+                """
+                INSERT INTO record_assignees (record_id, user_id, app_id, assigned_at)
+                SELECT id, (workflow_approver_ids ->> 0)::uuid, app_id, now() - record_number * interval '1 second'
+                FROM records WHERE app_id = :app_id
+                """
+            ),
+            {"app_id": app_id},
+        )
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE records"))
+        await conn.execute(text("ANALYZE record_assignees"))
+        await conn.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    user_ids = [uuid4() for _ in range(args.users)]
+    user_id = user_ids[0]
+    try:
+        async with bench_app(engine, "bench-pending-approvals") as app_id:
+            await seed(engine, app_id, args.records, user_ids)
+            async with session_factory(engine)() as db:
+
+                async def scan() -> int:
+                    records = (await db.execute(select(Record).where(Record.app_id == app_id))).scalars().all()
+                    matched = [r for r in records if str(user_id) in {str(a) for a in (r.workflow_approver_ids or [])}]
+                    db.expunge_all()
+                    return len(matched)
+
+                async def first_page() -> int:
+                    page = await RecordAssigneeService.list_pending(db, user_id, limit=args.page_size)
+                    db.expunge_all()
+                    return len(page["items"])
+
+                cursor = (await RecordAssigneeService.list_pending(db, user_id, limit=args.page_size))["next_cursor"]
+
+                async def next_page() -> int:
+                    page = await RecordAssigneeService.list_pending(db, user_id, limit=args.page_size, cursor=cursor)
+                    db.expunge_all()
+                    return len(page["items"])
+
+                for label, run in (("full scan", scan), ("inbox page 1", first_page), ("inbox page 2", next_page)):
+                    samples = []
+                    for _ in range(args.repeat):
+                        with Timer() as timer:
+                            rows = await run()
+                        samples.append(timer.elapsed)
+                    print(f"{label:>12}: {statistics.median(samples) * 1000:9.2f} ms ({rows} records)")
+    finally:
+        async with session_factory(engine)() as db:
+            await db.execute(delete(User).where(User.id.in_(user_ids)))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Chart aggregation cost: downloading every record and grouping in the client vs
+RecordAggregateService grouping in PostgreSQL.
+
+Seeds one app with --records rows (a DROP_DOWN, a NUMBER and a DATE field) and
+times "count and sum(amount) per team and month" both ways.
+
+    python -m benchmarks.bench_record_aggregate --records 200000
+"""
+import argparse
+import asyncio
+import statistics
+from collections import defaultdict
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.models.models import Field
+from app.schemas.record_schema import RecordAggregateRequest
+from app.services.record_aggregate_service import RecordAggregateService
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+FIELDS = [
+    Field(code="team", type="DROP_DOWN", label="Team"),
+    Field(code="amount", type="NUMBER", label="Amount"),
+    Field(code="due", type="DATE", label="Due"),
+]
+
+
+async def seed(engine, app_id: UUID, records: int) -> None:
+    async with session_factory(engine)() as db:
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'Draft',
+                       jsonb_build_object(
+                           'team', 'team-' || (n % 12),
+                           'amount', (n % 1000)::text,
+                           'due', to_char(date '2025-01-01' + (n % 365), 'YYYY-MM-DD')
+                       ),
+                       '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records},
+        )
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE records"))
+        await conn.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-record-aggregate") as app_id:
+            await seed(engine, app_id, args.records)
+            request = RecordAggregateRequest(
+                app_id=app_id,
+                group_by=[{"field": "team"}, {"field": "due", "interval": "month"}],
+                measures=[{"op": "count"}, {"op": "sum", "field": "amount"}],
+            )
+            async with session_factory(engine)() as db:
+
+                async def in_client() -> int:
+                    rows = await RecordService.get_records(db, app_id, limit=args.records)
+                    groups = defaultdict(lambda: [0, 0.0])
+                    for row in rows:
+                        data = row["data"]
+                        group = groups[(data["team"], data["due"][:7])]
+                        group[0] += 1
+                        group[1] += float(data["amount"])
+                    return len(groups)
+
+                async def in_sql() -> int:
+                    result = await RecordAggregateService.aggregate(db, request, FIELDS)
+                    return len(result["columns"][0]["values"])
+
+                for label, run in (("client", in_client), ("sql", in_sql)):
+                    samples = []
+                    for _ in range(args.repeat):
+                        with Timer() as timer:
+                            groups = await run()
+                        samples.append(timer.elapsed)
+                    print(f"{label:>6}: {statistics.median(samples) * 1000:8.1f} ms for {groups} groups")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+List page cost with and without SQL-side projection of field codes.
+
+Seeds one app with --records wide rows (--fields keys, every tenth one a long
+MULTI_LINE_TEXT-like value) and times one page of RecordService.get_records
+returning the whole document vs only the --list-fields columns of a list view,
+including JSON encoding of the page as the API would send it.
+
+    python -m benchmarks.bench_record_list --records 5000 --fields 200 --list-fields 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+
+async def seed(engine, app_id: UUID, records: int, fields: int) -> None:
+    async with session_factory(engine)() as db:
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'Draft',
+                       (SELECT jsonb_object_agg(
+                                   'f' || i,
+                                   CASE WHEN i % 10 = 0 THEN repeat(md5(n::text || i), 60) ELSE md5(n::text || i) END
+                               )
+                        FROM generate_series(1, :fields) AS i),
+                       '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records, "fields": fields},
+        )
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE records"))
+        await conn.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=5_000)
+    parser.add_argument("--fields", type=int, default=200)
+    parser.add_argument("--list-fields", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-record-list") as app_id:
+            await seed(engine, app_id, args.records, args.fields)
+            list_fields = [f"f{i}" for i in range(1, args.list_fields + 1)]
+            async with session_factory(engine)() as db:
+                for label, field_codes in (("full", None), ("projected", list_fields)):
+                    samples = []
+                    size = 0
+                    for _ in range(args.repeat):
+                        with Timer() as timer:
+                            rows = await RecordService.get_records(
+                                db, app_id, limit=args.page_size, field_codes=field_codes
+                            )
+                            size = len(json.dumps(jsonable_encoder([row._asdict() for row in rows])))
+                        samples.append(timer.elapsed)
+                    print(f"{label:>9}: {statistics.median(samples) * 1000:8.1f} ms, {size / 1024:8.0f} KiB per page")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
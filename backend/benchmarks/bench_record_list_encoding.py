@@ -0,0 +1,112 @@
+"""
+Per-page CPU cost of the record list endpoints: ORM + response_model vs Core rows.
+
+Seeds one app with --records rows of --fields keys and measures process CPU time
+for producing the response body of one --page-size page:
+
+  orm   select(Record) -> ORM instances -> RecordListResponse (from_attributes)
+        -> jsonable JSON -> JSONResponse, i.e. what FastAPI did with response_model
+  core  RecordService.get_records (column tuples on the session's connection)
+        -> app.core.encoding.dumps, the bytes read_records now returns
+
+Both include fetching the page, so the difference is hydration and encoding.
+
+    python -m benchmarks.bench_record_list_encoding --records 2000 --page-size 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, text
+
+from app.core import encoding
+from app.models.models import Record
+from app.schemas.record_schema import RecordListResponse
+from app.services.record_service import RecordService
+from benchmarks.common import bench_app, bench_engine, session_factory
+
+LIST_ADAPTER = TypeAdapter(List[RecordListResponse])
+
+
+async def seed(engine, app_id: UUID, records: int, fields: int) -> None:
+    async with session_factory(engine)() as db:
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data, created_at, updated_at,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'Draft',
+                       (SELECT jsonb_object_agg(
+                                   'f' || i,
+                                   CASE i % 3 WHEN 0 THEN to_jsonb(n * i) WHEN 1 THEN to_jsonb(md5(n::text || i))
+                                   ELSE to_jsonb(now() - n * interval '1 minute') END
+                               )
+                        FROM generate_series(1, :fields) AS i),
+                       now(), now(), '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records, "fields": fields},
+        )
+        await db.commit()
+
+
+async def orm_page(db, app_id: UUID, page_size: int) -> bytes:
+    query = (
+        select(Record)
+        .where(RecordService._app_filter(app_id))
+        .order_by(Record.record_number.desc())
+        .limit(page_size)
+    )
+    records = (await db.execute(query)).scalars().all()
+    content = LIST_ADAPTER.dump_python(LIST_ADAPTER.validate_python(records, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+
+async def core_page(db, app_id: UUID, page_size: int) -> bytes:
+    return encoding.dumps(await RecordService.get_records(db, app_id, limit=page_size))
+
+
+async def cpu_per_page(session, page, app_id: UUID, page_size: int, repeat: int) -> tuple:
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        # One session per page, like one HTTP request; the identity map does not carry over.
+        async with session() as db:
+            started = time.process_time()
+            body = await page(db, app_id, page_size)
+            samples.append(time.process_time() - started)
+    return statistics.median(samples), body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=2_000)
+    parser.add_argument("--fields", type=int, default=30)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-record-list-encoding") as app_id:
+            await seed(engine, app_id, args.records, args.fields)
+            session = session_factory(engine)
+            results = {}
+            for label, page in (("orm", orm_page), ("core", core_page)):
+                await cpu_per_page(session, page, app_id, args.page_size, 2)  # warm up statement caches
+                results[label] = await cpu_per_page(session, page, app_id, args.page_size, args.repeat)
+            assert results["orm"][1] == results["core"][1], "response bodies differ"
+            for label, (elapsed, body) in results.items():
+                print(f"{label:>4}: {elapsed * 1000:7.2f} ms CPU per {args.page_size}-row page ({len(body) / 1024:.0f} KiB)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
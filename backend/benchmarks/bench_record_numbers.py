@@ -0,0 +1,76 @@
+"""
+Record number allocation under concurrent writers on a single app.
+
+Compares the legacy `SELECT max(record_number) + 1` allocation with the
+per-app counter used by RecordService.create_record, reporting insert
+throughput and how many duplicate record numbers each strategy produced.
+
+    python -m benchmarks.bench_record_numbers --writers 50 --inserts 40
+"""
+import argparse
+import asyncio
+from collections import Counter
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from app.models.models import Record
+from app.schemas.record_schema import RecordCreate
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+
+async def legacy_create(db, app_id: UUID, data: dict) -> None:
+    result = await db.execute(select(func.max(Record.record_number)).where(Record.app_id == app_id))
+    next_number = (result.scalar() or 0) + 1
+    db.add(Record(app_id=app_id, record_number=next_number, status="Draft", data=data))
+    await db.commit()
+
+
+async def counter_create(db, app_id: UUID, data: dict) -> None:
+    await RecordService.create_record(db, RecordCreate(app_id=app_id, data=data), None)
+
+
+async def run(strategy, engine, app_id: UUID, writers: int, inserts: int) -> float:
+    Session = session_factory(engine)
+
+    async def writer(index: int) -> None:
+        async with Session() as db:
+            for n in range(inserts):
+                await strategy(db, app_id, {"writer": index, "n": n})
+
+    with Timer() as timer:
+        await asyncio.gather(*(writer(i) for i in range(writers)))
+    return timer.elapsed
+
+
+async def duplicates(engine, app_id: UUID) -> int:
+    async with session_factory(engine)() as db:
+        result = await db.execute(select(Record.record_number).where(Record.app_id == app_id))
+        counts = Counter(result.scalars().all())
+    return sum(count - 1 for count in counts.values() if count > 1)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--inserts", type=int, default=40, help="inserts per writer")
+    args = parser.parse_args()
+
+    engine = bench_engine(pool_size=args.writers)
+    total = args.writers * args.inserts
+    try:
+        for label, strategy in (("max()+1", legacy_create), ("counter", counter_create)):
+            async with bench_app(engine, f"bench-record-numbers-{label}") as app_id:
+                elapsed = await run(strategy, engine, app_id, args.writers, args.inserts)
+                dupes = await duplicates(engine, app_id)
+                print(
+                    f"{label:>8}: {total} inserts by {args.writers} writers in {elapsed:.2f}s "
+                    f"({total / elapsed:,.0f} rows/s), duplicate numbers: {dupes}"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
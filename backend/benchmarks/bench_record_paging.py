@@ -0,0 +1,98 @@
+"""
+Deep page reads: OFFSET vs keyset cursors.
+
+Seeds one app with --records rows and an indexed NUMBER field, then times
+reading a page at increasing depths sorted by that field, once with
+RecordService.get_records (OFFSET) and once with get_records_paged by
+following next_cursor.
+
+    python -m benchmarks.bench_record_paging --records 200000 --page-size 50
+"""
+import argparse
+import asyncio
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.models.models import Field
+from app.services.field_index_service import FieldIndexService
+from app.services.record_query import compile_query
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+DEPTHS = (1, 10, 100, 1000, 4000)
+
+
+async def seed(engine, app_id: UUID, records: int) -> Field:
+    async with session_factory(engine)() as db:
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'Draft', jsonb_build_object('amount', (n * 7919) % 5000),
+                       '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records},
+        )
+        field = Field(app_id=app_id, code="amount", label="Amount", type="NUMBER", config={"indexed": True})
+        db.add(field)
+        await db.commit()
+    await FieldIndexService.sync_app_indexes(engine, app_id)
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE records"))
+        await conn.commit()
+    return field
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-record-paging") as app_id:
+            field = await seed(engine, app_id, args.records)
+            record_query = compile_query("order by amount desc", [field])
+            depths = [depth for depth in DEPTHS if depth * args.page_size <= args.records]
+
+            async with session_factory(engine)() as db:
+                cursors = {}
+                cursor, page = None, 0
+                while page < depths[-1]:
+                    page += 1
+                    if page in depths:
+                        with Timer() as timer:
+                            result = await RecordService.get_records_paged(
+                                db, app_id, limit=args.page_size, cursor=cursor, record_query=record_query
+                            )
+                        cursors[page] = timer.elapsed
+                    else:
+                        result = await RecordService.get_records_paged(
+                            db, app_id, limit=args.page_size, cursor=cursor, record_query=record_query
+                        )
+                    cursor = result["next_cursor"]
+
+                for depth in depths:
+                    with Timer() as timer:
+                        await RecordService.get_records(
+                            db,
+                            app_id,
+                            skip=(depth - 1) * args.page_size,
+                            limit=args.page_size,
+                            record_query=record_query,
+                        )
+                    print(
+                        f"page {depth:>5}: offset {timer.elapsed * 1000:8.1f} ms, "
+                        f"keyset {cursors[depth] * 1000:8.1f} ms"
+                    )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
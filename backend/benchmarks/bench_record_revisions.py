@@ -0,0 +1,97 @@
+"""
+Revision log size and point-in-time reads.
+
+Seeds one record with --fields keys, applies --updates single-key edits through
+RecordService.update_record and compares the bytes stored in record_revisions with
+keeping a full copy of data per revision. Then times reconstructing revisions spread
+over the history (RecordRevisionService.data_at) against reading the current row.
+
+    python -m benchmarks.bench_record_revisions --fields 200 --updates 500
+"""
+import argparse
+import asyncio
+import statistics
+from uuid import UUID, uuid4
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app.models.models import App, Record, RecordRevision
+from app.schemas.record_schema import RecordUpdate
+from app.services.record_revision_service import RecordRevisionService
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+
+async def seed(engine, app_id: UUID, fields: int) -> UUID:
+    async with session_factory(engine)() as db:
+        record = Record(
+            id=uuid4(),
+            app_id=app_id,
+            record_number=1,
+            data={f"f{i}": f"value {i} " + "x" * 24 for i in range(fields)},
+            workflow_approver_ids=[],
+        )
+        db.add(record)
+        await db.commit()
+        return record.id
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fields", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-record-revisions") as app_id:
+            record_id = await seed(engine, app_id, args.fields)
+            async with session_factory(engine)() as db:
+                app = await db.get(App, app_id)
+                with Timer() as timer:
+                    for n in range(args.updates):
+                        patch = {f"f{n % args.fields}": f"edit {n}"}
+                        await RecordService.update_record(db, app, record_id, RecordUpdate(data=patch))
+                print(f"updates: {timer.elapsed / args.updates * 1000:8.2f} ms each")
+
+                data_size = (
+                    await db.execute(select(func.pg_column_size(Record.data)).where(Record.id == record_id))
+                ).scalar()
+                log_size = (
+                    await db.execute(
+                        select(
+                            func.sum(
+                                func.pg_column_size(RecordRevision.delta)
+                                + func.coalesce(func.pg_column_size(RecordRevision.snapshot), 0)
+                            )
+                        ).where(RecordRevision.record_id == record_id)
+                    )
+                ).scalar()
+                print(f"full copies: {data_size * args.updates / 1024:10.1f} KiB")
+                print(f"deltas:      {log_size / 1024:10.1f} KiB")
+
+                record = await RecordService.get_record(db, record_id)
+                revisions = [1 + step * args.updates // 10 for step in range(10)]
+                async def current() -> None:
+                    for _ in revisions:
+                        await db.execute(select(Record.data).where(Record.id == record_id))
+
+                async def as_of() -> None:
+                    for revision in revisions:
+                        await RecordRevisionService.data_at(db, record, revision=revision)
+
+                for label, run in (("current", current), ("as-of", as_of)):
+                    samples = []
+                    for _ in range(args.repeat):
+                        with Timer() as timer:
+                            await run()
+                        samples.append(timer.elapsed / len(revisions))
+                    print(f"{label:>7}: {statistics.median(samples) * 1000:8.2f} ms per read")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Status counts for the home screen: counting records live vs reading the maintained rollups.
+
+Seeds one app with --records rows spread over a few statuses and teams, rebuilds its
+rollups and times "records per status" as a GROUP BY over records and as
+RecordRollupService.status_counts.
+
+    python -m benchmarks.bench_record_rollups --records 500000
+"""
+import argparse
+import asyncio
+import statistics
+from uuid import UUID
+
+from sqlalchemy import func, text
+from sqlalchemy.future import select
+
+from app.models.models import App, Record
+from app.services.record_rollup_service import RecordRollupService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+
+async def seed(engine, app_id: UUID, records: int) -> None:
+    async with session_factory(engine)() as db:
+        app = await db.get(App, app_id)
+        app.view_settings = {"rollup_group_field": "team", "rollup_sum_fields": ["amount"]}
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n,
+                       (ARRAY['Draft', 'In Review', 'Approved', 'Rejected'])[1 + n % 4],
+                       jsonb_build_object('team', 'team-' || (n % 12), 'amount', n % 1000),
+                       '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records},
+        )
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE records"))
+        await conn.commit()
+    await RecordRollupService.rebuild_app(engine, app_id)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-record-rollups") as app_id:
+            await seed(engine, app_id, args.records)
+            async with session_factory(engine)() as db:
+
+                async def live() -> dict:
+                    result = await db.execute(
+                        select(Record.status, func.count()).where(Record.app_id == app_id).group_by(Record.status)
+                    )
+                    return dict(result.all())
+
+                async def rollup() -> dict:
+                    return (await RecordRollupService.status_counts(db, [app_id]))[app_id]
+
+                assert await live() == await rollup()
+                for label, run in (("live", live), ("rollup", rollup)):
+                    samples = []
+                    for _ in range(args.repeat):
+                        with Timer() as timer:
+                            await run()
+                        samples.append(timer.elapsed)
+                    print(f"{label:>6}: {statistics.median(samples) * 1000:8.2f} ms")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
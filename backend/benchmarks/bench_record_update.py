@@ -0,0 +1,91 @@
+"""
+Concurrent patches to one record: read-modify-write vs a single UPDATE ... RETURNING.
+
+--writers sessions each patch their own key of the same record --updates times. The
+legacy path loads the record, merges the patch in Python, writes the whole data back
+and refreshes it; RecordService.update_record merges with data || :patch in one
+statement. Reports throughput, statements per update and how many writers' last
+value is missing from the final data (lost updates).
+
+    python -m benchmarks.bench_record_update --writers 20 --updates 50
+"""
+import argparse
+import asyncio
+from uuid import UUID, uuid4
+
+from sqlalchemy import event
+from sqlalchemy.future import select
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.models.models import App, Record
+from app.schemas.record_schema import RecordUpdate
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+
+async def legacy_update(db, app: App, record_id: UUID, patch: dict) -> None:
+    record = (await db.execute(select(Record).where(Record.id == record_id))).scalar_one()
+    data = dict(record.data or {})
+    data.update(patch)
+    record.data = data
+    flag_modified(record, "data")
+    await db.commit()
+    await db.refresh(record)
+
+
+async def returning_update(db, app: App, record_id: UUID, patch: dict) -> None:
+    await RecordService.update_record(db, app, record_id, RecordUpdate(data=patch))
+
+
+async def seed(engine, app_id: UUID) -> UUID:
+    async with session_factory(engine)() as db:
+        record = Record(id=uuid4(), app_id=app_id, record_number=1, data={}, workflow_approver_ids=[])
+        db.add(record)
+        await db.commit()
+        return record.id
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=50, help="updates per writer")
+    args = parser.parse_args()
+
+    engine = bench_engine(pool_size=args.writers)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    total = args.writers * args.updates
+    try:
+        for label, strategy in (("read-modify-write", legacy_update), ("update returning", returning_update)):
+            async with bench_app(engine, f"bench-record-update-{label}") as app_id:
+                record_id = await seed(engine, app_id)
+                Session = session_factory(engine)
+
+                async def writer(index: int) -> None:
+                    async with Session() as db:
+                        app = await db.get(App, app_id)
+                        for n in range(args.updates):
+                            await strategy(db, app, record_id, {f"w{index}": n})
+
+                statements = 0
+                with Timer() as timer:
+                    await asyncio.gather(*(writer(i) for i in range(args.writers)))
+                per_update = statements / total
+                async with Session() as db:
+                    data = (await db.execute(select(Record.data).where(Record.id == record_id))).scalar_one()
+                lost = sum(1 for i in range(args.writers) if data.get(f"w{i}") != args.updates - 1)
+                print(
+                    f"{label:>17}: {total} updates in {timer.elapsed:.2f}s ({total / timer.elapsed:,.0f}/s), "
+                    f"{per_update:.1f} statements each, writers with lost updates: {lost}/{args.writers}"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Record text search latency: ILIKE over data::text vs trigram and full-text search.
+
+Seeds one app with --records rows (two text fields, title trigramIndexed),
+then times, per search term:
+
+  legacy     the original $contains path: data::text ILIKE '%term%' (full scan, also matches keys)
+  trigram    kintone_record_text(data) ILIKE, served by ix_records_text_trgm
+  $contains  full-text match on records.search_vector, served by ix_records_search_vector
+  ranked     the same, ordered by ts_rank_cd (GET /records?search=...)
+  field      data ->> 'title' ILIKE, served by the per-field trigram index
+
+Full-text search matches Latin words by prefix, so a fragment from the middle of a
+word (the "rare" hex term) is found by the substring paths only.
+
+Requires the pg_trgm and search vector migrations on the benchmark database.
+
+    python -m benchmarks.bench_text_search --records 1000000 --repeat 5
+"""
+import argparse
+import asyncio
+import statistics
+from uuid import UUID
+
+from sqlalchemy import Text, cast, select, text
+
+from app.models.models import Field, Record
+from app.services.field_index_service import FieldIndexService
+from app.services.record_search_service import RecordSearchService
+from app.services.record_service import RecordService
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+# (label, term): a rare hex fragment, a short common word, a multi-byte word.
+TERMS = (("rare", "a1b2c3"), ("common", "見積"), ("mid", "納品-0f"))
+
+
+async def seed(engine, app_id: UUID, records: int) -> None:
+    async with session_factory(engine)() as db:
+        await db.execute(
+            text(
+                """
+                INSERT INTO records (id, app_id, record_number, status, data,
+                                     workflow_approver_ids, workflow_current_step)
+                SELECT gen_random_uuid(), :app_id, n, 'Draft',
+                       jsonb_build_object(
+                           'title', (ARRAY['見積', '請求', '発注', '納品', '契約'])[1 + n % 5] || '-' || md5(n::text),
+                           'memo', 'メモ ' || md5((n * 31)::text)
+                       ),
+                       '[]'::jsonb, 0
+                FROM generate_series(1, :records) AS n
+                """
+            ),
+            {"app_id": app_id, "records": records},
+        )
+        db.add(
+            Field(app_id=app_id, code="title", label="Title", type="SINGLE_LINE_TEXT", config={"trigramIndexed": True})
+        )
+        db.add(Field(app_id=app_id, code="memo", label="Memo", type="MULTI_LINE_TEXT", config={}))
+        await db.commit()
+    await FieldIndexService.sync_app_indexes(engine, app_id)
+    await RecordSearchService.rebuild_app_vectors(engine, app_id, batch_size=10_000)
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE records"))
+        await conn.commit()
+
+
+async def timed(db, statement, repeat: int) -> tuple:
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        with Timer() as timer:
+            rows = len((await db.execute(statement)).all())
+        samples.append(timer.elapsed)
+    return statistics.median(samples), rows
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    try:
+        async with bench_app(engine, "bench-text-search") as app_id:
+            await seed(engine, app_id, args.records)
+            base = select(Record.id).where(RecordService._app_filter(app_id))
+            async with session_factory(engine)() as db:
+                for label, term in TERMS:
+                    statements = {
+                        "legacy": base.where(cast(Record.data, Text).ilike(f"%{term}%")),
+                        "trigram": RecordService._apply_record_text_search(base, term),
+                        "$contains": RecordService._apply_search_filters(base, {"$": {"$contains": term}}),
+                        "ranked": RecordService._apply_full_text_search(base, term).order_by(
+                            RecordSearchService.rank_expression(term).desc()
+                        ),
+                        "field": RecordService._apply_search_filters(base, {"title": term}),
+                    }
+                    results = []
+                    for name, statement in statements.items():
+                        elapsed, rows = await timed(db, statement.limit(args.limit), args.repeat)
+                        results.append(f"{name} {elapsed * 1000:8.1f} ms ({rows} rows)")
+                    print(f"{label:>6} {term!r:>10}: " + " | ".join(results))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+"""
+Concurrent workflow actions on one record: read-check-write vs a compare-and-set UPDATE.
+
+--actions sessions load the same record (all of them before any writes, like approvers
+who opened the page together) and then execute the same action. The legacy path checks
+record.status in Python and writes the new status and event through the ORM, so every
+session that read the old status wins and queues on the row lock behind the others;
+RecordService.execute_workflow_action applies the transition only while the row is still
+at the status it was validated against: sessions wait for the transition holding the row
+lock and then find the status changed. Reports winners, wall time and the peak number of sessions waiting on a lock, sampled
+from pg_locks by a separate connection.
+
+    python -m benchmarks.bench_workflow_contention --actions 100 --rounds 5
+"""
+import argparse
+import asyncio
+import threading
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, text, update
+from sqlalchemy.future import select
+
+from app.models.models import App, Record, WorkflowEvent
+from app.models.user import User
+from app.services.record_service import RecordService, WorkflowTransitionConflict
+from benchmarks.common import Timer, bench_app, bench_engine, session_factory
+
+PROCESS = {
+    "enabled": True,
+    "statuses": [
+        {"name": "Draft", "assignee": {"type": "creator"}},
+        {"name": "Approval", "assignee": {"type": "users", "user_ids": []}},
+        {"name": "Approved", "assignee": {}},
+    ],
+    "actions": [
+        {"name": "Submit", "from": "Draft", "to": "Approval"},
+        {"name": "Approve", "from": "Approval", "to": "Approved"},
+    ],
+}
+
+
+async def legacy_action(db, app: App, record: Record, actor: User) -> bool:
+    if record.status != "Approval" or str(actor.id) not in (record.workflow_approver_ids or []):
+        return False
+    db.add(
+        WorkflowEvent(
+            record_id=record.id, app_id=app.id, actor_id=actor.id,
+            action="Approve", from_status=record.status, to_status="Approved",
+        )
+    )
+    record.status = "Approved"
+    record.workflow_approver_ids = []
+    await db.commit()
+    return True
+
+
+async def cas_action(db, app: App, record: Record, actor: User) -> bool:
+    try:
+        await RecordService.execute_workflow_action(db, app, record, actor, "Approve")
+    except WorkflowTransitionConflict:
+        return False
+    return True
+
+
+class LockWaitSampler(threading.Thread):
+    """Peak count of ungranted locks, sampled on its own thread and connection while active."""
+
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        asyncio.run(self._sample())
+
+    async def _sample(self) -> None:
+        engine = bench_engine(pool_size=1)
+        try:
+            async with engine.connect() as conn:
+                while not self.stopped.is_set():
+                    waiting = await conn.scalar(text("SELECT count(*) FROM pg_locks WHERE NOT granted"))
+                    self.peak = max(self.peak, waiting)
+                    await asyncio.sleep(0.002)
+        finally:
+            await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--actions", type=int, default=100, help="concurrent actions per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = bench_engine(pool_size=args.actions)
+    Session = session_factory(engine)
+    async with Session() as db:
+        approver = User(email=f"bench-approver-{uuid4()}@example.com", hashed_password="-")
+        db.add(approver)
+        await db.commit()
+        approver_id = approver.id
+
+    try:
+        for label, strategy in (("read-check-write", legacy_action), ("compare-and-set", cas_action)):
+            async with bench_app(engine, f"bench-workflow-contention-{label}") as app_id:
+                async with Session() as db:
+                    await db.execute(update(App).where(App.id == app_id).values(process_management=PROCESS))
+                    record = Record(
+                        id=uuid4(), app_id=app_id, record_number=1, data={}, status="Approval",
+                        workflow_approver_ids=[str(approver_id)],
+                    )
+                    db.add(record)
+                    await db.commit()
+                    record_id: UUID = record.id
+
+                winners, elapsed, waiting = [], [], []
+                for _ in range(args.rounds):
+                    async with Session() as db:
+                        await db.execute(
+                            update(Record)
+                            .where(Record.id == record_id)
+                            .values(status="Approval", workflow_approver_ids=[str(approver_id)])
+                        )
+                        await db.execute(delete(WorkflowEvent).where(WorkflowEvent.record_id == record_id))
+                        await db.commit()
+
+                    loaded = asyncio.Barrier(args.actions)
+
+                    async def act() -> bool:
+                        async with Session() as db:
+                            app = await db.get(App, app_id)
+                            actor = await db.get(User, approver_id)
+                            record = await RecordService.get_record(db, record_id)
+                            await loaded.wait()
+                            return await strategy(db, app, record, actor)
+
+                    sampler = LockWaitSampler()
+                    sampler.start()
+                    with Timer() as timer:
+                        results = await asyncio.gather(*(act() for _ in range(args.actions)))
+                    sampler.stopped.set()
+                    sampler.join()
+                    async with Session() as db:
+                        events = await db.scalar(
+                            select(func.count()).select_from(WorkflowEvent).where(WorkflowEvent.record_id == record_id)
+                        )
+                    assert events == sum(results)
+                    winners.append(sum(results))
+                    elapsed.append(timer.elapsed)
+                    waiting.append(sampler.peak)
+
+                print(
+                    f"{label:>16}: winners per round {min(winners)}-{max(winners)} of {args.actions}, "
+                    f"{sum(elapsed) / args.rounds * 1000:.0f} ms per round, "
+                    f"peak sessions waiting on a lock {max(waiting)}"
+                )
+    finally:
+        async with Session() as db:
+            await db.execute(delete(User).where(User.id == approver_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
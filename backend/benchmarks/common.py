@@ -0,0 +1,75 @@
+"""
+Shared helpers for the ad-hoc benchmarks in this directory.
+
+Benchmarks talk to a real PostgreSQL database. They read BENCH_DATABASE_URL
+(falling back to TEST_DATABASE_URL from backend/.env) and clean up the apps
+they create. Run them from the backend directory, e.g.
+
+    python -m benchmarks.bench_record_numbers --writers 50
+"""
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import create_engine
+from app.models.models import App
+
+load_dotenv(Path(__file__).resolve().parents[1] / ".env")
+
+
+def bench_database_url() -> str:
+    url = os.getenv("BENCH_DATABASE_URL") or os.getenv("TEST_DATABASE_URL")
+    if not url:
+        raise RuntimeError("BENCH_DATABASE_URL or TEST_DATABASE_URL is required for benchmarks.")
+    if url == settings.SQLALCHEMY_DATABASE_URI:
+        raise RuntimeError("Benchmarks must not run against the development database.")
+    return url
+
+
+def bench_engine(pool_size: int = 10, **kwargs) -> AsyncEngine:
+    return create_engine(bench_database_url(), pool_size=pool_size, max_overflow=pool_size, **kwargs)
+
+
+def session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@asynccontextmanager
+async def bench_app(engine: AsyncEngine, name: str) -> AsyncIterator[UUID]:
+    """Create a throwaway app and remove it (and its records) afterwards."""
+    Session = session_factory(engine)
+    async with Session() as db:
+        app = App(name=name, app_acl=[], record_acl=[])
+        db.add(app)
+        await db.commit()
+        app_id = app.id
+    try:
+        yield app_id
+    finally:
+        async with Session() as db:
+            await db.execute(text("DELETE FROM notifications WHERE app_id = :app_id"), {"app_id": app_id})
+            await db.execute(text("DELETE FROM records WHERE app_id = :app_id"), {"app_id": app_id})
+            await db.execute(text("DELETE FROM fields WHERE app_id = :app_id"), {"app_id": app_id})
+            await db.execute(delete(App).where(App.id == app_id))
+            await db.commit()
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.started: Optional[float] = None
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - (self.started or 0.0)
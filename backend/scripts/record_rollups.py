@@ -0,0 +1,68 @@
+"""
+Check or rebuild the maintained record rollups (record_rollups).
+
+    python -m scripts.record_rollups check [--app-id ID] [--fix]
+    python -m scripts.record_rollups rebuild [--app-id ID]
+
+Without --app-id every App is processed. check exits with status 1 when any App's
+rollups differ from a fresh aggregation of its records; --fix rebuilds those Apps.
+"""
+import argparse
+import asyncio
+import sys
+from typing import List
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import create_engine
+from app.models.models import App
+from app.services.record_rollup_service import RecordRollupService
+
+
+async def app_ids(engine, app_id: str = None) -> List[UUID]:
+    if app_id:
+        return [UUID(app_id)]
+    async with AsyncSession(bind=engine) as db:
+        return list((await db.execute(select(App.id).order_by(App.created_at))).scalars().all())
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("check", "rebuild"))
+    parser.add_argument("--app-id")
+    parser.add_argument("--fix", action="store_true", help="check: rebuild Apps whose rollups differ")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    drifted = 0
+    try:
+        for app_id in await app_ids(engine, args.app_id):
+            if args.command == "rebuild":
+                groups = await RecordRollupService.rebuild_app(engine, app_id)
+                print(f"{app_id}: rebuilt {groups} groups")
+                continue
+            async with AsyncSession(bind=engine) as db:
+                mismatches = await RecordRollupService.check_app(db, app_id)
+            if not mismatches:
+                print(f"{app_id}: ok")
+                continue
+            drifted += 1
+            for mismatch in mismatches:
+                print(
+                    f"{app_id}: status={mismatch['status']!r} group={mismatch['group_value']!r} "
+                    f"expected {mismatch['expected']} {mismatch['expected_sums']}, "
+                    f"stored {mismatch['stored']} {mismatch['stored_sums']}"
+                )
+            if args.fix:
+                groups = await RecordRollupService.rebuild_app(engine, app_id)
+                print(f"{app_id}: rebuilt {groups} groups")
+    finally:
+        await engine.dispose()
+    return 1 if drifted and not args.fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,5 +1,10 @@
 import pytest
+from uuid import UUID
 from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.models.models import Field
+from app.services.field_index_service import FieldIndexService
 
 @pytest.fixture
 async def auth_headers(client: AsyncClient):
@@ -56,3 +61,55 @@ async def test_fields_ops(client: AsyncClient, auth_headers, test_app):
     codes = [f["code"] for f in fields]
     assert "field_1" in codes
     assert "user_select" in codes
+
+
+async def _record_field_indexes(db_session, app_id: str):
+    result = await db_session.execute(
+        text("SELECT indexdef FROM pg_indexes WHERE indexname LIKE :pattern"),
+        {"pattern": f"ix_rf_{UUID(app_id).hex}_%"},
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_indexed_field_manages_record_expression_index(client: AsyncClient, auth_headers, test_app, db_session):
+    app_id = test_app["id"]
+
+    response = await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "NUMBER", "code": "amount", "label": "Amount", "config": {"indexed": True}
+    })
+    assert response.status_code == 201
+    assert response.json()["index_state"] == "pending"
+
+    fields = (await client.get(f"/api/v1/fields/app/{app_id}", headers=auth_headers)).json()
+    assert fields[0]["index_state"] == "ready"
+    indexdefs = await _record_field_indexes(db_session, app_id)
+    assert len(indexdefs) == 1
+    assert "kintone_to_numeric((data ->> 'amount'::text))" in indexdefs[0]
+    await db_session.commit()
+
+    # A value that looks numeric but overflows numeric is indexed as NULL rather than failing the write.
+    created = await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"amount": "1e999999"}})
+    assert created.status_code == 201
+
+    # Re-syncing without the flag drops the index again.
+    response = await client.put(f"/api/v1/fields/app/{app_id}", headers=auth_headers, json=[
+        {"app_id": app_id, "type": "NUMBER", "code": "amount", "label": "Amount", "config": {}}
+    ])
+    assert response.status_code == 200
+    assert response.json()[0]["index_state"] is None
+    assert await _record_field_indexes(db_session, app_id) == []
+
+
+def test_trigram_indexed_text_field_requests_gin_index():
+    app_id = UUID("0f0e0d0c-0b0a-0908-0706-050403020100")
+    title = Field(code="title", type="SINGLE_LINE_TEXT", config={"indexed": True, "trigramIndexed": True})
+    indexes = FieldIndexService.field_indexes(app_id, title)
+    assert len(indexes) == 2
+    trigram_sql = indexes[FieldIndexService.trigram_index_name(app_id, title)]
+    assert "USING gin ((data ->> 'title') gin_trgm_ops)" in trigram_sql
+    assert f"WHERE app_id = '{app_id}'::uuid" in trigram_sql
+
+    # Only text fields can request a trigram index.
+    amount = Field(code="amount", type="NUMBER", config={"trigramIndexed": True})
+    assert FieldIndexService.field_indexes(app_id, amount) == {}
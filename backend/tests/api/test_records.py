@@ -1,6 +1,14 @@
+import csv
+import io
+import json
+import msgpack
 import pytest
+from uuid import UUID
 from httpx import AsyncClient
 
+from app.services.notification_service import NotificationService
+from app.services.record_service import RecordService
+
 @pytest.fixture
 async def auth_headers(client: AsyncClient):
     email = "test_records_user@example.com"
@@ -127,3 +135,797 @@ async def test_records_paged_cursor(client: AsyncClient, auth_headers, app_with_
     page2 = second_page.json()
     assert len(page2["items"]) == 2
     assert page2["items"][0]["record_number"] < page1["items"][-1]["record_number"]
+
+
+@pytest.mark.asyncio
+async def test_record_numbers_allocated_from_app_counter(client: AsyncClient, auth_headers, app_with_fields, db_session):
+    app_id = app_with_fields
+
+    numbers = []
+    for i in range(3):
+        response = await client.post(
+            "/api/v1/records",
+            headers=auth_headers,
+            json={"app_id": app_id, "data": {"title": f"Numbered {i}"}},
+        )
+        assert response.status_code == 201
+        numbers.append(response.json()["record_number"])
+    assert numbers == [1, 2, 3]
+
+    # A reserved range is contiguous and later records continue after it.
+    first = await RecordService.reserve_record_numbers(db_session, UUID(app_id), 10)
+    await db_session.commit()
+    assert first == 4
+
+    response = await client.post(
+        "/api/v1/records",
+        headers=auth_headers,
+        json={"app_id": app_id, "data": {"title": "After reservation"}},
+    )
+    assert response.json()["record_number"] == 14
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_records(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+
+    single = await client.post(
+        "/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "Single"}}
+    )
+    assert single.json()["record_number"] == 1
+
+    payload = {"records": [{"app_id": app_id, "data": {"title": f"Bulk {i}"}} for i in range(1500)]}
+    response = await client.post("/api/v1/records/bulk", headers=auth_headers, json=payload)
+    assert response.status_code == 201
+    items = response.json()["items"]
+    assert len(items) == 1500
+    assert [item["record_number"] for item in items] == list(range(2, 1502))
+
+    created = await client.get(f"/api/v1/records/{items[-1]['id']}", headers=auth_headers)
+    assert created.status_code == 200
+    assert created.json()["data"] == {"title": "Bulk 1499"}
+    assert created.json()["status"] == "Draft"
+
+    other_app = await client.post("/api/v1/apps", headers=auth_headers, json={"name": "Other App"})
+    mixed = await client.post(
+        "/api/v1/records/bulk",
+        headers=auth_headers,
+        json={
+            "records": [
+                {"app_id": app_id, "data": {}},
+                {"app_id": other_app.json()["id"], "data": {}},
+            ]
+        },
+    )
+    assert mixed.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_records_by_ids_and_filter(client: AsyncClient, auth_headers, app_with_fields, db_session):
+    app_id = app_with_fields
+
+    payload = {
+        "records": [
+            {"app_id": app_id, "data": {"title": f"Task {i}", "team": "red" if i % 2 else "blue"}}
+            for i in range(10)
+        ]
+    }
+    created = (await client.post("/api/v1/records/bulk", headers=auth_headers, json=payload)).json()["items"]
+
+    by_ids = await client.patch(
+        "/api/v1/records/bulk",
+        headers=auth_headers,
+        json={"app_id": app_id, "ids": [created[0]["id"], created[1]["id"]], "status": "Done"},
+    )
+    assert by_ids.status_code == 200
+    assert by_ids.json() == {"affected": 2}
+    record = (await client.get(f"/api/v1/records/{created[0]['id']}", headers=auth_headers)).json()
+    assert record["status"] == "Done"
+    assert record["data"] == {"title": "Task 0", "team": "blue"}
+
+    by_filter = await client.patch(
+        "/api/v1/records/bulk",
+        headers=auth_headers,
+        json={"app_id": app_id, "filters": {"team": {"op": "eq", "value": "red"}}, "data": {"priority": 1}},
+    )
+    assert by_filter.json() == {"affected": 5}
+    red = (await client.get(f"/api/v1/records/{created[1]['id']}", headers=auth_headers)).json()
+    assert red["data"] == {"title": "Task 1", "team": "red", "priority": 1}
+    blue = (await client.get(f"/api/v1/records/{created[2]['id']}", headers=auth_headers)).json()
+    assert "priority" not in blue["data"]
+
+    # Small batches still visit every matching row exactly once.
+    affected = await RecordService.bulk_update_records(
+        db_session, UUID(app_id), data={"archived": True}, filters={}, batch_size=3
+    )
+    assert affected == 10
+
+    missing_selection = await client.patch(
+        "/api/v1/records/bulk", headers=auth_headers, json={"app_id": app_id, "status": "Done"}
+    )
+    assert missing_selection.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_records_removes_notifications(client: AsyncClient, auth_headers, app_with_fields, db_session):
+    app_id = app_with_fields
+    user_id = (await client.get("/api/v1/users/me", headers=auth_headers)).json()["id"]
+
+    payload = {"records": [{"app_id": app_id, "data": {"title": f"Task {i}", "keep": i < 2}} for i in range(6)]}
+    created = (await client.post("/api/v1/records/bulk", headers=auth_headers, json=payload)).json()["items"]
+
+    await NotificationService.create_notification(
+        db_session,
+        user_id=UUID(user_id),
+        app_id=UUID(app_id),
+        record_id=UUID(created[3]["id"]),
+        title="done",
+        message="done",
+    )
+    await db_session.commit()
+
+    by_ids = await client.post(
+        "/api/v1/records/bulk/delete",
+        headers=auth_headers,
+        json={"app_id": app_id, "ids": [created[5]["id"]]},
+    )
+    assert by_ids.status_code == 200
+    assert by_ids.json() == {"affected": 1}
+
+    by_filter = await client.post(
+        "/api/v1/records/bulk/delete",
+        headers=auth_headers,
+        json={"app_id": app_id, "filters": {"keep": {"op": "eq", "value": "false"}}},
+    )
+    assert by_filter.json() == {"affected": 3}
+
+    remaining = (await client.get(f"/api/v1/records?app_id={app_id}", headers=auth_headers)).json()
+    assert sorted(r["data"]["title"] for r in remaining) == ["Task 0", "Task 1"]
+
+    notifications = (await client.get("/api/v1/notifications", headers=auth_headers)).json()
+    assert notifications["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_purge_records_runs_as_background_job(client: AsyncClient, auth_headers, app_with_fields, db_session):
+    app_id = app_with_fields
+    payload = {"records": [{"app_id": app_id, "data": {"title": f"Task {i}"}} for i in range(25)]}
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json=payload)
+
+    response = await client.post(
+        "/api/v1/records/bulk/purge", headers=auth_headers, json={"app_id": app_id, "filters": {}}
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["kind"] == "records.purge"
+    assert job["total"] == 25
+
+    status_res = await client.get(f"/api/v1/jobs/{job['id']}", headers=auth_headers)
+    assert status_res.status_code == 200
+    finished = status_res.json()
+    assert finished["status"] == "succeeded"
+    assert finished["processed"] == 25
+    assert finished["result"] == {"deleted": 25}
+    # Progress lives in the jobs table, so every worker reports the same state.
+    from sqlalchemy import select
+    from app.models.job import Job
+    stored = (await db_session.execute(select(Job.status, Job.processed).where(Job.id == UUID(job["id"])))).one()
+    assert tuple(stored) == ("succeeded", 25)
+
+    remaining = (await client.get(f"/api/v1/records?app_id={app_id}", headers=auth_headers)).json()
+    assert remaining == []
+
+
+@pytest.mark.asyncio
+async def test_export_records_as_ndjson_and_csv(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    payload = {
+        "records": [
+            {"app_id": app_id, "data": {"title": f"タスク {i}", "tags": ["a", "b"] if i == 0 else []}}
+            for i in range(3)
+        ]
+    }
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json=payload)
+
+    ndjson = await client.get(f"/api/v1/records/export?app_id={app_id}&format=ndjson", headers=auth_headers)
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [line["record_number"] for line in lines] == [3, 2, 1]
+    assert lines[-1]["data"] == {"title": "タスク 0", "tags": ["a", "b"]}
+
+    filters = json.dumps({"title": "タスク 1"})
+    csv_res = await client.get(
+        f"/api/v1/records/export?app_id={app_id}&format=csv&field_codes=title,tags&filters={filters}",
+        headers=auth_headers,
+    )
+    assert csv_res.status_code == 200
+    rows = list(csv.reader(io.StringIO(csv_res.content.decode("utf-8-sig"))))
+    assert rows[0] == ["id", "record_number", "status", "created_by", "created_at", "updated_at", "title", "tags"]
+    assert len(rows) == 2
+    assert rows[1][1] == "2"
+    assert rows[1][6:] == ["タスク 1", "[]"]
+
+    bad_format = await client.get(f"/api/v1/records/export?app_id={app_id}&format=xml", headers=auth_headers)
+    assert bad_format.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_records_from_csv(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()
+
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "NUMBER", "code": "amount", "label": "Amount"
+    })
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "DROP_DOWN", "code": "rank", "label": "Rank", "options": ["A", "B"]
+    })
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "DATETIME", "code": "due", "label": "Due"
+    })
+
+    content = "\n".join([
+        "title,Amount,rank,due,assignee,unknown",
+        f"Task 1,\"1,200\",A,2026-01-02T09:00:00+09:00,{me['email']},x",
+        "Task 2,abc,C,,,",
+        "Task 3,3.5,B,2026/01/03 10:00,,",
+    ])
+    response = await client.post(
+        "/api/v1/records/import",
+        headers=auth_headers,
+        data={"app_id": app_id},
+        files={"file": ("records.csv", content.encode("utf-8"), "text/csv")},
+    )
+    assert response.status_code == 202
+    job = (await client.get(f"/api/v1/jobs/{response.json()['id']}", headers=auth_headers)).json()
+    assert job["status"] == "succeeded"
+    assert job["processed"] == 3
+
+    result = job["result"]
+    assert result["inserted"] == 2
+    assert result["failed"] == 1
+    assert {"row": 1, "column": "unknown", "message": "column does not match any field and was ignored"} in result["errors"]
+    assert sorted(e["column"] for e in result["errors"] if e["row"] == 3) == ["amount", "rank"]
+
+    records = (await client.get(f"/api/v1/records?app_id={app_id}", headers=auth_headers)).json()
+    by_title = {r["data"]["title"]: r["data"] for r in records}
+    assert by_title["Task 1"] == {
+        "title": "Task 1", "amount": 1200, "rank": "A", "due": "2026-01-02T09:00:00+09:00", "assignee": me["id"]
+    }
+    assert by_title["Task 3"] == {"title": "Task 3", "amount": 3.5, "rank": "B", "due": "2026-01-03T10:00:00+00:00"}
+
+@pytest.mark.asyncio
+async def test_list_records_with_query(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "NUMBER", "code": "amount", "label": "Amount", "config": {"indexed": True}
+    })
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "DATE", "code": "close_date", "label": "Close date"
+    })
+    rows = [
+        {"title": "small", "amount": 500, "close_date": "2025-12-01"},
+        {"title": "large", "amount": "2500", "close_date": "2025-11-15"},
+        {"title": "late", "amount": 1500, "close_date": "2026-02-01"},
+        {"title": "mid", "amount": 1000, "close_date": "2025-10-01"},
+    ]
+    response = await client.post("/api/v1/records/bulk", headers=auth_headers, json={
+        "records": [{"app_id": app_id, "data": data} for data in rows]
+    })
+    assert response.status_code == 201
+
+    query = 'amount >= 1000 and close_date < "2026-01-01" order by amount desc'
+    response = await client.get("/api/v1/records", headers=auth_headers, params={"app_id": app_id, "query": query})
+    assert response.status_code == 200
+    assert [record["data"]["title"] for record in response.json()] == ["large", "mid"]
+
+    query = 'title in ("small", "late") or amount = 2500 order by close_date'
+    response = await client.get("/api/v1/records", headers=auth_headers, params={"app_id": app_id, "query": query})
+    assert [record["data"]["title"] for record in response.json()] == ["large", "small", "late"]
+
+    response = await client.get(
+        "/api/v1/records/export", headers=auth_headers, params={"app_id": app_id, "query": "amount < 1000"}
+    )
+    assert [json.loads(line)["data"]["title"] for line in response.text.splitlines()] == ["small"]
+
+    response = await client.patch("/api/v1/records/bulk", headers=auth_headers, json={
+        "app_id": app_id, "query": 'close_date >= "2026-01-01"', "status": "Late"
+    })
+    assert response.json() == {"affected": 1}
+
+    for bad_query in ['amount like "1"', "unknown = 1", "amount >="]:
+        response = await client.get(
+            "/api/v1/records", headers=auth_headers, params={"app_id": app_id, "query": bad_query}
+        )
+        assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_records_paged_keyset_on_sort_fields(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "NUMBER", "code": "amount", "label": "Amount", "config": {"indexed": True}
+    })
+    amounts = [300, None, 100, 300, 200, None, 100, 300, 50]
+    response = await client.post("/api/v1/records/bulk", headers=auth_headers, json={
+        "records": [
+            {"app_id": app_id, "data": {"title": f"R{i}", **({"amount": amount} if amount is not None else {})}}
+            for i, amount in enumerate(amounts)
+        ]
+    })
+    created = response.json()["items"]
+    number_by_title = {f"R{i}": item["record_number"] for i, item in enumerate(created)}
+
+    async def read_all(query: str, limit: int):
+        titles, cursor = [], None
+        while True:
+            params = {"app_id": app_id, "limit": limit, "query": query}
+            if cursor:
+                params["cursor"] = cursor
+            page = (await client.get("/api/v1/records/paged", headers=auth_headers, params=params)).json()
+            titles += [item["data"]["title"] for item in page["items"]]
+            if not page["has_next"]:
+                return titles
+            cursor = page["next_cursor"]
+            assert isinstance(cursor, str)
+
+    # NULLs sort as the largest value; record_number breaks ties in the direction of the last key.
+    def expected(descending: bool):
+        rows = [(amount if amount is not None else float("inf"), number_by_title[f"R{i}"], f"R{i}")
+                for i, amount in enumerate(amounts)]
+        return [title for _, _, title in sorted(rows, reverse=descending)]
+
+    for limit in (1, 2, 4):
+        assert await read_all("order by amount desc", limit) == expected(True)
+        assert await read_all("order by amount asc", limit) == expected(False)
+    assert await read_all("amount >= 100 order by amount", 2) == [
+        title for title in expected(False) if title not in ("R1", "R5", "R8")
+    ]
+
+    # A cursor only works for the listing it was issued for.
+    params = {"app_id": app_id, "limit": 2, "query": "order by amount desc"}
+    cursor = (await client.get("/api/v1/records/paged", headers=auth_headers, params=params)).json()["next_cursor"]
+    response = await client.get("/api/v1/records/paged", headers=auth_headers, params={
+        "app_id": app_id, "limit": 2, "query": "order by amount asc", "cursor": cursor
+    })
+    assert response.status_code == 400
+    response = await client.get("/api/v1/records/paged", headers=auth_headers, params={
+        "app_id": app_id, "limit": 2, "query": "order by amount desc", "cursor": cursor[:-2] + "xx"
+    })
+    assert response.status_code == 400
+
+    # Plain record numbers from older clients still page the default order.
+    response = await client.get("/api/v1/records/paged", headers=auth_headers, params={
+        "app_id": app_id, "limit": 3, "cursor": str(number_by_title["R5"])
+    })
+    assert [item["data"]["title"] for item in response.json()["items"]] == ["R4", "R3", "R2"]
+
+@pytest.mark.asyncio
+async def test_contains_filters_match_values_not_keys(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": "見積書 100% 確認"}},
+        {"app_id": app_id, "data": {"title": "請求書", "memo": ["first", "Second line"]}},
+        {"app_id": app_id, "data": {"title": "100 items"}},
+        {"app_id": app_id, "data": {"title": 'say "hi"'}},
+    ]})
+
+    async def titles(filters: dict):
+        response = await client.get(
+            "/api/v1/records", headers=auth_headers, params={"app_id": app_id, "filters": json.dumps(filters)}
+        )
+        assert response.status_code == 200
+        return sorted(record["data"]["title"] for record in response.json())
+
+    # Keys are not part of the searchable text, and only text fields are searched.
+    assert await titles({"$": {"$contains": "title"}}) == []
+    assert await titles({"$": {"$contains": "second"}}) == []
+    assert await titles({"$": {"$contains": "100%"}}) == ["100 items", "見積書 100% 確認"]
+    # Terms without a word fall back to substring search; wildcards in them are literal.
+    assert await titles({"$": {"$contains": "%"}}) == ["見積書 100% 確認"]
+    assert await titles({"title": "100"}) == ["100 items", "見積書 100% 確認"]
+    assert await titles({"title": "_"}) == []
+    # Characters escaped in the JSON text are still found.
+    assert await titles({"$": {"$contains": '"hi"'}}) == ['say "hi"']
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_is_ranked_and_kept_in_sync(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    created = (await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": "見積書の確認"}},
+        {"app_id": app_id, "data": {"title": "見積 見積 見積"}},
+        {"app_id": app_id, "data": {"title": "請求書 Invoices draft"}},
+        {"app_id": app_id, "data": {"title": "Other", "memo": "見積メモ"}},
+    ]})).json()["items"]
+    single = await client.post(
+        "/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "ｉｎｖｏｉｃｅ final"}}
+    )
+    assert single.status_code == 201
+
+    async def search(term: str):
+        response = await client.get(
+            "/api/v1/records", headers=auth_headers, params={"app_id": app_id, "search": term}
+        )
+        assert response.status_code == 200
+        return [record["data"]["title"] for record in response.json()]
+
+    # Most occurrences first; memo is not a text field of the app (yet).
+    assert await search("見積") == ["見積 見積 見積", "見積書の確認"]
+    assert await search("積書") == ["見積書の確認"]
+    # Latin words match by prefix, full-width input is normalized.
+    assert await search("INVOICE") == ["ｉｎｖｏｉｃｅ final", "請求書 Invoices draft"]
+    assert await search("invoice draft") == ["請求書 Invoices draft"]
+    # A single kanji has no bigram and falls back to substring search.
+    assert sorted(await search("書")) == ["見積書の確認", "請求書 Invoices draft"]
+
+    await client.put(f"/api/v1/records/{created[0]['id']}", headers=auth_headers, json={"data": {"title": "発注書"}})
+    assert await search("見積") == ["見積 見積 見積"]
+    assert await search("発注") == ["発注書"]
+
+    await client.patch(
+        "/api/v1/records/bulk",
+        headers=auth_headers,
+        json={"app_id": app_id, "ids": [created[1]["id"]], "data": {"title": "納品"}},
+    )
+    assert await search("見積") == []
+
+    # Adding a text field rebuilds the vectors of existing records.
+    await client.post("/api/v1/fields", headers=auth_headers, json={
+        "app_id": app_id, "type": "MULTI_LINE_TEXT", "code": "memo", "label": "Memo", "required": False
+    })
+    assert await search("見積") == ["Other"]
+
+
+@pytest.mark.asyncio
+async def test_list_projects_field_codes_defaulting_to_list_view(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": "A", "memo": "x" * 5000, "assignee": ["u1"]}},
+        {"app_id": app_id, "data": {"memo": "only memo"}},
+    ]})
+
+    async def list_data(path: str, **params):
+        response = await client.get(path, headers=auth_headers, params={"app_id": app_id, **params})
+        assert response.status_code == 200
+        body = response.json()
+        return [record["data"] for record in (body["items"] if "items" in body else body)]
+
+    # Absent keys are left out rather than returned as null.
+    assert await list_data("/api/v1/records", field_codes="title,assignee") == [{}, {"title": "A", "assignee": ["u1"]}]
+    assert await list_data("/api/v1/records") == [{"memo": "only memo"}, {"title": "A", "memo": "x" * 5000, "assignee": ["u1"]}]
+
+    view = await client.put(f"/api/v1/apps/{app_id}/view", headers=auth_headers, json={"list_fields": ["title"]})
+    assert view.status_code == 200
+    assert await list_data("/api/v1/records") == [{}, {"title": "A"}]
+    assert await list_data("/api/v1/records/paged", limit=1) == [{}]
+    assert await list_data("/api/v1/records/paged", field_codes="memo") == [{"memo": "only memo"}, {"memo": "x" * 5000}]
+
+
+@pytest.mark.asyncio
+async def test_responses_negotiate_msgpack(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "見積"}})
+    msgpack_headers = {**auth_headers, "Accept": "application/msgpack"}
+
+    paths = (
+        f"/api/v1/records?app_id={app_id}",
+        f"/api/v1/records/paged?app_id={app_id}",
+        f"/api/v1/fields/app/{app_id}",
+        "/api/v1/apps",
+    )
+    for path in paths:
+        as_json = await client.get(path, headers=auth_headers)
+        as_msgpack = await client.get(path, headers=msgpack_headers)
+        assert as_json.headers["content-type"] == "application/json"
+        assert as_msgpack.headers["content-type"] == "application/msgpack"
+        assert as_msgpack.headers["vary"] == "Accept"
+        assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+
+    # Errors stay JSON whatever the client accepts.
+    missing = await client.get(
+        "/api/v1/records/paged?app_id=00000000-0000-0000-0000-000000000000", headers=msgpack_headers
+    )
+    assert missing.status_code == 404
+    assert missing.json() == {"detail": "App not found"}
+
+
+@pytest.mark.asyncio
+async def test_count_records_exact_estimated_and_cached(client: AsyncClient, auth_headers, app_with_fields, monkeypatch):
+    from app.services import record_count_service
+
+    app_id = app_with_fields
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": f"Task {i}", "team": "red" if i % 3 == 0 else "blue"}}
+        for i in range(9)
+    ]})
+
+    async def count(**params):
+        response = await client.get("/api/v1/records/count", headers=auth_headers, params={"app_id": app_id, **params})
+        assert response.status_code == 200
+        return response.json()
+
+    assert await count() == {"count": 9, "exact": True}
+    assert await count(filters=json.dumps({"team": {"op": "eq", "value": "red"}})) == {"count": 3, "exact": True}
+    assert await count(query='title like "Task 1"') == {"count": 1, "exact": True}
+
+    # Served from the short-lived cache until it expires.
+    await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "Task 9"}})
+    assert await count() == {"count": 9, "exact": True}
+    record_count_service.COUNT_CACHE.clear()
+    assert await count() == {"count": 10, "exact": True}
+
+    # Above the threshold the planner's estimate is returned, unless an exact count is asked for.
+    monkeypatch.setattr(record_count_service, "EXACT_COUNT_THRESHOLD", 0)
+    estimated = await count(query='title = "Task 9"')
+    assert estimated["exact"] is False and estimated["count"] >= 1
+    assert await count(query='title = "Task 9"', exact=True) == {"count": 1, "exact": True}
+
+    invalid = await client.get(
+        "/api/v1/records/count", headers=auth_headers, params={"app_id": app_id, "query": "title =="}
+    )
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_count_records_with_loginuser_is_cached_per_user(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    await client.post("/api/v1/auth/signup", json={"email": "count_other@example.com", "password": "password123"})
+    login = await client.post("/api/v1/auth/login", data={"username": "count_other@example.com", "password": "password123"})
+    other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()["id"]
+    other = (await client.get("/api/v1/users/me", headers=other_headers)).json()["id"]
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": "mine 1", "assignee": me}},
+        {"app_id": app_id, "data": {"title": "mine 2", "assignee": me}},
+        {"app_id": app_id, "data": {"title": "theirs", "assignee": other}},
+    ]})
+
+    async def count(headers):
+        response = await client.get(
+            "/api/v1/records/count", headers=headers, params={"app_id": app_id, "query": "assignee in (LOGINUSER())"}
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["count"]
+
+    # The same query text selects different records for each user, so neither sees the other's cached count.
+    assert await count(auth_headers) == 2
+    assert await count(other_headers) == 1
+    assert await count(auth_headers) == 2
+
+@pytest.mark.asyncio
+async def test_aggregate_records_by_fields_and_month(client: AsyncClient, auth_headers, app_with_fields):
+    app_id = app_with_fields
+    for field in (
+        {"type": "DROP_DOWN", "code": "team", "label": "Team"},
+        {"type": "NUMBER", "code": "amount", "label": "Amount"},
+        {"type": "DATE", "code": "due", "label": "Due"},
+    ):
+        await client.post("/api/v1/fields", headers=auth_headers, json={"app_id": app_id, "required": False, **field})
+    me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()["id"]
+    other = "00000000-0000-0000-0000-000000000001"
+    await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": "a", "team": "red", "amount": "10", "due": "2026-01-05", "assignee": me}},
+        {"app_id": app_id, "data": {"title": "b", "team": "red", "amount": 30, "due": "2026-01-20", "assignee": [me, other]}},
+        {"app_id": app_id, "data": {"title": "c", "team": "red", "amount": 5, "due": "2026-02-01"}},
+        {"app_id": app_id, "data": {"title": "d", "team": "blue", "amount": 7, "due": "2026-01-31"}},
+    ]})
+
+    async def aggregate(**body):
+        response = await client.post("/api/v1/records/aggregate", headers=auth_headers, json={"app_id": app_id, **body})
+        assert response.status_code == 200, response.text
+        return {column["name"]: column["values"] for column in response.json()["columns"]}
+
+    by_team_month = await aggregate(
+        group_by=[{"field": "team"}, {"field": "due", "interval": "month"}],
+        measures=[{"op": "count"}, {"op": "sum", "field": "amount"}, {"op": "avg", "field": "amount"}],
+    )
+    assert by_team_month == {
+        "team": ["blue", "red", "red"],
+        "due:month": ["2026-01-01", "2026-01-01", "2026-02-01"],
+        "count": [1, 2, 1],
+        "sum:amount": [7.0, 40.0, 5.0],
+        "avg:amount": [7.0, 20.0, 5.0],
+    }
+
+    # DATE values are calendar days: a time zone behind UTC must not move them to the previous day or month.
+    by_month_new_york = await aggregate(
+        group_by=[{"field": "due", "interval": "month"}], timezone="America/New_York"
+    )
+    assert by_month_new_york == {"due:month": ["2026-01-01", "2026-02-01"], "count": [3, 1]}
+    by_day_new_york = await aggregate(
+        group_by=[{"field": "due", "interval": "day"}], query='team in ("red")', timezone="America/New_York"
+    )
+    assert by_day_new_york["due:day"] == ["2026-01-05", "2026-01-20", "2026-02-01"]
+
+    # Multi-user values count once per user; records without one form the null group.
+    by_assignee = await aggregate(group_by=[{"field": "assignee"}], query='team in ("red")')
+    assert by_assignee == {"assignee": sorted([me, other]) + [None], "count": [2, 1, 1] if me < other else [1, 2, 1]}
+
+    totals = await aggregate(measures=[{"op": "max", "field": "amount"}, {"op": "min", "field": "amount"}])
+    assert totals == {"max:amount": [30.0], "min:amount": [5.0]}
+
+    for body in (
+        {"group_by": [{"field": "title"}]},
+        {"group_by": [{"field": "due"}]},
+        {"measures": [{"op": "sum", "field": "team"}]},
+        {"group_by": [{"field": "created_at", "interval": "day"}], "timezone": "Mars/Base"},
+    ):
+        response = await client.post("/api/v1/records/aggregate", headers=auth_headers, json={"app_id": app_id, **body})
+        assert response.status_code == 400, body
+
+@pytest.mark.asyncio
+async def test_record_rollups_follow_every_write_path(client: AsyncClient, auth_headers, app_with_fields, db_session):
+    from app.services.record_rollup_service import RecordRollupService
+
+    app_id = app_with_fields
+    for field in ({"type": "DROP_DOWN", "code": "team", "label": "Team"}, {"type": "NUMBER", "code": "amount", "label": "Amount"}):
+        await client.post("/api/v1/fields", headers=auth_headers, json={"app_id": app_id, "required": False, **field})
+    await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "early", "team": "red", "amount": 1}})
+
+    invalid = await client.put(f"/api/v1/apps/{app_id}/view", headers=auth_headers, json={"rollup_group_field": "title"})
+    assert invalid.status_code == 400
+    # Changing the settings rebuilds the rollups, so the record created before is split by team too.
+    configured = await client.put(
+        f"/api/v1/apps/{app_id}/view", headers=auth_headers,
+        json={"rollup_group_field": "team", "rollup_sum_fields": ["amount"]},
+    )
+    assert configured.status_code == 200
+
+    created = await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "a", "team": "red", "amount": 10}})
+    bulk = await client.post("/api/v1/records/bulk", headers=auth_headers, json={"records": [
+        {"app_id": app_id, "data": {"title": "b", "team": "blue", "amount": "5.5"}},
+        {"app_id": app_id, "data": {"title": "c", "team": "blue", "amount": 4}},
+        {"app_id": app_id, "data": {"title": "d"}},
+    ]})
+    record_id = created.json()["id"]
+    await client.put(f"/api/v1/records/{record_id}", headers=auth_headers, json={"status": "Done", "data": {"amount": 20}})
+    await client.patch("/api/v1/records/bulk", headers=auth_headers, json={
+        "app_id": app_id, "ids": [bulk.json()["items"][1]["id"]], "data": {"team": "red"},
+    })
+    await client.post("/api/v1/records/bulk/delete", headers=auth_headers, json={
+        "app_id": app_id, "ids": [bulk.json()["items"][2]["id"]],
+    })
+
+    response = await client.get("/api/v1/records/rollup", headers=auth_headers, params={"app_id": app_id})
+    assert response.status_code == 200
+    assert response.json() == {
+        "app_id": app_id,
+        "group_field": "team",
+        "sum_fields": ["amount"],
+        "groups": [
+            {"status": "Done", "group_value": "red", "count": 1, "sums": {"amount": 20.0}},
+            {"status": "Draft", "group_value": "blue", "count": 1, "sums": {"amount": 5.5}},
+            {"status": "Draft", "group_value": "red", "count": 2, "sums": {"amount": 5.0}},
+        ],
+    }
+    assert await RecordRollupService.check_app(db_session, UUID(app_id)) == []
+
+    counts = await client.get("/api/v1/apps/status-counts", headers=auth_headers)
+    assert {"app_id": app_id, "counts": {"Done": 1, "Draft": 3}} in counts.json()
+
+
+@pytest.mark.asyncio
+async def test_record_revisions_store_deltas_and_replay(client: AsyncClient, auth_headers, app_with_fields, db_session, monkeypatch):
+    from sqlalchemy import select
+    from app.models.models import RecordRevision
+    from app.services import record_revision_service
+
+    monkeypatch.setattr(record_revision_service, "REVISION_SNAPSHOT_INTERVAL", 3)
+    app_id = app_with_fields
+    created = await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_id, "data": {"title": "v1", "note": "kept"}})
+    record_id = created.json()["id"]
+    assert created.json()["revision"] == 1
+
+    await client.put(f"/api/v1/records/{record_id}", headers=auth_headers, json={"data": {"title": "v2"}})
+    await client.put(f"/api/v1/records/{record_id}", headers=auth_headers, json={"data": {"title": "v3", "note": "kept"}})
+    await client.patch("/api/v1/records/bulk", headers=auth_headers, json={"app_id": app_id, "ids": [record_id], "data": {"title": "v4"}})
+    updated = await client.put(f"/api/v1/records/{record_id}", headers=auth_headers, json={"data": {"title": "v5"}})
+    assert updated.json()["revision"] == 5
+
+    page = await client.get(f"/api/v1/records/{record_id}/revisions", headers=auth_headers, params={"limit": 3})
+    assert page.json()["has_next"] is True
+    assert [(item["revision"], item["delta"]) for item in page.json()["items"]] == [
+        (5, {"title": "v5"}), (4, {"title": "v4"}), (3, {"title": "v3"}),
+    ]
+    older = await client.get(
+        f"/api/v1/records/{record_id}/revisions", headers=auth_headers, params={"cursor": page.json()["next_cursor"]}
+    )
+    assert [item["revision"] for item in older.json()["items"]] == [2, 1]
+
+    # Full data is stored only on the base revision and every third one.
+    snapshots = await db_session.execute(
+        select(RecordRevision.revision).where(RecordRevision.record_id == UUID(record_id), RecordRevision.snapshot.isnot(None))
+    )
+    assert sorted(snapshots.scalars().all()) == [1, 3]
+
+    for revision in range(1, 6):
+        state = await client.get(f"/api/v1/records/{record_id}/as-of", headers=auth_headers, params={"revision": revision})
+        assert state.status_code == 200
+        assert state.json()["data"] == {"title": f"v{revision}", "note": "kept"}
+
+    revised_at = older.json()["items"][0]["created_at"]
+    state = await client.get(f"/api/v1/records/{record_id}/as-of", headers=auth_headers, params={"at": revised_at})
+    assert state.json()["revision"] == 2
+    assert state.json()["data"]["title"] == "v2"
+
+    missing = await client.get(f"/api/v1/records/{record_id}/as-of", headers=auth_headers, params={"revision": 6})
+    assert missing.status_code == 404
+    ambiguous = await client.get(f"/api/v1/records/{record_id}/as-of", headers=auth_headers, params={"revision": 1, "at": revised_at})
+    assert ambiguous.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_user_keeps_their_revisions(client: AsyncClient, auth_headers, app_with_fields, db_session):
+    from sqlalchemy import select
+    from app.models.models import RecordRevision
+
+    created = await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_with_fields, "data": {"title": "a"}})
+    record_id = created.json()["id"]
+    await client.post("/api/v1/auth/signup", json={"email": "revision_editor@example.com", "password": "password123"})
+    login = await client.post("/api/v1/auth/login", data={"username": "revision_editor@example.com", "password": "password123"})
+    editor_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    editor_id = (await client.get("/api/v1/users/me", headers=editor_headers)).json()["id"]
+    await client.put(f"/api/v1/users/{editor_id}", headers=editor_headers, json={"is_superuser": True})
+    edited = await client.put(f"/api/v1/records/{record_id}", headers=editor_headers, json={"data": {"title": "b"}})
+    assert edited.json()["revision"] == 2
+
+    me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()["id"]
+    await client.put(f"/api/v1/users/{me}", headers=auth_headers, json={"is_superuser": True})
+    deleted = await client.delete(f"/api/v1/users/{editor_id}", headers=auth_headers)
+    assert deleted.status_code == 200
+    revisions = await db_session.execute(
+        select(RecordRevision.revision, RecordRevision.actor_id)
+        .where(RecordRevision.record_id == UUID(record_id))
+        .order_by(RecordRevision.revision)
+    )
+    assert [(revision, actor) for revision, actor in revisions.all()] == [(1, UUID(me)), (2, None)]
+
+
+@pytest.mark.asyncio
+async def test_update_record_checks_if_match_revision(client: AsyncClient, auth_headers, app_with_fields):
+    created = await client.post("/api/v1/records", headers=auth_headers, json={"app_id": app_with_fields, "data": {"title": "a", "note": "n"}})
+    record_id = created.json()["id"]
+    read = await client.get(f"/api/v1/records/{record_id}", headers=auth_headers)
+    assert read.headers["etag"] == '"1"'
+
+    updated = await client.put(
+        f"/api/v1/records/{record_id}", headers={**auth_headers, "If-Match": read.headers["etag"]}, json={"data": {"title": "b"}}
+    )
+    assert updated.status_code == 200
+    assert updated.headers["etag"] == '"2"'
+    assert updated.json()["data"] == {"title": "b", "note": "n"}
+    assert updated.json()["revision"] == 2
+
+    stale = await client.put(
+        f"/api/v1/records/{record_id}", headers={**auth_headers, "If-Match": '"1"'}, json={"data": {"title": "lost"}}
+    )
+    assert stale.status_code == 409
+    assert stale.headers["etag"] == '"2"'
+    invalid = await client.put(
+        f"/api/v1/records/{record_id}", headers={**auth_headers, "If-Match": "abc"}, json={"data": {"title": "x"}}
+    )
+    assert invalid.status_code == 400
+
+    unconditional = await client.put(f"/api/v1/records/{record_id}", headers=auth_headers, json={"data": {"note": "m"}, "status": "Done"})
+    assert unconditional.json()["revision"] == 3
+    assert unconditional.json()["status"] == "Done"
+
+    # A status change is a new revision as well, so an ETag taken before it no longer matches.
+    etag = (await client.get(f"/api/v1/records/{record_id}", headers=auth_headers)).headers["etag"]
+    status_only = await client.put(f"/api/v1/records/{record_id}", headers=auth_headers, json={"status": "Archived"})
+    assert status_only.json()["revision"] == 4
+    moved = await client.put(f"/api/v1/records/{record_id}/status", headers=auth_headers, json={"action": "Reopened"})
+    assert moved.json()["revision"] == 5
+    stale = await client.put(
+        f"/api/v1/records/{record_id}", headers={**auth_headers, "If-Match": etag}, json={"data": {"title": "lost"}}
+    )
+    assert stale.status_code == 409
+    assert stale.headers["etag"] == '"5"'
+    revisions = await client.get(f"/api/v1/records/{record_id}/revisions", headers=auth_headers)
+    assert [(item["revision"], item["delta"]) for item in revisions.json()["items"][:2]] == [(5, {}), (4, {})]
+    state = await client.get(f"/api/v1/records/{record_id}/as-of", headers=auth_headers, params={"revision": 5})
+    assert state.json()["data"] == {"title": "b", "note": "m"}
+    assert unconditional.json()["data"] == {"title": "b", "note": "m"}
+    missing = await client.put(f"/api/v1/records/{UUID(int=0)}", headers=auth_headers, json={"data": {"title": "x"}})
+    assert missing.status_code == 404
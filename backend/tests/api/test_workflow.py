@@ -82,7 +82,7 @@ async def test_workflow_transition_by_app_process_settings(client: AsyncClient):
 
     manager_pending = await client.get("/api/v1/records/pending-approvals", headers=manager_headers)
     assert manager_pending.status_code == 200
-    assert any(r["id"] == record_id for r in manager_pending.json())
+    assert any(r["id"] == record_id for r in manager_pending.json()["items"])
 
     director_try = await client.post(
         f"/api/v1/records/{record_id}/workflow/actions/Approve",
@@ -100,6 +100,11 @@ async def test_workflow_transition_by_app_process_settings(client: AsyncClient):
     assert manager_approve.json()["status"] == "Director Approval"
     assert manager_approve.json()["workflow_approver_ids"] == [director_id]
 
+    manager_pending = await client.get("/api/v1/records/pending-approvals", headers=manager_headers)
+    assert manager_pending.json()["items"] == []
+    director_pending = await client.get("/api/v1/records/pending-approvals", headers=director_headers)
+    assert [r["id"] for r in director_pending.json()["items"]] == [record_id]
+
     director_approve = await client.post(
         f"/api/v1/records/{record_id}/workflow/actions/Final Approve",
         headers=director_headers,
@@ -109,6 +114,9 @@ async def test_workflow_transition_by_app_process_settings(client: AsyncClient):
     assert director_approve.json()["status"] == "Approved"
     assert director_approve.json()["workflow_approver_ids"] == []
 
+    counts = await client.get("/api/v1/apps/status-counts", headers=requester_headers)
+    assert {"app_id": app_id, "counts": {"Approved": 1}} in counts.json()
+
 
 @pytest.mark.asyncio
 async def test_workflow_single_selection_requires_next_assignee(client: AsyncClient):
@@ -210,6 +218,34 @@ async def test_workflow_reject_transition(client: AsyncClient):
     assert reject.json()["status"] == "Draft"
     assert reject.json()["workflow_approver_ids"] == [record_res.json()["created_by"]]
 
+    resubmit = await client.post(
+        f"/api/v1/records/{record_id}/workflow/actions/Submit",
+        headers=requester_headers,
+        json={},
+    )
+    assert resubmit.status_code == 200
+
+    first_page = await client.get(
+        f"/api/v1/records/{record_id}/workflow/events", headers=requester_headers, params={"limit": 2}
+    )
+    assert first_page.status_code == 200
+    assert first_page.json()["has_next"] is True
+    events = first_page.json()["items"]
+    assert [event["action"] for event in events] == ["Submit", "Reject"]
+    assert events[1]["actor_id"] == manager_id
+    assert events[1]["from_status"] == "Manager Approval"
+    assert events[1]["to_status"] == "Draft"
+    assert events[1]["comment"] == "insufficient details"
+
+    second_page = await client.get(
+        f"/api/v1/records/{record_id}/workflow/events",
+        headers=requester_headers,
+        params={"limit": 2, "cursor": first_page.json()["next_cursor"]},
+    )
+    assert second_page.json()["has_next"] is False
+    assert second_page.json()["next_cursor"] is None
+    assert [event["from_status"] for event in second_page.json()["items"]] == ["Draft"]
+
 
 @pytest.mark.asyncio
 async def test_workflow_invalid_action_and_invalid_from_status(client: AsyncClient):
@@ -342,6 +378,21 @@ async def test_workflow_assignee_entities_department_and_job_title(client: Async
     assert dept_user["id"] in approver_ids
     assert title_user["id"] in approver_ids
 
+    # Memberships are cached; moving a user out of the job title must be seen by the next resolution.
+    await client.put(f"/api/v1/users/{title_user['id']}", headers=title_user_headers, json={"job_title_id": None})
+    second_res = await client.post(
+        "/api/v1/records",
+        headers=requester_headers,
+        json={"app_id": app_id, "data": {"title": "Entity assignee 2"}},
+    )
+    second_submit = await client.post(
+        f"/api/v1/records/{second_res.json()['id']}/workflow/actions/Submit",
+        headers=requester_headers,
+        json={},
+    )
+    assert second_submit.status_code == 200
+    assert second_submit.json()["workflow_approver_ids"] == [dept_user["id"]]
+
 
 @pytest.mark.asyncio
 async def test_pending_approvals_hidden_when_no_app_view_permission(client: AsyncClient):
@@ -395,7 +446,7 @@ async def test_pending_approvals_hidden_when_no_app_view_permission(client: Asyn
     # The user is assignee but has no app view permission; should be filtered out.
     pending = await client.get("/api/v1/records/pending-approvals", headers=approver_headers)
     assert pending.status_code == 200
-    assert all(r["id"] != record_id for r in pending.json())
+    assert all(r["id"] != record_id for r in pending.json()["items"])
 
 
 @pytest.mark.asyncio
@@ -529,3 +580,164 @@ async def test_terminal_transition_creates_notification_for_creator(client: Asyn
         and "完了" in item["title"]
         for item in payload["items"]
     )
+
+
+@pytest.mark.asyncio
+async def test_workflow_action_conflicts_when_status_moved_on(client: AsyncClient, db_session):
+    from sqlalchemy import func, select, update
+
+    from app.models.models import Record, WorkflowEvent
+    from app.services.record_service import RecordService
+
+    requester_headers = await signup_and_login(client, "wf_cas_requester@example.com")
+    manager_headers = await signup_and_login(client, "wf_cas_manager@example.com")
+    manager_id = (await client.get("/api/v1/users/me", headers=manager_headers)).json()["id"]
+
+    app_res = await client.post("/api/v1/apps", headers=requester_headers, json={"name": "Workflow CAS App"})
+    app_id = app_res.json()["id"]
+    await create_user_selection_field(client, app_id, "manager_user_id", "Manager")
+    pm_payload = {
+        "enabled": True,
+        "statuses": [
+            {"name": "Draft", "assignee": {"type": "creator"}},
+            {"name": "Manager Approval", "assignee": {"type": "field", "field_code": "manager_user_id"}},
+            {"name": "Approved", "assignee": {}},
+        ],
+        "actions": [
+            {"name": "Submit", "from": "Draft", "to": "Manager Approval"},
+            {"name": "Approve", "from": "Manager Approval", "to": "Approved"},
+        ],
+    }
+    await client.put(f"/api/v1/apps/{app_id}/process", headers=requester_headers, json=pm_payload)
+    record_res = await client.post(
+        "/api/v1/records",
+        headers=requester_headers,
+        json={"app_id": app_id, "data": {"title": "Race", "manager_user_id": manager_id}},
+    )
+    record_id = record_res.json()["id"]
+    submit = await client.post(f"/api/v1/records/{record_id}/workflow/actions/Submit", headers=requester_headers, json={})
+    assert submit.status_code == 200
+    assert submit.json()["revision"] == 2
+
+    # Another approver's transition lands after the handler loaded the record but before it writes:
+    # the loaded record still says "Manager Approval", the row does not.
+    record = await RecordService.get_record(db_session, record_id)
+    assert record.status == "Manager Approval"
+    await db_session.execute(
+        update(Record)
+        .where(Record.id == record.id)
+        .values(status="Approved")
+        .execution_options(synchronize_session=False)
+    )
+    await db_session.commit()
+
+    approve = await client.post(f"/api/v1/records/{record_id}/workflow/actions/Approve", headers=manager_headers, json={})
+    assert approve.status_code == 409
+
+    event_count = await db_session.scalar(
+        select(func.count()).select_from(WorkflowEvent).where(WorkflowEvent.record_id == record_id)
+    )
+    assert event_count == 1
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_user_keeps_their_workflow_events(client: AsyncClient, db_session):
+    from sqlalchemy import select
+
+    from app.models.models import WorkflowEvent
+
+    admin_headers = await signup_and_login(client, "wf_delete_admin@example.com")
+    admin_id = (await client.get("/api/v1/users/me", headers=admin_headers)).json()["id"]
+    await client.put(f"/api/v1/users/{admin_id}", headers=admin_headers, json={"is_superuser": True})
+    admin_headers = await signup_and_login(client, "wf_delete_admin@example.com")
+    manager_headers = await signup_and_login(client, "wf_delete_manager@example.com")
+    manager_id = (await client.get("/api/v1/users/me", headers=manager_headers)).json()["id"]
+
+    app_id = (await client.post("/api/v1/apps", headers=admin_headers, json={"name": "Workflow Delete App"})).json()["id"]
+    await create_user_selection_field(client, app_id, "manager_user_id", "Manager")
+    pm_payload = {
+        "enabled": True,
+        "statuses": [
+            {"name": "Draft", "assignee": {"type": "creator"}},
+            {"name": "Manager Approval", "assignee": {"type": "field", "field_code": "manager_user_id"}},
+            {"name": "Approved", "assignee": {}},
+        ],
+        "actions": [
+            {"name": "Submit", "from": "Draft", "to": "Manager Approval"},
+            {"name": "Approve", "from": "Manager Approval", "to": "Approved"},
+        ],
+    }
+    await client.put(f"/api/v1/apps/{app_id}/process", headers=admin_headers, json=pm_payload)
+    record_id = (
+        await client.post(
+            "/api/v1/records", headers=admin_headers, json={"app_id": app_id, "data": {"manager_user_id": manager_id}}
+        )
+    ).json()["id"]
+    await client.post(f"/api/v1/records/{record_id}/workflow/actions/Submit", headers=admin_headers, json={})
+    approve = await client.post(f"/api/v1/records/{record_id}/workflow/actions/Approve", headers=manager_headers, json={})
+    assert approve.status_code == 200
+
+    deleted = await client.delete(f"/api/v1/users/{manager_id}", headers=admin_headers)
+    assert deleted.status_code == 200
+    events = await db_session.execute(
+        select(WorkflowEvent.action, WorkflowEvent.actor_id)
+        .where(WorkflowEvent.record_id == record_id)
+        .order_by(WorkflowEvent.id)
+        .execution_options(populate_existing=True)
+    )
+    assert [(action, str(actor) if actor else None) for action, actor in events.all()] == [
+        ("Submit", admin_id),
+        ("Approve", None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pending_approvals_are_paged_newest_assignment_first(client: AsyncClient):
+    requester_headers = await signup_and_login(client, "wf_inbox_requester@example.com")
+    manager_headers = await signup_and_login(client, "wf_inbox_manager@example.com")
+    manager_id = (await client.get("/api/v1/users/me", headers=manager_headers)).json()["id"]
+
+    app_res = await client.post("/api/v1/apps", headers=requester_headers, json={"name": "Workflow Inbox App"})
+    app_id = app_res.json()["id"]
+    await create_user_selection_field(client, app_id, "manager_user_id", "Manager")
+    pm_payload = {
+        "enabled": True,
+        "statuses": [
+            {"name": "Draft", "assignee": {"type": "creator"}},
+            {"name": "Manager Approval", "assignee": {"type": "field", "field_code": "manager_user_id"}},
+        ],
+        "actions": [{"name": "Submit", "from": "Draft", "to": "Manager Approval"}],
+    }
+    await client.put(f"/api/v1/apps/{app_id}/process", headers=requester_headers, json=pm_payload)
+
+    record_ids = []
+    for title in ("first", "second", "third"):
+        record_res = await client.post(
+            "/api/v1/records",
+            headers=requester_headers,
+            json={"app_id": app_id, "data": {"title": title, "manager_user_id": manager_id}},
+        )
+        record_ids.append(record_res.json()["id"])
+        submit = await client.post(
+            f"/api/v1/records/{record_ids[-1]}/workflow/actions/Submit", headers=requester_headers, json={}
+        )
+        assert submit.status_code == 200
+
+    first_page = await client.get(
+        "/api/v1/records/pending-approvals", headers=manager_headers, params={"limit": 2, "app_id": app_id}
+    )
+    assert first_page.status_code == 200
+    assert first_page.json()["has_next"] is True
+    second_page = await client.get(
+        "/api/v1/records/pending-approvals",
+        headers=manager_headers,
+        params={"limit": 2, "app_id": app_id, "cursor": first_page.json()["next_cursor"]},
+    )
+    assert second_page.json()["has_next"] is False
+    ids = [r["id"] for r in first_page.json()["items"] + second_page.json()["items"]]
+    assert ids == list(reversed(record_ids))
+
+    bad_cursor = await client.get(
+        "/api/v1/records/pending-approvals", headers=manager_headers, params={"cursor": "not-a-cursor"}
+    )
+    assert bad_cursor.status_code == 400
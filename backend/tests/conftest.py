@@ -1,14 +1,14 @@
 import pytest
 from typing import AsyncGenerator
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 from sqlalchemy import text
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
 from app.main import app
-from app.core.database import get_db
+from app.core.database import create_engine, get_db
 from app.core.config import settings
 
 load_dotenv(Path(__file__).resolve().parents[1] / ".env")
@@ -29,7 +29,7 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     if test_database_url == settings.SQLALCHEMY_DATABASE_URI:
         raise RuntimeError("TEST_DATABASE_URL must be different from development database URL.")
 
-    engine = create_async_engine(test_database_url)
+    engine = create_engine(test_database_url)
     TestingSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
     
     async with TestingSessionLocal() as session:
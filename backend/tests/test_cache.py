@@ -0,0 +1,20 @@
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_expires_and_bounds_entries():
+    now = [0.0]
+    cache = TTLCache(ttl=10, maxsize=2, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    now[0] = 9.9
+    cache.set("c", 3)  # evicts "a", the oldest entry
+    assert cache.get("a") is None
+    assert (cache.get("b"), cache.get("c")) == (2, 3)
+
+    now[0] = 10.0
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 1
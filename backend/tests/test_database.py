@@ -0,0 +1,51 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import literal, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core import database
+
+
+@pytest.mark.asyncio
+async def test_jsonb_round_trips_through_orjson_codec(db_session):
+    value = {"title": "見積書", "tags": ["a", "b"], "nested": {"n": 1, "x": 1.5, "ok": True, "none": None}}
+    with mock.patch.object(database, "_orjson_loads", wraps=database._orjson_loads) as loads:
+        result = await db_session.execute(select(literal(value, JSONB)))
+        assert result.scalar_one() == value
+        assert loads.called
+
+
+@pytest.mark.asyncio
+async def test_jsonb_numbers_outside_double_range_fall_back_to_stdlib(db_session):
+    result = await db_session.execute(text("""SELECT '{"n": 1e400}'::jsonb, '[1, 2]'::json"""))
+    jsonb_value, json_value = result.one()
+    assert jsonb_value["n"] == 10 ** 400
+    assert json_value == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_value_casts_return_null_instead_of_raising_or_drifting(db_session):
+    numbers = await db_session.execute(
+        text(
+            "SELECT kintone_to_numeric(' 1.5e3 '), kintone_to_numeric('1e999999'), "
+            "kintone_to_numeric(repeat('9', 1001)), kintone_to_numeric('abc')"
+        )
+    )
+    assert tuple(numbers.one()) == (1500, None, None, None)
+    # Values relative to the current time would make the IMMUTABLE cast (and indexes on it) drift.
+    moments = await db_session.execute(
+        text(
+            "SELECT kintone_to_timestamptz('2026-01-05'), kintone_to_timestamptz('now'), "
+            "kintone_to_timestamptz(' Today '), kintone_to_timestamptz('yesterday 10:00'), "
+            "kintone_to_timestamptz('tomorrow')"
+        )
+    )
+    first, *relative = moments.one()
+    assert first.isoformat() == "2026-01-05T00:00:00+00:00"
+    assert relative == [None, None, None, None]
+
+
+def test_create_engine_rejects_unknown_codec():
+    with pytest.raises(ValueError):
+        database.create_engine("postgresql+asyncpg://localhost/db", json_codec="simplejson")
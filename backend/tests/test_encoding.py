@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import msgpack
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import encoding
+from app.schemas.record_schema import RecordListResponse
+
+
+def test_dumps_matches_fastapi_response_encoding():
+    item = {
+        "id": uuid4(),
+        "app_id": uuid4(),
+        "record_number": 42,
+        "status": None,
+        "data": {"title": "見積書", "amount": 1.5, "tags": ["a", "b"], "nested": {"ok": True}},
+        "created_at": datetime(2026, 10, 17, 3, 4, 5, 123456, tzinfo=timezone.utc),
+        "updated_at": datetime(2026, 1, 1, 9, 0, tzinfo=timezone(timedelta(hours=9))),
+    }
+    # What FastAPI sends for response_model=List[RecordListResponse].
+    expected = JSONResponse(jsonable_encoder([RecordListResponse(**item)])).body
+
+    assert encoding.dumps([item]) == expected
+
+
+def test_isoformat_writes_utc_as_z():
+    assert encoding.isoformat(datetime(2026, 1, 2, tzinfo=timezone.utc)) == "2026-01-02T00:00:00Z"
+    assert encoding.isoformat(datetime(2026, 1, 2)) == "2026-01-02T00:00:00"
+    assert json.loads(encoding.dumps({"at": datetime(2026, 1, 2, tzinfo=timezone.utc)})) == {"at": "2026-01-02T00:00:00Z"}
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        ("", "application/json"),
+        ("application/json, text/plain, */*", "application/json"),
+        ("application/msgpack", "application/msgpack"),
+        ("application/x-msgpack, */*", "application/msgpack"),
+        ("application/json, application/msgpack;q=0.9", "application/json"),
+        ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+        ("application/msgpack;q=0", "application/json"),
+        ("text/html", "application/json"),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert encoding.negotiate(accept) == expected
+
+
+def test_packb_encodes_like_json():
+    item = {"id": uuid4(), "at": datetime(2026, 1, 2, tzinfo=timezone.utc), "data": {"n": 1}}
+    assert msgpack.unpackb(encoding.packb(item)) == json.loads(encoding.dumps(item))
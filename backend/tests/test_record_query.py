@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+from app.models.models import Field
+from app.models.user import User
+from app.services.record_query import (
+    QUERY_MAX_DEPTH,
+    Condition,
+    Group,
+    RecordQueryError,
+    SortItem,
+    compile_query,
+    parse_query,
+)
+
+FIELDS = [
+    Field(code="amount", type="NUMBER", config={"indexed": True}),
+    Field(code="close_date", type="DATE", config={}),
+    Field(code="stage", type="DROP_DOWN", config={}),
+    Field(code="tags", type="CHECKBOX", config={}),
+    Field(code="note", type="MULTI_LINE_TEXT", config={}),
+    Field(code="owner", type="USER_SELECTION", config={}),
+    Field(code="title", type="SINGLE_LINE_TEXT", config={"indexed": True}),
+]
+
+
+def _sql(compiled) -> str:
+    return str(compiled.where.compile(dialect=postgresql.dialect()))
+
+
+def test_parse_precedence_and_sort():
+    parsed = parse_query('amount >= 1000 and close_date < "2026-01-01" or status in ("A", "B") order by amount desc, title')
+    assert parsed.where.operator == "or"
+    both, status = parsed.where.items
+    assert isinstance(both, Group) and both.operator == "and"
+    assert [(item.field, item.operator) for item in both.items] == [("amount", ">="), ("close_date", "<")]
+    assert isinstance(status, Condition) and status.operator == "in"
+    assert [value.value for value in status.values] == ["A", "B"]
+    assert parsed.order_by == (SortItem("amount", True), SortItem("title", False))
+
+
+def test_parse_is_cached():
+    text = 'stage = "won" and (tags in ("a") or note like "x")'
+    assert parse_query(text) is parse_query(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['amount >', 'amount = "x" order', '(amount = 1', 'title = "unterminated', 'amount ~ 1', 'order by'],
+)
+def test_syntax_errors(text):
+    with pytest.raises(RecordQueryError):
+        compile_query(text, FIELDS)
+
+
+def test_nesting_depth_is_limited():
+    nested = "(" * QUERY_MAX_DEPTH + "amount = 1" + ")" * QUERY_MAX_DEPTH
+    assert compile_query(nested, FIELDS) is not None
+    # Far below QUERY_MAX_LENGTH, but deep enough to exhaust the stack without the limit.
+    with pytest.raises(RecordQueryError, match="nested too deeply"):
+        compile_query("(" * 400 + "amount = 1" + ")" * 400, FIELDS)
+    with pytest.raises(RecordQueryError, match="nested too deeply"):
+        compile_query("(" * (QUERY_MAX_DEPTH + 1) + "amount = 1" + ")" * (QUERY_MAX_DEPTH + 1), FIELDS)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'missing = 1',
+        'amount = "abc"',
+        'amount like "1"',
+        'note = "x"',
+        'close_date > "2026-13-40"',
+        'tags = "a"',
+        'record_number = 1.5',
+        'title = TODAY()',
+        'order by tags',
+    ],
+)
+def test_type_errors(text):
+    with pytest.raises(RecordQueryError):
+        compile_query(text, FIELDS)
+
+
+def test_compiles_to_typed_index_expressions():
+    compiled = compile_query('amount >= 1000 and title = "x" order by amount desc', FIELDS)
+    sql = _sql(compiled)
+    assert "kintone_to_numeric(records.data ->> 'amount') >=" in sql
+    assert "(records.data ->> 'title') =" in sql
+    order = [str(clause.compile(dialect=postgresql.dialect())) for clause in compiled.order_clauses()]
+    assert order == ["kintone_to_numeric(records.data ->> 'amount') DESC", "records.record_number DESC"]
+
+
+def test_unindexed_equality_and_multi_values_use_containment():
+    sql = _sql(compile_query('stage in ("a", "b") and tags not in ("x")', FIELDS))
+    assert sql.count("records.data @>") == 3
+    assert "AND NOT (" in sql
+
+
+def test_negative_conditions_include_missing_values():
+    sql = _sql(compile_query('title != "x"', FIELDS))
+    assert "IS NULL" in sql
+
+
+def test_date_equality_covers_whole_day():
+    now = datetime(2026, 3, 1, 15, 30, tzinfo=timezone.utc)
+    compiled = compile_query("close_date = TODAY()", FIELDS, now=now)
+    params = compiled.where.compile(dialect=postgresql.dialect()).params
+    assert sorted(params.values()) == ["2026-03-01T00:00:00+00:00", "2026-03-02T00:00:00+00:00"]
+
+
+def test_loginuser_resolves_to_current_user():
+    user = User(id=uuid4())
+    compiled = compile_query("owner in (LOGINUSER()) and created_by = LOGINUSER()", FIELDS, user)
+    params = compiled.where.compile(dialect=postgresql.dialect()).params
+    assert {"owner": [str(user.id)]} in params.values()
+    assert user.id in params.values()
+    assert compiled.functions == {"LOGINUSER": str(user.id)}
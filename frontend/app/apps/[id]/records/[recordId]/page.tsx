@@ -3,8 +3,10 @@
 import { useParams } from 'next/navigation';
 import { useQuery } from '@tanstack/react-query';
 import { api } from '@/lib/axios';
+import { AxiosError } from 'axios';
 import { useRecord, useUpdateRecord } from '@/features/records/api/useRecord';
 import { useUpdateRecordStatus } from '@/features/records/api/useUpdateRecordStatus';
+import { useWorkflowEvents } from '@/features/records/api/useWorkflowEvents';
 import { Button } from '@/components/ui/button';
 import { ArrowLeft, Edit, X } from 'lucide-react';
 import Link from 'next/link';
@@ -67,7 +69,13 @@ export default function RecordDetailPage() {
     const [nextAssigneeId, setNextAssigneeId] = useState<string>('');
     const [workflowComment, setWorkflowComment] = useState('');
 
-    const { data: record, isLoading: isRecordLoading } = useRecord(recordId);
+    const { data: record, isLoading: isRecordLoading, refetch: refetchRecord } = useRecord(recordId);
+    const {
+        data: workflowEventPages,
+        hasNextPage: hasMoreWorkflowEvents,
+        fetchNextPage: fetchMoreWorkflowEvents,
+        isFetchingNextPage: isFetchingWorkflowEvents,
+    } = useWorkflowEvents(recordId);
     const { data: users } = useUsers();
 
     // Fetch App for name and permissions
@@ -147,6 +155,13 @@ export default function RecordDetailPage() {
                     setWorkflowComment('');
                 },
                 onError: (error: unknown) => {
+                    if (error instanceof AxiosError && error.response?.status === 409) {
+                        toast.error('他のユーザーが先に処理を進めました。最新の状態を読み込みました');
+                        setIsWorkflowDialogOpen(false);
+                        setSelectedAction(null);
+                        refetchRecord();
+                        return;
+                    }
                     const message =
                         typeof error === 'object' &&
                         error !== null &&
@@ -179,7 +194,7 @@ export default function RecordDetailPage() {
     const workflowCandidates = selectedAction
         ? resolveNextAssigneeCandidates(app?.process_management, selectedAction, record)
         : [];
-    const workflowHistory = record.workflow_history || [];
+    const workflowHistory = workflowEventPages?.pages.flatMap((page) => page.items) ?? [];
     const currentApprovers = record.workflow_approver_ids || [];
 
     const getUserLabel = (userId: string) => {
@@ -188,12 +203,17 @@ export default function RecordDetailPage() {
     };
 
     const handleSave = (data: Record<string, unknown>) => {
-        updateRecord({ data }, {
+        updateRecord({ data, revision: record.revision }, {
             onSuccess: () => {
                 toast.success('レコードを更新しました');
                 setIsEditing(false);
             },
-            onError: () => {
+            onError: (err) => {
+                if (err instanceof AxiosError && err.response?.status === 409) {
+                    toast.error('他のユーザーがレコードを更新しました。最新の内容を読み込んでから再度編集してください');
+                    refetchRecord();
+                    return;
+                }
                 toast.error('レコードの更新に失敗しました');
             }
         });
@@ -319,23 +339,33 @@ export default function RecordDetailPage() {
                     <p className="text-sm text-muted-foreground">まだワークフロー操作は実行されていません。</p>
                 ) : (
                     <div className="space-y-3">
-                        {workflowHistory
-                            .slice()
-                            .reverse()
-                            .map((event, index) => (
-                                <div key={`${event.at}-${event.actor_id}-${index}`} className="border rounded-md p-3">
-                                    <div className="flex flex-wrap items-center gap-2 text-sm">
-                                        <span className="font-medium">{event.action}</span>
-                                        <span className="text-muted-foreground">実行者: {getUserLabel(event.actor_id)}</span>
-                                        <span className="text-muted-foreground">
-                                            実行日時: {format(new Date(event.at), 'yyyy-MM-dd HH:mm')}
-                                        </span>
-                                    </div>
-                                    {event.comment && (
-                                        <p className="mt-1 text-sm text-muted-foreground">{event.comment}</p>
-                                    )}
+                        {workflowHistory.map((event) => (
+                            <div key={event.id} className="border rounded-md p-3">
+                                <div className="flex flex-wrap items-center gap-2 text-sm">
+                                    <span className="font-medium">{event.action}</span>
+                                    <span className="text-muted-foreground">
+                                        実行者: {event.actor_id ? getUserLabel(event.actor_id) : '-'}
+                                    </span>
+                                    <span className="text-muted-foreground">
+                                        実行日時: {format(new Date(event.created_at), 'yyyy-MM-dd HH:mm')}
+                                    </span>
                                 </div>
-                            ))}
+                                {event.comment && (
+                                    <p className="mt-1 text-sm text-muted-foreground">{event.comment}</p>
+                                )}
+                            </div>
+                        ))}
+                        {hasMoreWorkflowEvents && (
+                            <div className="flex justify-center">
+                                <Button
+                                    variant="outline"
+                                    onClick={() => fetchMoreWorkflowEvents()}
+                                    disabled={isFetchingWorkflowEvents}
+                                >
+                                    {isFetchingWorkflowEvents ? '読み込み中...' : 'もっと見る'}
+                                </Button>
+                            </div>
+                        )}
                     </div>
                 )}
             </div>
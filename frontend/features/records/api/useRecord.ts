@@ -12,12 +12,7 @@ export interface Record {
     created_by: string;
     workflow_requester_id?: string | null;
     workflow_approver_ids: string[];
-    workflow_history: {
-        actor_id: string;
-        action: string;
-        comment?: string | null;
-        at: string;
-    }[];
+    revision: number;
 }
 
 export const useRecord = (recordId: string) => {
@@ -35,14 +30,17 @@ export const useUpdateRecord = (appId: string, recordId: string) => {
     const queryClient = useQueryClient();
 
     return useMutation({
-        mutationFn: async (payload: { data: Record<string, unknown> }) => {
-            const { data: response } = await api.put(`/records/${recordId}`, payload);
+        // With `revision`, the update is sent with If-Match and fails with 409 if the record changed meanwhile.
+        mutationFn: async ({ revision, ...payload }: { data: Record<string, unknown>; revision?: number }) => {
+            const headers = revision !== undefined ? { 'If-Match': `"${revision}"` } : undefined;
+            const { data: response } = await api.put(`/records/${recordId}`, payload, { headers });
             return response;
         },
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['record', recordId] });
             queryClient.invalidateQueries({ queryKey: ['records', appId] });
             queryClient.invalidateQueries({ queryKey: ['records-infinite', appId] });
+            queryClient.invalidateQueries({ queryKey: ['records-count', appId] });
         }
     });
 };
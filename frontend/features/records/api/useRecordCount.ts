@@ -0,0 +1,26 @@
+import { useQuery } from '@tanstack/react-query';
+import { api } from '@/lib/axios';
+
+export interface RecordCount {
+    count: number;
+    // false when count is the server's estimate for a large result
+    exact: boolean;
+}
+
+export const useRecordCount = (appId: string, filters?: Record<string, unknown>, query?: string) => {
+    return useQuery({
+        queryKey: ['records-count', appId, filters, query],
+        queryFn: async (): Promise<RecordCount> => {
+            const params: Record<string, string> = { app_id: appId };
+            if (filters && Object.keys(filters).length > 0) {
+                params.filters = JSON.stringify(filters);
+            }
+            if (query) {
+                params.query = query;
+            }
+            const { data } = await api.get('/records/count', { params });
+            return data;
+        },
+        enabled: !!appId,
+    });
+};
@@ -4,15 +4,20 @@ import { AppRecord } from './useRecords';
 
 interface RecordsPageResponse {
     items: AppRecord[];
-    next_cursor: number | null;
+    next_cursor: string | null;
     has_next: boolean;
 }
 
-export const useRecordsPaged = (appId: string, filters?: Record<string, unknown>, fieldCodes?: string[]) => {
+export const useRecordsPaged = (
+    appId: string,
+    filters?: Record<string, unknown>,
+    fieldCodes?: string[],
+    query?: string,
+) => {
     const normalizedFieldCodes = (fieldCodes || []).filter(Boolean).sort();
 
     return useInfiniteQuery({
-        queryKey: ['records-infinite', appId, filters, normalizedFieldCodes],
+        queryKey: ['records-infinite', appId, filters, normalizedFieldCodes, query],
         queryFn: async ({ pageParam }): Promise<RecordsPageResponse> => {
             if (!appId) {
                 return { items: [], next_cursor: null, has_next: false };
@@ -22,7 +27,7 @@ export const useRecordsPaged = (appId: string, filters?: Record<string, unknown>
                 app_id: appId,
                 limit: 50,
             };
-            if (typeof pageParam === 'number') {
+            if (typeof pageParam === 'string') {
                 params.cursor = pageParam;
             }
             if (filters && Object.keys(filters).length > 0) {
@@ -31,11 +36,14 @@ export const useRecordsPaged = (appId: string, filters?: Record<string, unknown>
             if (normalizedFieldCodes.length > 0) {
                 params.field_codes = normalizedFieldCodes.join(',');
             }
+            if (query) {
+                params.query = query;
+            }
 
             const { data } = await api.get('/records/paged', { params });
             return data;
         },
-        initialPageParam: undefined as number | undefined,
+        initialPageParam: undefined as string | undefined,
         getNextPageParam: (lastPage) => (lastPage.has_next ? (lastPage.next_cursor ?? undefined) : undefined),
         enabled: !!appId,
     });
@@ -22,7 +22,9 @@ export const useUpdateRecordStatus = (appId: string) => {
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['records', appId] });
             queryClient.invalidateQueries({ queryKey: ['records-infinite', appId] });
+            queryClient.invalidateQueries({ queryKey: ['records-count', appId] });
             queryClient.invalidateQueries({ queryKey: ['record'] });
+            queryClient.invalidateQueries({ queryKey: ['workflow-events'] });
         }
     });
 };
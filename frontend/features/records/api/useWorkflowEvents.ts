@@ -0,0 +1,36 @@
+import { useInfiniteQuery } from '@tanstack/react-query';
+import { api } from '@/lib/axios';
+
+export interface WorkflowEvent {
+    id: number;
+    actor_id: string | null;
+    action: string;
+    from_status: string | null;
+    to_status: string | null;
+    comment?: string | null;
+    created_at: string;
+}
+
+interface WorkflowEventsPageResponse {
+    items: WorkflowEvent[];
+    next_cursor: string | null;
+    has_next: boolean;
+}
+
+// Newest first; each further page holds older events.
+export const useWorkflowEvents = (recordId: string) => {
+    return useInfiniteQuery({
+        queryKey: ['workflow-events', recordId],
+        queryFn: async ({ pageParam }): Promise<WorkflowEventsPageResponse> => {
+            const params: Record<string, string | number> = { limit: 20 };
+            if (typeof pageParam === 'string') {
+                params.cursor = pageParam;
+            }
+            const { data } = await api.get(`/records/${recordId}/workflow/events`, { params });
+            return data;
+        },
+        initialPageParam: undefined as string | undefined,
+        getNextPageParam: (lastPage) => (lastPage.has_next ? (lastPage.next_cursor ?? undefined) : undefined),
+        enabled: !!recordId,
+    });
+};
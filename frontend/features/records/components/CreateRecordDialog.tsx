@@ -37,6 +37,7 @@ export const CreateRecordDialog = ({ appId, fields, formColumns = 1 }: CreateRec
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['records', appId] });
             queryClient.invalidateQueries({ queryKey: ['records-infinite', appId] });
+            queryClient.invalidateQueries({ queryKey: ['records-count', appId] });
             setOpen(false);
         },
     });
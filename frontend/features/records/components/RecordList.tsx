@@ -2,6 +2,7 @@
 
 import { AppRecord } from '../api/useRecords';
 import { useRecordsPaged } from '../api/useRecordsPaged';
+import { useRecordCount } from '../api/useRecordCount';
 import { useUpdateRecordStatus } from '../api/useUpdateRecordStatus';
 import { Field } from '../../app-builder/types';
 import {
@@ -36,10 +37,13 @@ export const RecordList = ({ appId, fields, processManagement, filters }: Record
         fetchNextPage,
         isFetchingNextPage
     } = useRecordsPaged(appId, filters, fieldCodes);
+    const { data: total } = useRecordCount(appId, filters);
     const { mutate: updateStatus } = useUpdateRecordStatus(appId);
     const router = useRouter();
     const records = data?.pages.flatMap((page) => page.items) || [];
-    const recordCountLabel = hasNextPage ? `${records.length}件以上` : `${records.length}件`;
+    const loadedLabel = hasNextPage ? `${records.length}件以上` : `${records.length}件`;
+    const totalLabel = total ? `${total.exact ? '' : '約'}${total.count.toLocaleString()}件` : null;
+    const recordCountLabel = totalLabel ? `${records.length.toLocaleString()} / ${totalLabel}` : loadedLabel;
 
     if (isLoading) {
         return <div className="space-y-2">